@@ -0,0 +1,217 @@
+"""
+Simulated RADIUS client fleets for load tests.
+
+A fleet is built from templates (a name prefix, a starting MAC and IP, a
+count, a secret and the RadSec flag) and stored column-wise in NumPy
+arrays: MACs as uint64, IPv4 addresses as uint32, the secret as an index
+into a small table, RadSec as a bool. 100k clients take a couple of MB and
+no widgets; a record only turns back into a dict (the same shape as the
+app's `clients` entries) or a supplicant tuple when it is read.
+
+fleet.supplicants() gives the RADIUS load generator a lazy sequence of
+(username, password, calling_station_id, nas_ip, secret) tuples, one per
+client, so a 100k-client run never builds 100k tuples up front.
+"""
+import ipaddress
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+MAX_FLEET_SIZE = 1_000_000
+
+
+def parse_mac(mac):
+    """
+    "AA:BB:CC:DD:EE:01" / "aa-bb-cc-dd-ee-01" / "aabb.ccdd.ee01" -> int
+    """
+    digits = "".join(c for c in mac if c.isalnum())
+    if len(digits) != 12:
+        raise ValueError(f"Invalid MAC address: {mac}")
+    return int(digits, 16)
+
+
+def format_mac(value, sep=":"):
+    digits = f"{int(value):012X}"
+    return sep.join(digits[i:i + 2] for i in range(0, 12, 2))
+
+
+@dataclass
+class FleetTemplate:
+    """
+    `count` clients named <name_prefix>-00001..., with MACs and IPs counting
+    up from mac_start / ip_start. ip_start may be a CIDR ("10.1.0.0/16"),
+    in which case addresses start at its first host and must fit in it.
+    """
+    name_prefix: str
+    count: int
+    mac_start: str = "02:00:00:00:00:01"
+    ip_start: str = "10.0.0.1"
+    client_secret: str = ""
+    use_radsec: bool = False
+    certificate_file: Optional[str] = None
+
+    @classmethod
+    def from_client(cls, client, count, offset=0):
+        """
+        Template that clones one entry of the app's `clients` list, its MACs
+        and IPs starting `offset` addresses after the client's own.
+        """
+        mac_start, ip_start = client["mac_address"], client["ip_address"]
+        if offset:
+            mac_start = format_mac(parse_mac(mac_start) + offset)
+            ip_start = str(ipaddress.IPv4Address(int(ipaddress.IPv4Address(ip_start)) + offset))
+        return cls(
+            name_prefix=client["client_name"],
+            count=count,
+            mac_start=mac_start,
+            ip_start=ip_start,
+            client_secret=client.get("client_secret") or "",
+            use_radsec=bool(client.get("use_radsec")),
+            certificate_file=client.get("certificate_file"),
+        )
+
+    def ip_range(self):
+        """
+        Returns (first address as int, last usable address as int).
+        """
+        if "/" in self.ip_start:
+            network = ipaddress.IPv4Network(self.ip_start, strict=False)
+            first = int(network.network_address) + (1 if network.num_addresses > 2 else 0)
+            last = int(network.broadcast_address) - (1 if network.num_addresses > 2 else 0)
+            return first, last
+        return int(ipaddress.IPv4Address(self.ip_start)), 0xFFFFFFFF
+
+
+def _overlapping(ranges, first, last):
+    return any(first <= hi and lo <= last for lo, hi in ranges)
+
+
+class ClientFleet:
+
+    def __init__(self, templates=()):
+        self.templates = []
+        self._mac_ranges = []
+        self._ip_ranges = []
+        self.names = []
+        self.secrets = [""]
+        self._template = np.zeros(0, dtype=np.uint16)
+        self._ordinal = np.zeros(0, dtype=np.uint32)
+        self.macs = np.zeros(0, dtype=np.uint64)
+        self.ips = np.zeros(0, dtype=np.uint32)
+        self.secret_ids = np.zeros(0, dtype=np.uint16)
+        self.use_radsec = np.zeros(0, dtype=bool)
+        for template in templates:
+            self.add(template)
+
+    @classmethod
+    def from_clients(cls, clients, count):
+        """
+        Fleet cloning every entry of the app's `clients` list `count` times.
+        Client i's block starts i * count addresses after its own MAC / IP,
+        so neighbouring clients (…:01 / …:02) don't get overlapping ranges.
+        """
+        return cls([FleetTemplate.from_client(c, count, offset=i * count) for i, c in enumerate(clients)])
+
+    def add(self, template):
+        """
+        Appends a template's clients. Raises ValueError if the MAC or IP
+        range runs out or overlaps clients already in the fleet, or the
+        fleet would grow past MAX_FLEET_SIZE.
+        """
+        count = int(template.count)
+        if count <= 0:
+            return
+        if len(self) + count > MAX_FLEET_SIZE:
+            raise ValueError(f"Fleet is limited to {MAX_FLEET_SIZE} clients")
+        mac_first = parse_mac(template.mac_start)
+        if mac_first + count - 1 > 0xFFFFFFFFFFFF:
+            raise ValueError(f"MAC range starting at {template.mac_start} overflows")
+        ip_first, ip_last = template.ip_range()
+        if ip_first + count - 1 > ip_last:
+            raise ValueError(f"IP range {template.ip_start} has room for {ip_last - ip_first + 1} clients, not {count}")
+        mac_range = (mac_first, mac_first + count - 1)
+        ip_range = (ip_first, ip_first + count - 1)
+        if _overlapping(self._mac_ranges, *mac_range):
+            raise ValueError(f"MAC range of {template.name_prefix} overlaps clients already in the fleet")
+        if _overlapping(self._ip_ranges, *ip_range):
+            raise ValueError(f"IP range of {template.name_prefix} overlaps clients already in the fleet")
+        self._mac_ranges.append(mac_range)
+        self._ip_ranges.append(ip_range)
+
+        offsets = np.arange(count, dtype=np.uint64)
+        template_id = len(self.templates)
+        self.templates.append(template)
+        self.names.append(template.name_prefix)
+        self._template = np.concatenate([self._template, np.full(count, template_id, dtype=np.uint16)])
+        self._ordinal = np.concatenate([self._ordinal, np.arange(1, count + 1, dtype=np.uint32)])
+        self.macs = np.concatenate([self.macs, np.uint64(mac_first) + offsets])
+        self.ips = np.concatenate([self.ips, (np.uint64(ip_first) + offsets).astype(np.uint32)])
+        self.secret_ids = np.concatenate([self.secret_ids, np.full(count, self._intern_secret(template.client_secret), dtype=np.uint16)])
+        self.use_radsec = np.concatenate([self.use_radsec, np.full(count, bool(template.use_radsec))])
+
+    def _intern_secret(self, secret):
+        if secret not in self.secrets:
+            self.secrets.append(secret)
+        return self.secrets.index(secret)
+
+    def __len__(self):
+        return len(self.macs)
+
+    def nbytes(self):
+        return sum(a.nbytes for a in (self._template, self._ordinal, self.macs, self.ips, self.secret_ids, self.use_radsec))
+
+    def name(self, i):
+        return f"{self.names[self._template[i]]}-{int(self._ordinal[i]):05d}"
+
+    def ip(self, i):
+        return str(ipaddress.IPv4Address(int(self.ips[i])))
+
+    def record(self, i):
+        """
+        Client i as a dict shaped like the app's `clients` entries.
+        """
+        template = self.templates[self._template[i]]
+        return {
+            "client_name": self.name(i),
+            "mac_address": format_mac(self.macs[i]),
+            "ip_address": self.ip(i),
+            "use_radsec": bool(self.use_radsec[i]),
+            "certificate_file": template.certificate_file,
+            "client_secret": self.secrets[self.secret_ids[i]],
+        }
+
+    def summary(self):
+        radsec = int(self.use_radsec.sum())
+        return (f"{len(self):,} simulated clients from {len(self.templates)} template(s), "
+                f"{radsec:,} RadSec, {self.nbytes() / 1e6:.1f} MB")
+
+    def supplicants(self, password="", include_radsec=False, default_secret=None):
+        """
+        Lazy sequence of supplicant tuples for radius_load.LoadGenerator.
+        RadSec clients are left out unless include_radsec (the engine only
+        speaks RADIUS over UDP); clients without a secret use default_secret.
+        """
+        rows = np.arange(len(self)) if include_radsec else np.flatnonzero(~self.use_radsec)
+        return FleetSupplicants(self, rows, password, default_secret)
+
+
+class FleetSupplicants:
+    """
+    Sequence view over selected fleet rows, built into tuples on access.
+    """
+
+    def __init__(self, fleet, rows, password, default_secret):
+        self.fleet = fleet
+        self.rows = rows
+        self.password = password
+        self.default_secret = default_secret
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        fleet = self.fleet
+        i = self.rows[index]
+        secret = fleet.secrets[fleet.secret_ids[i]] or self.default_secret
+        return (fleet.name(i), self.password, format_mac(fleet.macs[i], "-"), fleet.ip(i), secret)
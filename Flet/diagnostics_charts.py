@@ -0,0 +1,223 @@
+"""
+Incremental chart layer for the Diagnostics view.
+
+Keeps one chart control per host and, on refresh, only touches the charts
+whose host actually received new samples (tracked by the store's per-host
+version counter). Two render paths:
+
+- "plotly": one Plotly figure per host is built once; refreshes replace the
+  trace data in place and re-render just that chart (flet renders Plotly
+  figures as static images, so unchanged hosts are never re-serialized).
+- "native": an ft.LineChart per host whose data points are patched in place,
+  appending only the new points and dropping the oldest past a fixed window,
+  so no image is regenerated at all.
+
+Long series are downsampled (LTTB) to about the chart's pixel width before
+plotting. A zoom range re-queries the full-resolution store for just that
+time span and downsamples it again, so zooming in shows real detail.
+
+refresh() is called from the collector thread as well as from UI event
+handlers, so everything that touches the chart list holds one lock.
+"""
+import threading
+
+import flet as ft
+import flet.plotly_chart as fpc
+import plotly.graph_objects as go
+
+from downsample import DEFAULT_TARGET_POINTS, downsample
+from timeseries import to_datetimes
+
+NATIVE_MAX_POINTS = 300
+# label -> seconds of history shown (None = everything retained)
+ZOOM_LEVELS = {
+    "Last 15 minutes": 15 * 60,
+    "Last hour": 3600,
+    "Last 6 hours": 6 * 3600,
+    "Last 24 hours": 24 * 3600,
+    "All history": None,
+}
+SERIES_COLORS = {"cpu_percent": "#00ADEF", "memory_percent": "#F36F21"}
+SERIES_LABELS = {"cpu_percent": "CPU", "memory_percent": "Memory"}
+
+
+class _HostChart:
+    def __init__(self, control, version=0, figure=None, series=None, line_chart=None):
+        self.control = control
+        self.version = version
+        self.figure = figure
+        self.series = series or {}
+        self.line_chart = line_chart
+
+
+class DiagnosticsCharts:
+
+    def __init__(self, store, container, mode="plotly", metrics=("cpu_percent", "memory_percent"),
+                 target_points=DEFAULT_TARGET_POINTS, range_seconds=None, method="lttb"):
+        self.store = store
+        self.container = container
+        self.mode = mode
+        self.metrics = tuple(metrics)
+        self.target_points = target_points
+        self.range_seconds = range_seconds
+        self.method = method
+        self._charts = {}
+        self._lock = threading.RLock()
+
+    def _rebuild_all(self):
+        self._charts.clear()
+        self.container.controls.clear()
+
+    def set_mode(self, mode):
+        with self._lock:
+            if mode != self.mode:
+                self.mode = mode
+                self._rebuild_all()
+
+    def set_range(self, range_seconds):
+        """
+        Zooms every chart to the last range_seconds of history (None = all).
+        """
+        with self._lock:
+            if range_seconds != self.range_seconds:
+                self.range_seconds = range_seconds
+                self._rebuild_all()
+
+    def _window(self, host):
+        if self.range_seconds is None:
+            return self.store.window(host)
+        latest = self.store.window(host, last=1)["timestamps"]
+        if not len(latest):
+            return self.store.window(host)
+        return self.store.window_since(host, float(latest[-1]) - self.range_seconds)
+
+    def _series(self, host, target):
+        """
+        {metric: (x, y)} for the current zoom range, downsampled to target points.
+        """
+        window = self._window(host)
+        return {
+            metric: downsample(window["timestamps"], window[metric], target, self.method)
+            for metric in self.metrics
+        }
+
+    def refresh(self):
+        """
+        Brings the charts up to date with the store. Returns True when the
+        container's list of charts changed (the caller then needs to update
+        the container itself); individual charts are updated in place.
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self):
+        hosts = self.store.hosts()
+        structure_changed = False
+
+        for host in list(self._charts):
+            if host not in hosts:
+                self.container.controls.remove(self._charts.pop(host).control)
+                structure_changed = True
+
+        for host in hosts:
+            version = self.store.version(host)
+            chart = self._charts.get(host)
+            if chart is None:
+                chart = self._build(host)
+                self._charts[host] = chart
+                self.container.controls.append(chart.control)
+                structure_changed = True
+            elif chart.version == version:
+                continue
+            else:
+                changed_control = self._patch(host, chart, version)
+                if not structure_changed and changed_control.page is not None:
+                    changed_control.update()
+            chart.version = version
+
+        return structure_changed
+
+    # -- Plotly path --
+    def _plotly_figure(self, host, series):
+        fig = go.Figure()
+        for metric in self.metrics:
+            x, y = series[metric]
+            fig.add_trace(go.Scatter(
+                x=to_datetimes(x), y=y, mode="lines+markers" if len(x) < 200 else "lines",
+                name=SERIES_LABELS.get(metric, metric),
+                line=dict(color=SERIES_COLORS.get(metric)),
+            ))
+        fig.update_layout(
+            title=f"Resource Usage for {host}",
+            xaxis_title="Timestamp",
+            yaxis_title="Percentage (%)",
+            legend_title="Metric"
+        )
+        return fig
+
+    # -- Native path --
+    def _native_chart(self, metric_points):
+        series = {}
+        data_series = []
+        for metric in self.metrics:
+            x, y = metric_points[metric]
+            points = [ft.LineChartDataPoint(float(t), float(v)) for t, v in zip(x, y)]
+            line = ft.LineChartData(
+                data_points=points,
+                stroke_width=2,
+                color=SERIES_COLORS.get(metric),
+            )
+            series[metric] = line
+            data_series.append(line)
+        control = ft.LineChart(
+            data_series=data_series,
+            min_y=0,
+            max_y=100,
+            left_axis=ft.ChartAxis(title=ft.Text("%"), labels_size=40),
+            bottom_axis=ft.ChartAxis(title=ft.Text("Time"), show_labels=False),
+            tooltip_bgcolor="#222222",
+            height=250,
+            expand=True,
+        )
+        return control, series
+
+    def _build(self, host):
+        version = self.store.version(host)
+        if self.mode == "native":
+            line_chart, series = self._native_chart(self._series(host, NATIVE_MAX_POINTS))
+            control = ft.Column([ft.Text(f"Resource Usage for {host}", size=16), line_chart])
+            return _HostChart(control, version, series=series, line_chart=line_chart)
+        fig = self._plotly_figure(host, self._series(host, self.target_points))
+        return _HostChart(fpc.PlotlyChart(fig, expand=True), version, figure=fig)
+
+    def _patch(self, host, chart, version):
+        """
+        Applies the new samples to a host's chart, returns the control to update.
+        """
+        if self.mode == "native":
+            new_points = version - chart.version
+            visible = len(next(iter(chart.series.values())).data_points) if chart.series else 0
+            if self.range_seconds is None and visible + new_points <= NATIVE_MAX_POINTS:
+                # still under the point budget: append just the new samples
+                window = self.store.window(host, last=new_points)
+                for metric, line in chart.series.items():
+                    line.data_points.extend(
+                        ft.LineChartDataPoint(float(t), float(v))
+                        for t, v in zip(window["timestamps"], window[metric])
+                    )
+            else:
+                # over budget (or zoomed): swap in a freshly downsampled series, same control
+                metric_points = self._series(host, NATIVE_MAX_POINTS)
+                for metric, line in chart.series.items():
+                    x, y = metric_points[metric]
+                    line.data_points = [ft.LineChartDataPoint(float(t), float(v)) for t, v in zip(x, y)]
+            return chart.line_chart
+        series = self._series(host, self.target_points)
+        with chart.figure.batch_update():
+            for trace, metric in zip(chart.figure.data, self.metrics):
+                x, y = series[metric]
+                trace.x = to_datetimes(x)
+                trace.y = y
+                trace.mode = "lines+markers" if len(x) < 200 else "lines"
+        chart.control.figure = chart.figure
+        return chart.control
@@ -0,0 +1,90 @@
+"""
+Downsampling for long diagnostics series.
+
+Plotting tens of thousands of samples into a chart a few hundred pixels wide
+wastes render time and (in the browser build) bandwidth. Both reducers keep
+the shape of the series while cutting it to roughly the chart's pixel width:
+
+- lttb():   Largest-Triangle-Three-Buckets. Picks the point in each bucket
+            that forms the largest triangle with its neighbours, which keeps
+            spikes and the visual outline. Loops over buckets, but each
+            bucket's work is a vectorized NumPy expression.
+- minmax(): keeps the min and max of every bucket. Fully vectorized, cheaper
+            than LTTB, and never hides an extreme value.
+"""
+import numpy as np
+
+# roughly the plot area of a chart in the Diagnostics view
+DEFAULT_TARGET_POINTS = 800
+
+
+def lttb(x, y, target=DEFAULT_TARGET_POINTS):
+    """
+    Returns (x, y) reduced to at most `target` points with LTTB.
+    NaN values in y are dropped first.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = ~np.isnan(y)
+    if not keep.all():
+        x, y = x[keep], y[keep]
+    n = len(x)
+    if target >= n or target < 3:
+        return x, y
+
+    # first and last points are always kept, the rest is split into target-2 buckets
+    edges = np.linspace(1, n - 1, target - 1).astype(np.int64)
+    selected = np.empty(target, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for b in range(target - 2):
+        start, end = edges[b], edges[b + 1]
+        if end <= start:
+            end = start + 1
+        # average of the next bucket (or the last point for the final bucket)
+        next_start, next_end = end, edges[b + 2] if b + 2 < len(edges) else n
+        if next_end <= next_start:
+            next_end = next_start + 1
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        bx, by = x[start:end], y[start:end]
+        areas = np.abs((x[prev] - avg_x) * (by - y[prev]) - (x[prev] - bx) * (avg_y - y[prev]))
+        prev = start + int(np.argmax(areas))
+        selected[b + 1] = prev
+
+    return x[selected], y[selected]
+
+
+def minmax(x, y, target=DEFAULT_TARGET_POINTS):
+    """
+    Returns (x, y) reduced to about `target` points by keeping the min and
+    max sample of each bucket, in time order.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    buckets = max(1, target // 2)
+    if n <= target or n < 2 * buckets:
+        return x, y
+
+    # trim to a whole number of buckets; the tail is appended unchanged
+    size = n // buckets
+    usable = size * buckets
+    yb = y[:usable].reshape(buckets, size)
+    filled = np.where(np.isnan(yb), np.nanmean(y), yb)
+    base = np.arange(buckets) * size
+    lo = base + np.argmin(filled, axis=1)
+    hi = base + np.argmax(filled, axis=1)
+    idx = np.sort(np.concatenate([lo, hi]))
+    idx = np.unique(np.concatenate([idx, np.arange(usable, n)]))
+    return x[idx], y[idx]
+
+
+REDUCERS = {"lttb": lttb, "minmax": minmax}
+
+
+def downsample(x, y, target=DEFAULT_TARGET_POINTS, method="lttb"):
+    return REDUCERS[method](x, y, target)
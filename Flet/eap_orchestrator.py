@@ -0,0 +1,188 @@
+"""
+Runs eapol_test / wpa_supplicant on the remote test VMs.
+
+For every VM at once (through a bounded thread pool), the selected test's
+settings are rendered into a wpa_supplicant-style network block, pushed
+to the VM over SFTP, and the tool is run against it on a pooled SSH
+connection. Output is parsed line by line as it arrives (eap_parser), so
+each run ends up as a compact EapTiming record rather than a full log,
+and the config (which holds the test password) is deleted again when the
+run ends: by the remote command itself, and over SFTP afterwards in case
+the upload, exec or stream failed part way.
+"""
+import shlex
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Optional
+
+from eap_parser import EapRunParser, EapTiming
+from ssh_pool import get_pool
+
+TOOLS = ("eapol_test", "wpa_supplicant")
+REMOTE_DIR = "/tmp"
+DEFAULT_INTERFACE = "eth0"
+
+_EAP_METHODS = {"PEAP": "PEAP", "EAP-TLS": "TLS", "EAP-TTLS": "TTLS", "EAP-FAST": "FAST"}
+_PHASE2 = {"MSCHAPv2": "MSCHAPV2", "GTC": "GTC", "CHAP": "CHAP", "PAP": "PAP"}
+
+
+def _quote(value):
+    """
+    wpa_supplicant string value: "quoted" when it can be, hex otherwise
+    (quoted strings have no escape for '"' or newlines).
+    """
+    if value.isprintable() and '"' not in value:
+        return f'"{value}"'
+    return value.encode("utf-8").hex()
+
+
+def render_config(config, tool="eapol_test", cert_path=None):
+    """
+    Renders a test_configs entry as a wpa_supplicant config file.
+    cert_path is where the client certificate (EAP-TLS) will live on the VM.
+    """
+    eap_type = config.get("eap_type") or "PEAP"
+    lines = []
+    if tool == "wpa_supplicant":
+        lines += ["ctrl_interface=/var/run/wpa_supplicant", "ap_scan=0", ""]
+    lines += [
+        "network={",
+        "    key_mgmt=IEEE8021X" if tool == "wpa_supplicant" else "    key_mgmt=WPA-EAP",
+        f"    eap={_EAP_METHODS.get(eap_type, eap_type)}",
+        f"    identity={_quote(config.get('username') or '')}",
+    ]
+    if config.get("anonymous_identity"):
+        lines.append(f"    anonymous_identity={_quote(config['anonymous_identity'])}")
+    if eap_type == "EAP-TLS":
+        if cert_path:
+            # certificate_file is expected to hold the client cert and its key
+            lines += [f'    client_cert="{cert_path}"', f'    private_key="{cert_path}"']
+    else:
+        lines.append(f"    password={_quote(config.get('password') or '')}")
+        inner = _PHASE2.get(config.get("inner_method"), config.get("inner_method"))
+        if inner:
+            lines.append(f'    phase2="auth={inner}"')
+    if eap_type == "EAP-FAST":
+        provisioning = 1 if config.get("fast_provisioning") else 0
+        lines += [f'    phase1="fast_provisioning={provisioning}"', f'    pac_file="{REMOTE_DIR}/fs_eap.pac"']
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def build_command(tool, config, conf_path, interface=DEFAULT_INTERFACE, cleanup=()):
+    """
+    Shell command running the tool on conf_path, then removing the pushed
+    files whatever the outcome, and exiting with the tool's status.
+    """
+    timeout = int(float(config.get("timeout") or 30))
+    if tool == "eapol_test":
+        run = (f"eapol_test -c {shlex.quote(conf_path)} -a {shlex.quote(config['server_ip'])}"
+               f" -p {shlex.quote(str(config.get('port') or 1812))}"
+               f" -s {shlex.quote(config.get('shared_secret') or '')} -t {timeout}")
+    else:
+        # wpa_supplicant keeps running after success; -t stamps lines, timeout bounds the run
+        run = (f"timeout {timeout} wpa_supplicant -t -D wired -i {shlex.quote(interface)}"
+               f" -c {shlex.quote(conf_path)}")
+    paths = " ".join(shlex.quote(p) for p in (conf_path,) + tuple(cleanup))
+    return f"{run} 2>&1; rc=$?; rm -f {paths}; exit $rc"
+
+
+@dataclass
+class EapRunResult:
+    vm_name: str
+    tool: str
+    success: bool = False
+    exit_status: Optional[int] = None
+    duration: float = 0.0
+    timing: EapTiming = field(default_factory=EapTiming)
+    error: Optional[str] = None
+
+    @property
+    def summary(self):
+        if self.error:
+            return f"ERROR: {self.error}"
+        verdict = "PASS" if self.success else "FAIL"
+        timing = self.timing
+        phases = ", ".join(
+            f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in timing.phases().items()
+            if seconds is not None and phase != "total"
+        )
+        method = f" {timing.method}" if timing.method else ""
+        return f"{verdict}{method} ({self.duration:.1f}s, exit {self.exit_status}" + (f"; {phases})" if phases else ")")
+
+
+def run_on_vm(vm, config, tool="eapol_test", on_line=None, on_event=None):
+    """
+    Pushes the config to one VM, runs the tool and returns an EapRunResult.
+    on_line(vm_name, line) is called for each raw output line as it arrives,
+    on_event(vm_name, milestone, offset_seconds, line) for each EAP milestone.
+    """
+    if tool not in TOOLS:
+        raise ValueError(f"Unknown tool: {tool}")
+    pool = get_pool()
+    name = vm.get("vm_name") or vm.get("host")
+    result = EapRunResult(vm_name=name, tool=tool)
+    host, port, user = vm.get("host"), int(vm.get("port") or 22), vm.get("ssh_user")
+    auth = dict(password=vm.get("ssh_password") or None, key_file=vm.get("ssh_key_file"))
+    run_id = uuid.uuid4().hex[:12]
+    conf_path = f"{REMOTE_DIR}/fs_eap_{run_id}.conf"
+    started = time.monotonic()
+    uploaded = []
+    try:
+        cleanup = ()
+        cert_path = None
+        if config.get("eap_type") == "EAP-TLS" and config.get("certificate_file"):
+            cert_path = f"{REMOTE_DIR}/fs_eap_{run_id}.pem"
+            with open(config["certificate_file"], "rb") as f:
+                data = f.read()
+            # listed before the upload: a failed upload can still leave a partial file
+            uploaded.append(cert_path)
+            pool.upload(host, port, user, data, cert_path, **auth)
+            cleanup = (cert_path,)
+        uploaded.append(conf_path)
+        pool.upload(host, port, user, render_config(config, tool, cert_path).encode("utf-8"), conf_path, **auth)
+
+        parser = EapRunParser(name, on_event=(lambda *event: on_event(name, *event)) if on_event else None)
+
+        def line_received(line):
+            parser.feed(line)
+            if on_line:
+                on_line(name, line)
+
+        command = build_command(tool, config, conf_path, vm.get("interface") or DEFAULT_INTERFACE, cleanup)
+        result.exit_status = pool.stream_command(host, port, user, command, line_received, **auth)
+        result.timing = parser.finish()
+        result.success = result.timing.outcome == "accept"
+        if tool == "eapol_test":
+            result.success = result.success and result.exit_status == 0
+    except Exception as e:
+        result.error = str(e) or e.__class__.__name__
+    finally:
+        if uploaded:
+            try:
+                pool.remove(host, port, user, uploaded, **auth)
+            except Exception:
+                # VM unreachable; the files are 0600 and the remote rm -f covers normal runs
+                pass
+    result.duration = time.monotonic() - started
+    return result
+
+
+def run_on_vms(vms, config, tool="eapol_test", on_line=None, on_result=None, max_workers=16, on_event=None):
+    """
+    Runs the tool on every VM at once on a bounded thread pool. on_result(idx,
+    EapRunResult) is called as each VM finishes (from a worker thread).
+    Returns the results in VM order.
+    """
+    results = [None] * len(vms)
+    workers = max(1, min(int(max_workers), len(vms) or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="eap-run") as executor:
+        futures = {executor.submit(run_on_vm, vm, config, tool, on_line, on_event): idx for idx, vm in enumerate(vms)}
+        for future in as_completed(futures):
+            idx = futures[future]
+            results[idx] = future.result()
+            if on_result:
+                on_result(idx, results[idx])
+    return results
@@ -0,0 +1,203 @@
+"""
+Streaming parser for eapol_test / wpa_supplicant debug output.
+
+The tools print hundreds of lines per authentication, almost all of it
+hex dumps and state-machine chatter. EapRunParser looks at each line once
+as it streams off the SSH channel, keeps only the timestamps of the
+milestones below, and produces a small EapTiming record at the end; the
+raw text is never accumulated (apart from a short tail kept for failed
+runs).
+
+Milestones, in the order they normally happen:
+
+    eap_started      EAP conversation started
+    method_selected  EAP method negotiated (PEAP, TTLS, ...)
+    tls_started      TLS handshake began (client hello)
+    tls_done         TLS handshake finished / phase 1 done
+    inner_started    phase 2 (inner method) began
+    inner_done       inner method succeeded or failed
+    radius_accept    Access-Accept received
+    radius_reject    Access-Reject received
+    eap_success      EAP success
+    eap_failure      EAP failure
+
+Lines are timestamped from wpa_supplicant's "-t" prefix
+("1700000000.123456: ...") when present, otherwise from their arrival
+time, which is within a few milliseconds over a live channel. The first
+line picks the time base for the whole run: in a "-t" run, an unprefixed
+line is placed after the last prefixed one by the local time elapsed
+since it arrived, and in an unprefixed run any prefix is ignored, so the
+remote epoch and the local clock are never subtracted from each other.
+
+PhaseStats aggregates any number of EapTiming records into per-phase
+latency histograms of constant size.
+"""
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from radius_load import LatencyHistogram
+
+TAIL_LINES = 30
+
+_TIMESTAMP = re.compile(r"^(\d{9,}\.\d+): ")
+_METHOD = re.compile(r"CTRL-EVENT-EAP-METHOD EAP vendor \d+ method \d+ \(([^)]+)\) selected")
+_MILESTONES = [
+    ("eap_started", re.compile(r"CTRL-EVENT-EAP-STARTED")),
+    ("method_selected", _METHOD),
+    ("tls_started", re.compile(r"SSL: SSL_connect:.*(client hello|SSLv3/TLS write client hello)|TLS: Phase 1 started|"
+                               r"EAP-(PEAP|TTLS|FAST|TLS): Start")),
+    ("tls_done", re.compile(r"(Handshake finished|TLS done|Phase 1 done|TLS connection established)")),
+    ("inner_started", re.compile(r"(Phase 2 Request|Start Phase 2|received Phase 2|Phase2 type|Phase 2 EAP)")),
+    ("inner_done", re.compile(r"EAP-(MSCHAPV2|GTC|MD5|PAP|CHAP|TTLS/\w+): .*(succeeded|success|failed|failure)|"
+                              r"Phase 2 (success|failure)|Result TLV")),
+    ("radius_accept", re.compile(r"Access-Accept")),
+    ("radius_reject", re.compile(r"Access-Reject")),
+    ("eap_success", re.compile(r"CTRL-EVENT-EAP-SUCCESS|^SUCCESS$")),
+    ("eap_failure", re.compile(r"CTRL-EVENT-EAP-FAILURE|^FAILURE$")),
+]
+_RADIUS_SENT = re.compile(r"Sending RADIUS message")
+
+# phase name -> (start milestone, end milestone(s)); the first end found is used
+PHASES = {
+    "method_negotiation": ("start", ("method_selected",)),
+    "tls_handshake": ("tls_started", ("tls_done",)),
+    "inner_auth": ("inner_started", ("inner_done",)),
+    "total": ("start", ("radius_accept", "radius_reject", "eap_success", "eap_failure", "end")),
+}
+
+
+@dataclass
+class EapTiming:
+    """
+    Compact per-run record: milestone offsets in seconds from the first line.
+    """
+    name: str = ""
+    method: Optional[str] = None
+    outcome: Optional[str] = None
+    radius_round_trips: int = 0
+    lines: int = 0
+    marks: Dict[str, float] = field(default_factory=dict)
+    tail: List[str] = field(default_factory=list)
+
+    def phase(self, phase):
+        """
+        Seconds spent in a phase, or None when its milestones weren't seen.
+        """
+        start_mark, end_marks = PHASES[phase]
+        start = 0.0 if start_mark == "start" else self.marks.get(start_mark)
+        if start is None:
+            return None
+        for end_mark in end_marks:
+            if end_mark in self.marks:
+                return max(0.0, self.marks[end_mark] - start)
+        return None
+
+    def phases(self):
+        return {phase: self.phase(phase) for phase in PHASES}
+
+
+class EapRunParser:
+    """
+    Feed it lines as they arrive, then call finish() for the EapTiming.
+    on_event(name, offset_seconds, line) is called for each milestone.
+    """
+
+    def __init__(self, name="", on_event=None, clock=time.monotonic):
+        self.on_event = on_event
+        self.clock = clock
+        self.record = EapTiming(name=name)
+        self._origin = None
+        self._last = 0.0
+        self._epoch = None
+        self._anchor = None
+        self._tail = deque(maxlen=TAIL_LINES)
+
+    def _timestamp(self, line):
+        match = _TIMESTAMP.match(line)
+        text = line[match.end():] if match else line
+        now = self.clock()
+        if self._epoch is None:
+            self._epoch = match is not None
+        if not self._epoch:
+            return now, text
+        if match:
+            # (remote stamp, local arrival time) of the latest prefixed line
+            self._anchor = (float(match.group(1)), now)
+            return self._anchor[0], text
+        stamp, arrived = self._anchor
+        return stamp + (now - arrived), text
+
+    def feed(self, line):
+        stamp, text = self._timestamp(line)
+        if self._origin is None:
+            self._origin = stamp
+        offset = self._last = stamp - self._origin
+        record = self.record
+        record.lines += 1
+        self._tail.append(line)
+
+        if _RADIUS_SENT.search(text):
+            record.radius_round_trips += 1
+        for name, pattern in _MILESTONES:
+            if name in record.marks:
+                continue
+            match = pattern.search(text)
+            if not match:
+                continue
+            record.marks[name] = offset
+            if name == "method_selected":
+                record.method = match.group(1)
+            if self.on_event:
+                self.on_event(name, offset, text)
+
+    def finish(self):
+        record = self.record
+        if self._origin is not None:
+            record.marks.setdefault("end", self._last)
+        marks = record.marks
+        if "radius_accept" in marks or ("eap_success" in marks and "radius_reject" not in marks):
+            record.outcome = "accept"
+        elif "radius_reject" in marks or "eap_failure" in marks:
+            record.outcome = "reject"
+        else:
+            record.outcome = "incomplete"
+        # the tail only matters for explaining failures
+        record.tail = [] if record.outcome == "accept" else list(self._tail)
+        return record
+
+
+class PhaseStats:
+    """
+    Running per-phase latency histograms over many EapTiming records.
+    """
+
+    def __init__(self):
+        self.histograms = {phase: LatencyHistogram() for phase in PHASES}
+        self.outcomes = {}
+        self.methods = {}
+        self.runs = 0
+
+    def add(self, record):
+        self.runs += 1
+        self.outcomes[record.outcome] = self.outcomes.get(record.outcome, 0) + 1
+        if record.method:
+            self.methods[record.method] = self.methods.get(record.method, 0) + 1
+        for phase, seconds in record.phases().items():
+            if seconds is not None:
+                self.histograms[phase].record(seconds)
+
+    def summary(self, percentiles=(50, 95, 99)):
+        """
+        Text table: one line per phase with count and percentiles in ms.
+        """
+        outcomes = ", ".join(f"{k} {v}" for k, v in sorted(self.outcomes.items()))
+        lines = [f"{self.runs} run(s): {outcomes}"]
+        for phase, histogram in self.histograms.items():
+            if not histogram.count:
+                continue
+            values = "  ".join(f"p{p} {histogram.percentile(p) * 1000:.1f}" for p in percentiles)
+            lines.append(f"{phase:<19} n={histogram.count:<5} {values} ms")
+        return "\n".join(lines)
@@ -1,6 +1,16 @@
 import flet as ft
-import paramiko
+from ssh_pool import get_pool
+from log_tail import RemoteLogTailer
+from log_query import LEVELS, LogQuery, run_query
 import os
+import threading
+import time
+
+# Seconds between refreshes while following a log
+FOLLOW_INTERVAL = 2
+
+CONNECT_PLUGIN_LOG = "/shared/fslog/plugin/connect_module/connect_module.log"
+CONNECT_PYTHON_LOG = "/usr/local/forescout/plugin/connect_module/python_logs/python_server.log"
 
 def connect_ssh_and_run_command(
     host: str,
@@ -14,21 +24,14 @@ def connect_ssh_and_run_command(
     and run a command. Returns the command output or any errors.
     """
 
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
     try:
-        if key_file and os.path.exists(key_file):
-            # Key-based authentication
-            key = paramiko.RSAKey.from_private_key_file(key_file)
-            ssh.connect(hostname=host, username=username, pkey=key, timeout=10)
-        else:
+        if not (key_file and os.path.exists(key_file)):
             # Password-based authentication
-            ssh.connect(hostname=host, username=username, password=password, timeout=10)
-
-        stdin, stdout, stderr = ssh.exec_command(command)
-        output = stdout.read().decode("utf-8", errors="ignore")
-        errors = stderr.read().decode("utf-8", errors="ignore")
+            key_file = None
+        # Reuses a pooled, already-authenticated transport when one exists
+        exit_status, output, errors = get_pool().run_command(
+            host, 22, username, command, password=password, key_file=key_file
+        )
 
         if errors.strip():
             return f"ERROR:\n{errors.strip()}"
@@ -36,8 +39,6 @@ def connect_ssh_and_run_command(
 
     except Exception as e:
         return f"Connection or command error: {str(e)}"
-    finally:
-        ssh.close()
 
 
 def main(page: ft.Page):
@@ -51,6 +52,9 @@ def main(page: ft.Page):
     # Each entry = { "host": ..., "username": ..., "password": ..., "key_file": ... }
     ssh_configs = []
 
+    # Byte offsets / recent lines per (host, log path)
+    log_tailer = RemoteLogTailer()
+
     # We’ll track whether the latest SSH test was successful:
     test_ok = False
 
@@ -165,12 +169,12 @@ def main(page: ft.Page):
         ]
         page.update()
 
-    def run_command(command_str: str):
+    def selected_config():
         selected_label = ddl_hosts.value
         if not selected_label:
             txt_output.value = "Please select a host configuration first."
             page.update()
-            return
+            return None
 
         # Find chosen config
         chosen_config = None
@@ -183,39 +187,159 @@ def main(page: ft.Page):
         if not chosen_config:
             txt_output.value = "Configuration not found. Please re-add."
             page.update()
-            return
+            return None
+        return chosen_config
 
-        # Connect via SSH and run command
-        result = connect_ssh_and_run_command(
-            host=chosen_config["host"],
-            username=chosen_config["username"],
-            password=chosen_config["password"],
-            key_file=chosen_config["key_file"],
-            command=command_str
-        )
-        txt_output.value = result
+    # Which log the Follow switch keeps refreshing: (config, path) or None
+    followed_log = {"target": None, "thread": None}
+
+    def tail_log(path: str):
+        chosen_config = selected_config()
+        if not chosen_config:
+            return
+        followed_log["target"] = (chosen_config, path)
+        refresh_log(chosen_config, path)
+
+    def refresh_log(chosen_config, path):
+        key_file = chosen_config["key_file"]
+        try:
+            # Only the bytes appended since the last refresh cross the wire
+            state, new_bytes = log_tailer.refresh(
+                chosen_config["host"],
+                chosen_config["username"],
+                path,
+                password=chosen_config["password"],
+                key_file=key_file if key_file and os.path.exists(key_file) else None,
+            )
+            txt_output.value = state.text()
+            lbl_log_status.value = f"{path}: +{new_bytes} bytes (offset {state.offset})"
+        except Exception as e:
+            txt_output.value = f"Connection or command error: {str(e)}"
         page.update()
 
+    def follow_loop():
+        while sw_follow.value:
+            target = followed_log["target"]
+            if target:
+                refresh_log(*target)
+            time.sleep(FOLLOW_INTERVAL)
+
+    def toggle_follow(e):
+        worker = followed_log["thread"]
+        if sw_follow.value and not (worker and worker.is_alive()):
+            worker = threading.Thread(target=follow_loop, daemon=True)
+            followed_log["thread"] = worker
+            worker.start()
+
     def cat_connect_plugin_log(e):
-        run_command("cat /shared/fslog/plugin/connect_module/connect_module.log")
+        tail_log(CONNECT_PLUGIN_LOG)
 
     def cat_connect_python_log(e):
-        run_command("cat /usr/local/forescout/plugin/connect_module/python_logs/python_server.log")
+        tail_log(CONNECT_PYTHON_LOG)
 
     btn_cat_connect_plugin_log = ft.ElevatedButton(
-        text="Cat Connect Plugin Log",
+        text="Tail Connect Plugin Log",
         on_click=cat_connect_plugin_log
     )
     btn_cat_connect_python_log = ft.ElevatedButton(
-        text="Cat Connect Python Log",
+        text="Tail Connect Python Log",
         on_click=cat_connect_python_log
     )
+    sw_follow = ft.Switch(label="Follow", value=False, on_change=toggle_follow)
+    lbl_log_status = ft.Text(value="", size=12)
+
+    # ---- UI Elements for Log Search ----
+    ddl_search_log = ft.Dropdown(
+        label="Log",
+        width=400,
+        options=[ft.dropdown.Option(CONNECT_PLUGIN_LOG), ft.dropdown.Option(CONNECT_PYTHON_LOG)],
+        value=CONNECT_PLUGIN_LOG
+    )
+    txt_search_regex = ft.TextField(label="Regex", width=300)
+    ddl_search_level = ft.Dropdown(
+        label="Min Level",
+        width=150,
+        options=[ft.dropdown.Option("")] + [ft.dropdown.Option(lvl) for lvl in LEVELS],
+        value=""
+    )
+    txt_search_since = ft.TextField(label="Since (YYYY-MM-DD HH:MM:SS)", width=250)
+    txt_search_until = ft.TextField(label="Until (YYYY-MM-DD HH:MM:SS)", width=250)
+    lbl_search_page = ft.Text(value="", size=12)
+    lv_search_results = ft.ListView(height=400, spacing=0)
+    search_state = {"query": None, "config": None, "page": 0, "page_count": 1}
+
+    def show_search_page(page_idx):
+        query, chosen_config = search_state["query"], search_state["config"]
+        key_file = chosen_config["key_file"]
+        try:
+            # filtering runs on the appliance, only this page's lines come back
+            result = run_query(
+                query,
+                chosen_config["host"],
+                chosen_config["username"],
+                password=chosen_config["password"],
+                key_file=key_file if key_file and os.path.exists(key_file) else None,
+                page=page_idx,
+            )
+        except Exception as e:
+            lbl_search_page.value = f"Connection or command error: {str(e)}"
+            page.update()
+            return
+        if result.error:
+            lbl_search_page.value = f"ERROR: {result.error}"
+            page.update()
+            return
+        search_state["page"] = page_idx
+        search_state["page_count"] = result.page_count
+        lv_search_results.controls = [ft.Text(line, selectable=True, size=12) for line in result.lines]
+        lbl_search_page.value = f"Page {page_idx + 1} of {result.page_count} ({result.total} matching lines)"
+        page.update()
+
+    def search_logs(e):
+        chosen_config = selected_config()
+        if not chosen_config:
+            return
+        search_state["config"] = chosen_config
+        search_state["query"] = LogQuery(
+            path=ddl_search_log.value,
+            regex=txt_search_regex.value or "",
+            level=ddl_search_level.value or "",
+            since=txt_search_since.value or "",
+            until=txt_search_until.value or "",
+        )
+        show_search_page(0)
+
+    def search_prev_page(e):
+        if search_state["query"] and search_state["page"] > 0:
+            show_search_page(search_state["page"] - 1)
+
+    def search_next_page(e):
+        if search_state["query"] and search_state["page"] + 1 < search_state["page_count"]:
+            show_search_page(search_state["page"] + 1)
+
+    search_controls = ft.Column(
+        controls=[
+            ft.Text("Search Logs", style="headlineSmall"),
+            ddl_search_log,
+            ft.Row([txt_search_regex, ddl_search_level], wrap=True),
+            ft.Row([txt_search_since, txt_search_until], wrap=True),
+            ft.Row([
+                ft.ElevatedButton(text="Search", on_click=search_logs),
+                ft.IconButton(icon=ft.Icons.CHEVRON_LEFT, tooltip="Previous page", on_click=search_prev_page),
+                ft.IconButton(icon=ft.Icons.CHEVRON_RIGHT, tooltip="Next page", on_click=search_next_page),
+                lbl_search_page,
+            ]),
+            lv_search_results
+        ],
+        spacing=10
+    )
 
     command_controls = ft.Column(
         controls=[
             ft.Text("Run SSH Commands", style="headlineSmall"),
             ddl_hosts,
-            ft.Row([btn_cat_connect_plugin_log, btn_cat_connect_python_log]),
+            ft.Row([btn_cat_connect_plugin_log, btn_cat_connect_python_log, sw_follow]),
+            lbl_log_status,
             ft.Text("Output:"),
             txt_output
         ],
@@ -227,7 +351,9 @@ def main(page: ft.Page):
         controls=[
             config_form,
             ft.Divider(),
-            command_controls
+            command_controls,
+            ft.Divider(),
+            search_controls
         ],
         spacing=20,
         expand=True
@@ -0,0 +1,157 @@
+"""
+Buffered editing for the record editors (Clients, VMs, Linux Hosts).
+
+A FormState sits between an editor's TextFields and the dict they edit.
+Keystrokes only land in a local buffer; the buffer is committed when the
+field loses focus, or once typing has paused for `delay` seconds. A commit
+validates every dirty field in one pass, writes the valid values into the
+record, shows errors on the invalid ones (leaving the record's last good
+value in place), and sends a single page.update() for the whole batch,
+instead of one store write and one round trip per character.
+"""
+import ipaddress
+import threading
+
+DEFAULT_DELAY = 0.5
+
+
+# -- Validators: return the value to store, or raise ValueError with the message to show --
+def required(value):
+    value = value.strip()
+    if not value:
+        raise ValueError("Required")
+    return value
+
+
+def port_number(value):
+    try:
+        port = int(value.strip())
+    except ValueError:
+        raise ValueError("Port must be a number")
+    if not 1 <= port <= 65535:
+        raise ValueError("Port must be 1-65535")
+    return port
+
+
+def ipv4_address(value):
+    value = value.strip()
+    try:
+        ipaddress.IPv4Address(value)
+    except ValueError:
+        raise ValueError("Invalid IPv4 address")
+    return value
+
+
+def host_address(value):
+    """
+    An IPv4 address or a hostname.
+    """
+    value = value.strip()
+    if not value or any(c.isspace() for c in value):
+        raise ValueError("Invalid host")
+    return value
+
+
+def mac_address(value):
+    value = value.strip()
+    digits = "".join(c for c in value if c not in ":-.")
+    if len(digits) != 12 or any(c not in "0123456789abcdefABCDEF" for c in digits):
+        raise ValueError("Invalid MAC address")
+    return value
+
+
+class FormState:
+    """
+    record:     the dict being edited
+    page:       ft.Page to update after a commit (None: no update is sent)
+    validators: {field: callable(str) -> value}; fields without one are stored as typed
+    on_commit:  optional callable(record, changed_fields), called after values
+                are written and before the page update (e.g. to patch a row's title)
+    """
+
+    def __init__(self, record, page=None, validators=None, on_commit=None, delay=DEFAULT_DELAY):
+        self.record = record
+        self.page = page
+        self.validators = validators or {}
+        self.on_commit = on_commit
+        self.delay = delay
+        self.errors = {}
+
+        self._controls = {}
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def bind(self, field, control):
+        """
+        Routes a TextField's edits through the buffer. Returns the control.
+        """
+        self._controls[field] = control
+        control.on_change = lambda e: self.changed(field, e.control.value)
+        control.on_blur = lambda e: self.flush()
+        return control
+
+    def changed(self, field, value):
+        with self._lock:
+            self._pending[field] = value
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    @property
+    def dirty(self):
+        return bool(self._pending)
+
+    def flush(self):
+        """
+        Validates and commits everything typed since the last commit.
+        Returns the list of fields written to the record.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return []
+
+        changed = []
+        redraw = False
+        for field, raw in pending.items():
+            validate = self.validators.get(field)
+            try:
+                value = validate(raw) if validate else raw
+            except ValueError as e:
+                error = str(e)
+            else:
+                error = None
+                if self.record.get(field) != value:
+                    self.record[field] = value
+                    changed.append(field)
+            if self.errors.get(field) != error:
+                redraw = True
+                if error:
+                    self.errors[field] = error
+                else:
+                    self.errors.pop(field, None)
+                control = self._controls.get(field)
+                if control is not None:
+                    control.error_text = error
+
+        if changed and self.on_commit:
+            self.on_commit(self.record, changed)
+        if (changed or redraw) and self.page is not None:
+            self.page.update()
+        return changed
+
+    def cancel(self):
+        """
+        Drops unsaved edits (e.g. the record was removed).
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending.clear()
@@ -1,37 +1,31 @@
 import flet as ft
-import plotly.express as px
-import flet.plotly_chart as fpc
 import paramiko
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ssh_pool import get_pool
+from metrics_collector import MetricsCollector
+from timeseries import TimeSeriesStore
+from metrics_history import MetricsHistory
+from diagnostics_charts import DiagnosticsCharts, ZOOM_LEVELS
+from radius_engine import run_requests
+from radius_load import LoadGenerator, LoadProfile, format_report, generated_supplicants
+from client_fleet import ClientFleet, FleetTemplate
+from eap_orchestrator import run_on_vms
+from eap_parser import PhaseStats
+from form_state import FormState, host_address, ipv4_address, mac_address, port_number, required
+from record_list import RecordList
+from view_cache import ViewCache
 
 # -- SSH TEST AREA --
 def test_ssh_connection(hostname, ip_address, port, username, password=None, key=None):
     """
-    Attempts to SSH to the given host using Paramiko.
+    Attempts to SSH to the given host using the shared connection pool.
+    A pooled transport is reused (and pinged), so repeat tests skip the handshake.
     Returns (success, message) to indicate pass/fail and the reason.
     """
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
     try:
-        if key:
-            # If using a key file
-            private_key = paramiko.RSAKey.from_private_key_file(key)
-            client.connect(
-                hostname=hostname,
-                port=port,
-                username=username,
-                pkey=private_key,
-                timeout=10
-            )
-        else:
-            # If using username/password
-            client.connect(
-                hostname=hostname,
-                port=port,
-                username=username,
-                password=password,
-                timeout=10
-            )
+        get_pool().check(hostname, port, username, password=password, key_file=key)
 
         msg = f"SSH connection to {hostname} ({ip_address}) on port {port} successful!"
         print(msg)
@@ -49,26 +43,86 @@ def test_ssh_connection(hostname, ip_address, port, username, password=None, key
         msg = f"An error occurred while connecting to {hostname} ({ip_address}) on port {port}: {str(e)}"
         print(msg)
         return (False, msg)
-    finally:
-        client.close()
 
 
-# -- EAP/PEAP placeholder tests --
-def run_peap_test(username, password, server_ip, port, timeout, inner_method):
+def test_ssh_connections_parallel(hosts, on_result=None, max_workers=16):
     """
-    Placeholder function that "runs" a PEAP test.
-    In a real app, you'd have logic to connect to the server
-    or call an API to verify PEAP connectivity.
+    Runs test_ssh_connection against every host dict at once on a bounded
+    thread pool. on_result(idx, success, message, latency) is called as each
+    result lands (from a worker thread).
+    Returns a summary dict with pass/fail counts and latency percentiles.
     """
-    print("===== RUNNING PEAP TEST =====")
-    print(f"Username: {username}")
-    print(f"Password: {password}")
-    print(f"Server IP: {server_ip}")
-    print(f"Port: {port}")
-    print(f"Timeout: {timeout}s")
-    print(f"Inner Method: {inner_method}")
-    print("Test in progress... [Simulating PEAP handshake]")
-    return True  # For now, just say it's successful
+    def run_one(idx, host):
+        start = time.monotonic()
+        success, message = test_ssh_connection(
+            host.get('ip_address'), host.get('ip_address'), host.get('port'),
+            host.get('ssh_user'), password=host.get('ssh_password'), key=host.get('ssh_key_file')
+        )
+        return idx, success, message, time.monotonic() - start
+
+    passed, failed, latencies = 0, 0, []
+    workers = max(1, min(int(max_workers), len(hosts) or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ssh-test") as executor:
+        futures = [executor.submit(run_one, idx, host) for idx, host in enumerate(hosts)]
+        for future in as_completed(futures):
+            idx, success, message, latency = future.result()
+            latencies.append(latency)
+            if success:
+                passed += 1
+            else:
+                failed += 1
+            if on_result:
+                on_result(idx, success, message, latency)
+
+    return {
+        "passed": passed,
+        "failed": failed,
+        "latency": latency_summary(latencies),
+    }
+
+
+def latency_summary(latencies):
+    """
+    Returns min/p50/p90/p99/max (seconds) for a list of latencies.
+    """
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "min": ordered[0],
+        "p50": pct(50),
+        "p90": pct(90),
+        "p99": pct(99),
+        "max": ordered[-1],
+    }
+
+
+# -- EAP/PEAP tests --
+def run_peap_test(username, password, server_ip, port, timeout, inner_method, secret=""):
+    """
+    Sends a PEAP start (Access-Request carrying EAP-Response/Identity) to the
+    RADIUS server through the asyncio engine, retransmitting until `timeout`
+    seconds are used up. An Access-Challenge means the server is answering
+    and has opened the PEAP exchange.
+    Returns (success, message) to indicate pass/fail and the reason.
+    """
+    retries = 2
+    try:
+        per_attempt = max(0.5, float(timeout) / (retries + 1))
+        result = run_requests(
+            server_ip, int(port), secret, [(username, password)],
+            timeout=per_attempt, retries=retries, method="eap",
+        )[0]
+    except (ValueError, OSError) as e:
+        return False, f"PEAP test could not run: {e}"
+    if not result.ok:
+        return False, f"PEAP ({inner_method}) to {server_ip}:{port} failed: {result.outcome}"
+    return True, (f"PEAP ({inner_method}) to {server_ip}:{port}: {result.outcome} "
+                  f"in {result.latency * 1000:.1f} ms ({result.attempts} attempt(s))")
 
 
 def main(page: ft.Page):
@@ -139,6 +193,7 @@ def main(page: ft.Page):
             "fast_provisioning": False,
             "server_ip": "10.0.0.1",
             "port": "1812",
+            "shared_secret": "testing123",
             "timeout": "30",
             "certificate_file": None,
         },
@@ -151,6 +206,7 @@ def main(page: ft.Page):
             "fast_provisioning": False,
             "server_ip": "10.0.0.2",
             "port": "1812",
+            "shared_secret": "testing123",
             "timeout": "30",
             "certificate_file": None,
         },
@@ -163,6 +219,7 @@ def main(page: ft.Page):
             "fast_provisioning": False,
             "server_ip": "192.168.1.100",
             "port": "1812",
+            "shared_secret": "testing123",
             "timeout": "60",
             "certificate_file": None,
         },
@@ -175,6 +232,7 @@ def main(page: ft.Page):
             "fast_provisioning": False,
             "server_ip": "fd12:3456::1",
             "port": "1812",
+            "shared_secret": "testing123",
             "timeout": "60",
             "certificate_file": None,
         },
@@ -206,6 +264,12 @@ def main(page: ft.Page):
         },
     ]
 
+    # -- Per-phase EAP timings from every eapol_test / wpa_supplicant run this session --
+    eap_phase_stats = PhaseStats()
+
+    # -- Simulated client fleet for load tests (array-backed, no widget per client) --
+    client_fleet = {"fleet": None}
+
     # -- Sample VM data --
     vms = [
         {
@@ -246,19 +310,54 @@ def main(page: ft.Page):
         },
     ]
 
-    # -- Sample Diagnostics data --
-    diagnostics_data = {
-        "UbuntuTestVM": {
-            "cpu_percent": [20, 25, 23, 30],
-            "memory_percent": [55, 57, 53, 60],
-            "timestamps": [0, 1, 2, 3]
-        },
-        "CentOSVM": {
-            "cpu_percent": [10, 12, 15, 14],
-            "memory_percent": [70, 68, 72, 75],
-            "timestamps": [0, 1, 2, 3]
-        },
-    }
+    # -- Diagnostics data, filled by the background metrics collector --
+    # Fixed-size ring buffer per host, so memory stays flat however long the app runs
+    diagnostics_data = TimeSeriesStore(metrics=("cpu_percent", "memory_percent"))
+    # Every sample is also persisted, so history survives restarts
+    metrics_history = MetricsHistory()
+
+    def load_history():
+        """
+        Trims old history, then refills the ring buffers with whatever of the
+        persisted samples still fits in them.
+        """
+        try:
+            metrics_history.compact()
+            # the ring holds `capacity` samples at the 10 second collector interval
+            since = time.time() - diagnostics_data.capacity * 10
+            for host_name in metrics_history.hosts(since=since):
+                past = metrics_history.query(host_name, since=since)
+                diagnostics_data.extend(
+                    host_name, past["timestamps"],
+                    cpu_percent=past["cpu_percent"], memory_percent=past["memory_percent"],
+                )
+        except Exception as e:
+            print(f"Could not load diagnostics history: {e}")
+
+    load_history()
+    # Set by the Diagnostics view while it is built, so collector rounds can redraw it
+    diagnostics_ui = {"refresh": None}
+
+    def record_sample(host_name, timestamp, cpu, mem, load1):
+        diagnostics_data.append(host_name, timestamp, cpu_percent=cpu, memory_percent=mem)
+        metrics_history.add(host_name, timestamp, cpu_percent=cpu, memory_percent=mem, load1=load1)
+
+    def collector_round_done():
+        # One transaction per round rather than one per sample
+        try:
+            metrics_history.flush()
+        except Exception as e:
+            print(f"Could not save diagnostics samples: {e}")
+        refresh = diagnostics_ui["refresh"]
+        if refresh and page.route == "/diagnostics":
+            refresh()
+
+    metrics_collector = MetricsCollector(
+        hosts_provider=lambda: list(linux_hosts),
+        on_sample=record_sample,
+        on_round=collector_round_done,
+        interval=10,
+    )
 
     # -- Stub test logic for Clients, VMs, Linux Hosts
     def test_client_config(idx: int):
@@ -293,6 +392,17 @@ def main(page: ft.Page):
         )
         return (success, message)
 
+    # -- Built views, reused between navigations --
+    view_cache = ViewCache(page)
+
+    def data_changed(*keys):
+        """
+        Call after changing clients / fleet / vms / linux_hosts / test_configs:
+        cached views built from that data are rebuilt on their next visit.
+        The view on screen made the change itself, so it is kept.
+        """
+        view_cache.invalidate(*keys, keep=page.route)
+
     # -- Route handler --
     def route_change(event: ft.RouteChangeEvent):
         route = event.route
@@ -302,38 +412,43 @@ def main(page: ft.Page):
             page.views.append(build_login_view())
         elif route == "/main":
             if user_data["logged_in"]:
-                page.views.append(build_tests_view())
+                page.views.append(view_cache.get(route, build_tests_view, depends=("user",)))
             else:
                 page.go("/")
         elif route.startswith("/test/"):
             test_id = route.replace("/test/", "")
             if test_id in test_configs and user_data["logged_in"]:
-                page.views.append(build_test_config_view(test_id))
+                page.views.append(view_cache.get(
+                    route, lambda: build_test_config_view(test_id), depends=("test_configs", "fleet")))
             else:
                 page.go("/main")
         elif route == "/clients":
             if user_data["logged_in"]:
-                page.views.append(build_clients_view())
+                page.views.append(view_cache.get(route, build_clients_view, depends=("clients", "fleet")))
             else:
                 page.go("/")
         elif route == "/settings":
             if user_data["logged_in"]:
-                page.views.append(build_settings_view())
+                page.views.append(view_cache.get(route, build_settings_view))
             else:
                 page.go("/")
         elif route == "/vms":
             if user_data["logged_in"]:
-                page.views.append(build_vms_view())
+                page.views.append(view_cache.get(route, build_vms_view, depends=("vms",)))
             else:
                 page.go("/")
         elif route == "/diagnostics":
             if user_data["logged_in"]:
-                page.views.append(build_diagnostics_view())
+                cached = route in view_cache
+                page.views.append(view_cache.get(route, build_diagnostics_view))
+                if cached and diagnostics_ui["refresh"]:
+                    # Samples kept arriving while the view was hidden; only changed hosts redraw
+                    diagnostics_ui["refresh"]()
             else:
                 page.go("/")
         elif route == "/linux_hosts":
             if user_data["logged_in"]:
-                page.views.append(build_linux_hosts_view())
+                page.views.append(view_cache.get(route, build_linux_hosts_view, depends=("linux_hosts",)))
             else:
                 page.go("/")
         else:
@@ -374,6 +489,9 @@ def main(page: ft.Page):
             if username_tf.value.strip() and password_tf.value.strip():
                 user_data["username"] = username_tf.value.strip()
                 user_data["logged_in"] = True
+                # Hosts are sampled for the whole session, whether or not Diagnostics is open
+                metrics_collector.start()
+                data_changed("user")
                 page.go("/main")
             else:
                 # 1) Create the snack bar
@@ -433,6 +551,10 @@ def main(page: ft.Page):
         def logout_click(e):
             user_data["logged_in"] = False
             user_data["username"] = ""
+            # Cached views hold credentials typed into them
+            view_cache.clear()
+            # No more sampling with this session's host credentials
+            metrics_collector.stop()
             page.go("/")
 
         def settings_click(e):
@@ -492,6 +614,7 @@ def main(page: ft.Page):
         test_password_tf = ft.TextField(label="Test Password", password=True, can_reveal_password=True, width=300, value=config["password"])
         server_ip_tf = ft.TextField(label="Server IP/Hostname", width=300, value=config["server_ip"])
         port_tf = ft.TextField(label="Port", width=300, value=config["port"])
+        secret_tf = ft.TextField(label="Shared Secret", password=True, can_reveal_password=True, width=300, value=config["shared_secret"])
         timeout_tf = ft.TextField(label="Timeout (seconds)", width=300, value=config["timeout"])
 
         eap_dropdown = ft.Dropdown(
@@ -577,12 +700,14 @@ def main(page: ft.Page):
             config["eap_type"] = eap_dropdown.value
             config["server_ip"] = server_ip_tf.value.strip()
             config["port"] = port_tf.value.strip()
+            config["shared_secret"] = secret_tf.value
             config["timeout"] = timeout_tf.value.strip()
 
             if inner_method_container.visible:
                 config["inner_method"] = inner_method_dropdown.value
                 config["anonymous_identity"] = anonymous_identity_tf.value.strip()
                 config["fast_provisioning"] = fast_provision_switch.value
+            data_changed("test_configs")
 
             print("===== TEST RUN =====")
             print(f"Test Title: {test_title}")
@@ -598,33 +723,133 @@ def main(page: ft.Page):
             print(f"Cert File: {config['certificate_file']}")
             print("====================\n")
 
-            if config.get('eap_type'):
-                eap_type = config.get('eap_type')
-                if eap_type == 'PEAP':
-                    success = run_peap_test(
+            def show_snack(message, bgcolor="#00ADEF"):
+                page.snack_bar = ft.SnackBar(
+                    ft.Text(message, color="white"),
+                    bgcolor=bgcolor,
+                    action="Close",
+                    on_action=lambda x: close_snack(x)
+                )
+                page.snack_bar.open = True
+                page.update()
+
+            eap_type = config.get('eap_type')
+            if eap_type == 'PEAP':
+                def worker():
+                    # Network I/O stays off the UI thread
+                    success, message = run_peap_test(
                         username=config["username"],
                         password=config["password"],
                         server_ip=config["server_ip"],
                         port=config["port"],
                         timeout=config["timeout"],
-                        inner_method=config["inner_method"]
+                        inner_method=config["inner_method"],
+                        secret=config["shared_secret"],
                     )
-                    print(f"PEAP test success? {success}")
-                else:
-                    print(f"Running test with EAP type: {eap_type} (no stub function yet).")
+                    print(f"PEAP test success? {success}: {message}")
+                    show_snack(message, "green" if success else "red")
+
+                threading.Thread(target=worker, daemon=True).start()
+            elif eap_type:
+                print(f"Running test with EAP type: {eap_type} (no stub function yet).")
+
+            show_snack(f"Running {test_title} with EAP={config['eap_type']} (Inner={config['inner_method']})")
+
+        # -- Load test: drive the RADIUS engine at a target rate --
+        load_rps_tf = ft.TextField(label="Target req/s", width=140, value="200")
+        load_ramp_tf = ft.TextField(label="Ramp (s)", width=140, value="10")
+        load_duration_tf = ft.TextField(label="Duration (s)", width=140, value="60")
+        load_supplicants_tf = ft.TextField(label="Supplicants", width=140, value="100")
+        load_method_dropdown = ft.Dropdown(
+            label="Request type",
+            width=200,
+            value="eap",
+            options=[ft.dropdown.Option("eap", "EAP start"), ft.dropdown.Option("pap", "PAP")],
+        )
+        load_use_fleet_switch = ft.Switch(
+            label="Use simulated client fleet",
+            value=client_fleet["fleet"] is not None,
+            disabled=client_fleet["fleet"] is None,
+        )
+        load_status_text = ft.Text("", size=13, font_family="monospace")
+        # Latency percentile ladder, bars scaled to the slowest percentile shown
+        load_percentiles = (50, 75, 90, 95, 99, 99.9)
+        load_bars = {p: ft.ProgressBar(value=0, width=260, color="#00ADEF") for p in load_percentiles}
+        load_bar_labels = {p: ft.Text(f"p{p}: -", size=13, width=160, font_family="monospace") for p in load_percentiles}
+        load_state = {"generator": None}
+
+        def show_load_report(report):
+            load_status_text.value = format_report(report) + ("\nFinished." if report.finished else "")
+            values = {p: report.overall.percentile(p) for p in load_percentiles}
+            slowest = max((v for v in values.values() if v), default=0)
+            for p, value in values.items():
+                load_bar_labels[p].value = f"p{p}: " + ("-" if value is None else f"{value * 1000:.2f} ms")
+                load_bars[p].value = value / slowest if value and slowest else 0
+            if report.finished:
+                load_start_button.disabled = False
+                load_stop_button.disabled = True
+            page.update()
 
-            # Show snack bar via open=True
-            snack = ft.SnackBar(
-                ft.Text(f"Running {test_title} with EAP={config['eap_type']} (Inner={config['inner_method']})", color="white"),
-                bgcolor="#00ADEF",
-                action="Close",
-                on_action=lambda x: close_snack(x)
-            )
-            print('Snack bar should be present..')
-            page.snack_bar = snack
-            page.snack_bar.open = True
+        def start_load(e):
+            try:
+                profile = LoadProfile(
+                    target_rps=float(load_rps_tf.value),
+                    ramp_seconds=float(load_ramp_tf.value or 0),
+                    duration_seconds=float(load_duration_tf.value),
+                )
+                supplicant_count = int(load_supplicants_tf.value)
+                port = int(port_tf.value.strip())
+            except ValueError:
+                load_status_text.value = "Rate, ramp, duration, supplicants and port must be numbers."
+                page.update()
+                return
+            if load_use_fleet_switch.value and client_fleet["fleet"] is not None:
+                # Each request comes from a fleet client: its MAC, NAS IP and own secret
+                supplicants = client_fleet["fleet"].supplicants(
+                    password=test_password_tf.value, default_secret=secret_tf.value
+                )
+                if not len(supplicants):
+                    # The engine only speaks RADIUS over UDP; don't quietly run a different test
+                    load_status_text.value = "The simulated fleet has no UDP clients (all are RadSec)."
+                    page.update()
+                    return
+            else:
+                supplicants = generated_supplicants(
+                    supplicant_count,
+                    prefix=test_username_tf.value.strip() or "simuser",
+                    password=test_password_tf.value,
+                )
+            load_state["generator"] = LoadGenerator(
+                server_ip_tf.value.strip(), port, secret_tf.value, profile, supplicants,
+                method=load_method_dropdown.value, on_report=show_load_report,
+            ).start()
+            load_start_button.disabled = True
+            load_stop_button.disabled = False
+            load_status_text.value = "Starting load test..."
+            page.update()
+
+        def stop_load(e):
+            if load_state["generator"]:
+                load_state["generator"].stop()
+            load_stop_button.disabled = True
             page.update()
 
+        load_start_button = ft.ElevatedButton("Start Load Test", color="white", bgcolor="#00ADEF", on_click=start_load)
+        load_stop_button = ft.ElevatedButton("Stop", color="white", bgcolor="red", on_click=stop_load, disabled=True)
+
+        load_container = ft.Column(
+            [
+                ft.Divider(),
+                ft.Text("Load Test", size=16, weight=ft.FontWeight.W_600),
+                ft.Row([load_rps_tf, load_ramp_tf, load_duration_tf, load_supplicants_tf], alignment=ft.MainAxisAlignment.CENTER),
+                ft.Row([load_method_dropdown, load_use_fleet_switch], alignment=ft.MainAxisAlignment.CENTER),
+                ft.Row([load_start_button, load_stop_button], alignment=ft.MainAxisAlignment.CENTER),
+                load_status_text,
+                ft.Column([ft.Row([load_bar_labels[p], load_bars[p]]) for p in load_percentiles]),
+            ],
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+        )
+
         def go_back(e):
             page.go("/main")
 
@@ -645,6 +870,7 @@ def main(page: ft.Page):
                 eap_dropdown,
                 server_ip_tf,
                 port_tf,
+                secret_tf,
                 timeout_tf,
                 inner_method_container,
                 cert_container,
@@ -654,6 +880,7 @@ def main(page: ft.Page):
                     color="white",
                     bgcolor="#00ADEF",
                 ),
+                load_container,
             ],
             vertical_alignment=ft.MainAxisAlignment.START,
             horizontal_alignment=ft.CrossAxisAlignment.CENTER,
@@ -665,17 +892,10 @@ def main(page: ft.Page):
 
     # -- 4. Clients View --
     def build_clients_view():
-        def update_client_list():
-            clients_col.controls.clear()
-            for idx, c in enumerate(clients):
-                row = build_client_section(idx, c)
-                clients_col.controls.append(row)
-            page.update()
-
-        def run_client_test(idx):
-            test_client_config(idx)
+        def run_client_test(c):
+            test_client_config(clients_list.index_of(c))
             snack = ft.SnackBar(
-                content=ft.Text(f"Test run for {clients[idx]['client_name']}", color="white"),
+                content=ft.Text(f"Test run for {c['client_name']}", color="white"),
                 bgcolor="#00ADEF",
                 action="Close",
                 on_action=lambda x: close_snack(x)
@@ -687,54 +907,52 @@ def main(page: ft.Page):
         client_cert_picker = ft.FilePicker(on_result=lambda e: handle_client_cert(e))
         page.overlay.append(client_cert_picker)
 
-        def open_client_cert_picker(index):
-            client_cert_picker.data = index
+        def open_client_cert_picker(c):
+            client_cert_picker.data = c
             client_cert_picker.pick_files(
                 allow_multiple=False,
                 dialog_title="Select Client Certificate"
             )
 
         def handle_client_cert(e: ft.FilePickerResultEvent):
+            c = e.control.data
             if e.files and len(e.files) > 0:
-                chosen_file = e.files[0].path
-                cl_idx = e.control.data
-                clients[cl_idx]["certificate_file"] = chosen_file
+                c["certificate_file"] = e.files[0].path
             else:
-                cl_idx = e.control.data
-                clients[cl_idx]["certificate_file"] = None
-            update_client_list()
+                c["certificate_file"] = None
+            clients_list.refresh(c)
 
-        def build_client_section(idx, c):
-            name_tf = ft.TextField(
+        client_validators = {"client_name": required, "mac_address": mac_address, "ip_address": ipv4_address}
+
+        def build_client_editor(c):
+            form = FormState(c, page, client_validators, on_commit=lambda item, fields: clients_list.touch(item, update=False))
+            name_tf = form.bind("client_name", ft.TextField(
                 label="Client Name",
                 width=200,
                 value=c["client_name"],
-                on_change=lambda e: save_changes(idx, "client_name", e.control.value)
-            )
-            mac_tf = ft.TextField(
+            ))
+            mac_tf = form.bind("mac_address", ft.TextField(
                 label="MAC Address",
                 width=200,
                 value=c["mac_address"],
-                on_change=lambda e: save_changes(idx, "mac_address", e.control.value)
-            )
-            ip_tf = ft.TextField(
+            ))
+            ip_tf = form.bind("ip_address", ft.TextField(
                 label="IP Address",
                 width=200,
                 value=c["ip_address"],
-                on_change=lambda e: save_changes(idx, "ip_address", e.control.value)
-            )
+            ))
 
             radsec_switch = ft.Switch(
                 label="Use RadSec?",
                 value=c["use_radsec"],
-                on_change=lambda e: toggle_radsec(idx, e.control.value)
+                on_change=lambda e: toggle_radsec(c, e.control.value)
             )
 
             pick_cert_btn = ft.ElevatedButton(
                 "Select RadSec Cert",
                 color="white",
                 bgcolor="#00ADEF",
-                on_click=lambda e: open_client_cert_picker(idx),
+                on_click=lambda e: open_client_cert_picker(c),
                 visible=c["use_radsec"]
             )
 
@@ -744,27 +962,26 @@ def main(page: ft.Page):
                 visible=c["use_radsec"]
             )
 
-            secret_tf = ft.TextField(
+            secret_tf = form.bind("client_secret", ft.TextField(
                 label="Client Secret",
                 width=200,
                 value=c["client_secret"],
                 password=True,
                 can_reveal_password=True,
                 visible=c["use_radsec"],
-                on_change=lambda e: save_changes(idx, "client_secret", e.control.value)
-            )
+            ))
 
             test_btn = ft.ElevatedButton(
                 "Test",
                 color="white",
                 bgcolor="#00ADEF",
-                on_click=lambda e, i=idx: run_client_test(i)
+                on_click=lambda e: (form.flush(), run_client_test(c))
             )
 
             remove_btn = ft.IconButton(
                 icon=ft.Icons.DELETE,
                 tooltip="Remove this client",
-                on_click=lambda e: remove_client(idx)
+                on_click=lambda e: (form.cancel(), clients_list.remove(c))
             )
 
             return ft.Column(
@@ -779,22 +996,15 @@ def main(page: ft.Page):
                 spacing=10
             )
 
-        def save_changes(index, field, new_value):
-            clients[index][field] = new_value
-
-        def toggle_radsec(index, new_value):
-            clients[index]["use_radsec"] = new_value
+        def toggle_radsec(c, new_value):
+            c["use_radsec"] = new_value
             if not new_value:
-                clients[index]["certificate_file"] = None
-                clients[index]["client_secret"] = ""
-            update_client_list()
-
-        def remove_client(index):
-            clients.pop(index)
-            update_client_list()
+                c["certificate_file"] = None
+                c["client_secret"] = ""
+            clients_list.refresh(c)
 
         def add_client(e):
-            clients.append({
+            clients_list.add({
                 "client_name": "NewClient",
                 "mac_address": "AA:BB:CC:DD:EE:FF",
                 "ip_address": "192.168.10.200",
@@ -802,7 +1012,6 @@ def main(page: ft.Page):
                 "certificate_file": None,
                 "client_secret": "",
             })
-            update_client_list()
 
         def save_client_config(e):
             snack = ft.SnackBar(
@@ -815,11 +1024,74 @@ def main(page: ft.Page):
             page.snack_bar.open = True
             page.update()
 
+        # -- Simulated fleet: thousands of clients generated from a template --
+        fleet_count_tf = ft.TextField(label="Clients", width=120, value="10000")
+        fleet_mac_tf = ft.TextField(label="First MAC", width=200, value="02:00:00:00:00:01")
+        fleet_ip_tf = ft.TextField(label="First IP or CIDR", width=200, value="10.100.0.0/16")
+        fleet_secret_tf = ft.TextField(label="Client Secret", width=200, password=True, can_reveal_password=True)
+        fleet_radsec_cb = ft.Checkbox(label="RadSec", value=False)
+        fleet_summary = ft.Text(
+            client_fleet["fleet"].summary() if client_fleet["fleet"] is not None else "No simulated fleet.",
+            size=14
+        )
+
+        def set_fleet(fleet):
+            client_fleet["fleet"] = fleet
+            data_changed("fleet")
+            fleet_summary.value = fleet.summary() if fleet is not None else "No simulated fleet."
+            page.update()
+
+        def generate_fleet(e):
+            try:
+                set_fleet(ClientFleet([FleetTemplate(
+                    name_prefix="SimClient",
+                    count=int(fleet_count_tf.value),
+                    mac_start=fleet_mac_tf.value.strip(),
+                    ip_start=fleet_ip_tf.value.strip(),
+                    client_secret=fleet_secret_tf.value,
+                    use_radsec=fleet_radsec_cb.value,
+                )]))
+            except ValueError as ex:
+                fleet_summary.value = f"Could not generate fleet: {ex}"
+                page.update()
+
+        def expand_clients(e):
+            # Every configured client is cloned `count` times, each into its own MAC / IP block
+            try:
+                count = int(fleet_count_tf.value)
+                set_fleet(ClientFleet.from_clients(clients, count))
+            except ValueError as ex:
+                fleet_summary.value = f"Could not generate fleet: {ex}"
+                page.update()
+
+        fleet_section = ft.Column(
+            [
+                ft.Divider(),
+                ft.Text("Simulated Client Fleet (for load tests)", size=16, weight=ft.FontWeight.W_600),
+                ft.Row([fleet_count_tf, fleet_mac_tf, fleet_ip_tf, fleet_secret_tf, fleet_radsec_cb], wrap=True),
+                ft.Row(
+                    [
+                        ft.ElevatedButton("Generate Fleet", color="white", bgcolor="#00ADEF", on_click=generate_fleet),
+                        ft.ElevatedButton("Expand Clients List", color="white", bgcolor="#00ADEF", on_click=expand_clients),
+                        ft.TextButton("Clear", on_click=lambda e: set_fleet(None)),
+                    ],
+                    spacing=20
+                ),
+                fleet_summary,
+            ]
+        )
+
         def go_back(e):
             page.go("/main")
 
-        clients_col = ft.Column(spacing=10)
-        update_client_list()
+        # Compact rows, one page at a time; editors are built only when a row is opened
+        clients_list = RecordList(
+            clients,
+            title=lambda c: c["client_name"],
+            subtitle=lambda c: f"{c['mac_address']}  {c['ip_address']}" + ("  RadSec" if c["use_radsec"] else ""),
+            build_editor=build_client_editor,
+            on_change=lambda c: data_changed("clients"),
+        )
 
         return ft.View(
             "/clients",
@@ -833,7 +1105,7 @@ def main(page: ft.Page):
                 ),
                 ft.Divider(),
                 ft.Text("Add, edit, or remove clients below. If 'Use RadSec' is enabled, configure a certificate and secret:", size=16),
-                clients_col,
+                clients_list.control,
                 ft.Row(
                     [
                         ft.ElevatedButton("Add Client", color="white", bgcolor="#00ADEF", on_click=add_client),
@@ -841,6 +1113,7 @@ def main(page: ft.Page):
                     ],
                     spacing=20
                 ),
+                fleet_section,
             ],
             vertical_alignment=ft.MainAxisAlignment.START,
             horizontal_alignment=ft.CrossAxisAlignment.CENTER,
@@ -849,45 +1122,93 @@ def main(page: ft.Page):
 
     # -- 5. VMs view --
     def build_vms_view():
-        def update_vms_list():
-            vms_col.controls.clear()
-            for idx, vm in enumerate(vms):
-                vms_col.controls.append(build_vm_section(idx, vm))
-            page.update()
-
         vm_key_picker = ft.FilePicker(on_result=lambda e: handle_vm_key(e))
         page.overlay.append(vm_key_picker)
 
-        def open_vm_key_picker(index):
-            vm_key_picker.data = index
+        def open_vm_key_picker(vm):
+            vm_key_picker.data = vm
             vm_key_picker.pick_files(allow_multiple=False, dialog_title="Select SSH Key File")
 
         def handle_vm_key(e: ft.FilePickerResultEvent):
+            vm = e.control.data
             if e.files and len(e.files) > 0:
-                chosen_file = e.files[0].path
-                idx = e.control.data
-                vms[idx]["ssh_key_file"] = chosen_file
+                vm["ssh_key_file"] = e.files[0].path
             else:
-                idx = e.control.data
-                vms[idx]["ssh_key_file"] = None
-            update_vms_list()
-
-        def run_wpa_supplicant(idx):
-            vm = vms[idx]
-            print("----- RUNNING WPA_SUPPLICANT -----")
-            print(f"VM: {vm['vm_name']} @ {vm['host']}:{vm['port']}")
-            print("Simulating remote SSH call to start wpa_supplicant...\n")
-
-        def run_eapol_test(idx):
-            vm = vms[idx]
-            print("----- RUNNING EAPOL_TEST -----")
-            print(f"VM: {vm['vm_name']} @ {vm['host']}:{vm['port']}")
-            print("Simulating remote SSH call to run eapol_test...\n")
-
-        def test_vm_button_click(idx):
-            test_vm_config(idx)
+                vm["ssh_key_file"] = None
+            vms_list.refresh(vm)
+
+        # -- EAP runs: render the selected test's config, push it over SFTP, stream output --
+        eap_test_dropdown = ft.Dropdown(
+            label="Test Config",
+            width=260,
+            value=tests[0]["id"],
+            options=[ft.dropdown.Option(t["id"], t["name"]) for t in tests],
+        )
+        eap_workers_tf = ft.TextField(label="Concurrency", width=120, value="16")
+        eap_summary_text = ft.Text("", size=14)
+        eap_stats_text = ft.Text(eap_phase_stats.summary() if eap_phase_stats.runs else "", size=13, font_family="monospace")
+        eap_output = ft.ListView(height=300, spacing=2, auto_scroll=True)
+        eap_output_state = {"last_update": 0.0}
+        eap_output_lock = threading.Lock()
+
+        def eap_event(vm_name, milestone, offset, line):
+            # Only EAP milestones are shown; the raw debug output is parsed and dropped.
+            # Many VMs stream at once, so redraw at most every 200 ms
+            with eap_output_lock:
+                eap_output.controls.append(
+                    ft.Text(f"[{vm_name}] +{offset * 1000:7.1f} ms  {milestone}", size=12, font_family="monospace")
+                )
+                if len(eap_output.controls) > 2000:
+                    del eap_output.controls[:500]
+                now = time.monotonic()
+                if now - eap_output_state["last_update"] < 0.2:
+                    return
+                eap_output_state["last_update"] = now
+            page.update()
+
+        def run_eap_tool(tool, selected):
+            try:
+                workers = int(eap_workers_tf.value)
+            except ValueError:
+                workers = 16
+            config = test_configs[eap_test_dropdown.value]
+            selected = list(selected)
+            for vm in selected:
+                status = vms_list.status_text(vm)
+                status.value = f"Running {tool}..."
+                status.color = None
+            eap_summary_text.value = f"Running {tool} on {len(selected)} VM(s)..."
+            page.update()
+
+            def on_result(pos, result):
+                if not result.error:
+                    eap_phase_stats.add(result.timing)
+                status = vms_list.status_text(selected[pos])
+                status.value = f"{tool}: {result.summary}"
+                status.color = "green" if result.success else "red"
+                page.update()
+
+            def worker():
+                started = time.monotonic()
+                results = run_on_vms(selected, config, tool, on_result=on_result, max_workers=workers, on_event=eap_event)
+                passed = sum(1 for r in results if r.success)
+                eap_summary_text.value = (f"{tool}: {passed}/{len(results)} passed "
+                                          f"in {time.monotonic() - started:.1f}s")
+                eap_stats_text.value = eap_phase_stats.summary()
+                page.update()
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        def run_wpa_supplicant(vm):
+            run_eap_tool("wpa_supplicant", [vm])
+
+        def run_eapol_test(vm):
+            run_eap_tool("eapol_test", [vm])
+
+        def test_vm_button_click(vm):
+            test_vm_config(vms_list.index_of(vm))
             snack = ft.SnackBar(
-                content=ft.Text(f"Test run for {vms[idx]['vm_name']}", color="white"),
+                content=ft.Text(f"Test run for {vm['vm_name']}", color="white"),
                 bgcolor="#00ADEF",
                 action="Close",
                 on_action=lambda x: close_snack(x)
@@ -896,30 +1217,31 @@ def main(page: ft.Page):
             page.snack_bar.open = True
             page.update()
 
-        def build_vm_section(idx, vm):
-            vm_name_tf = ft.TextField(label="VM Name", width=200, value=vm["vm_name"],
-                on_change=lambda e: save_vm_changes(idx, "vm_name", e.control.value))
-            host_tf = ft.TextField(label="Host/IP", width=200, value=vm["host"],
-                on_change=lambda e: save_vm_changes(idx, "host", e.control.value))
-            port_tf = ft.TextField(label="SSH Port", width=100, value=str(vm["port"]),
-                on_change=lambda e: save_vm_changes(idx, "port", e.control.value))
-            user_tf = ft.TextField(label="SSH Username", width=200, value=vm["ssh_user"],
-                on_change=lambda e: save_vm_changes(idx, "ssh_user", e.control.value))
-            pass_tf = ft.TextField(label="SSH Password", width=200, value=vm["ssh_password"],
-                password=True, can_reveal_password=True,
-                on_change=lambda e: save_vm_changes(idx, "ssh_password", e.control.value))
+        vm_validators = {"vm_name": required, "host": host_address, "port": port_number, "ssh_user": required}
+
+        def build_vm_editor(vm):
+            form = FormState(vm, page, vm_validators, on_commit=lambda item, fields: vms_list.touch(item, update=False))
+            vm_name_tf = form.bind("vm_name", ft.TextField(label="VM Name", width=200, value=vm["vm_name"]))
+            host_tf = form.bind("host", ft.TextField(label="Host/IP", width=200, value=vm["host"]))
+            port_tf = form.bind("port", ft.TextField(label="SSH Port", width=100, value=str(vm["port"])))
+            user_tf = form.bind("ssh_user", ft.TextField(label="SSH Username", width=200, value=vm["ssh_user"]))
+            pass_tf = form.bind("ssh_password", ft.TextField(label="SSH Password", width=200, value=vm["ssh_password"],
+                password=True, can_reveal_password=True))
 
             pick_key_btn = ft.ElevatedButton("Select SSH Key", color="white", bgcolor="#00ADEF",
-                on_click=lambda e: open_vm_key_picker(idx))
+                on_click=lambda e: open_vm_key_picker(vm))
             key_label = ft.Text(value=(f"Key: {vm['ssh_key_file']}" if vm["ssh_key_file"] else "No key selected"), size=14)
 
-            run_wpa_btn = ft.ElevatedButton("Test wpa_supplicant", on_click=lambda e: run_wpa_supplicant(idx))
-            run_eapol_btn = ft.ElevatedButton("Test eapol_test", on_click=lambda e: run_eapol_test(idx))
+            # Tests read the record, so commit anything still being typed first
+            run_wpa_btn = ft.ElevatedButton("Test wpa_supplicant",
+                on_click=lambda e: (form.flush(), run_wpa_supplicant(vm)))
+            run_eapol_btn = ft.ElevatedButton("Test eapol_test",
+                on_click=lambda e: (form.flush(), run_eapol_test(vm)))
             test_vm_btn = ft.ElevatedButton("Test VM", color="white", bgcolor="#00ADEF",
-                on_click=lambda e: test_vm_button_click(idx))
+                on_click=lambda e: (form.flush(), test_vm_button_click(vm)))
 
             remove_btn = ft.IconButton(icon=ft.Icons.DELETE, tooltip="Remove this VM",
-                on_click=lambda e: remove_vm(idx))
+                on_click=lambda e: (form.cancel(), vms_list.remove(vm)))
 
             return ft.Column(
                 [
@@ -933,20 +1255,8 @@ def main(page: ft.Page):
                 spacing=10
             )
 
-        def save_vm_changes(index, field, new_value):
-            if field == "port":
-                try:
-                    new_value = int(new_value)
-                except ValueError:
-                    new_value = 22
-            vms[index][field] = new_value
-
-        def remove_vm(index):
-            vms.pop(index)
-            update_vms_list()
-
         def add_vm(e):
-            vms.append({
+            vms_list.add({
                 "vm_name": "NewVM",
                 "host": "192.168.50.100",
                 "port": 22,
@@ -954,7 +1264,6 @@ def main(page: ft.Page):
                 "ssh_password": "",
                 "ssh_key_file": None,
             })
-            update_vms_list()
 
         def save_vm_config(e):
             snack = ft.SnackBar(
@@ -970,8 +1279,13 @@ def main(page: ft.Page):
         def go_back(e):
             page.go("/main")
 
-        vms_col = ft.Column(spacing=10)
-        update_vms_list()
+        vms_list = RecordList(
+            vms,
+            title=lambda vm: vm["vm_name"],
+            subtitle=lambda vm: f"{vm['ssh_user']}@{vm['host']}:{vm['port']}",
+            build_editor=build_vm_editor,
+            on_change=lambda vm: data_changed("vms"),
+        )
 
         return ft.View(
             "/vms",
@@ -985,7 +1299,22 @@ def main(page: ft.Page):
                 ),
                 ft.Divider(),
                 ft.Text("Add, edit, or remove VMs below. Then run wpa_supplicant or eapol_test via SSH:", size=16),
-                vms_col,
+                ft.Row(
+                    [
+                        eap_test_dropdown,
+                        eap_workers_tf,
+                        ft.ElevatedButton("eapol_test on All VMs", color="white", bgcolor="#00ADEF",
+                            on_click=lambda e: run_eap_tool("eapol_test", vms)),
+                        ft.ElevatedButton("wpa_supplicant on All VMs", color="white", bgcolor="#00ADEF",
+                            on_click=lambda e: run_eap_tool("wpa_supplicant", vms)),
+                    ],
+                    wrap=True,
+                    alignment=ft.MainAxisAlignment.CENTER,
+                ),
+                eap_summary_text,
+                eap_stats_text,
+                eap_output,
+                vms_list.control,
                 ft.Row(
                     [
                         ft.ElevatedButton("Add VM", color="white", bgcolor="#00ADEF", on_click=add_vm),
@@ -1001,14 +1330,8 @@ def main(page: ft.Page):
 
     # -- 6. Linux Hosts (Forescout) View --
     def build_linux_hosts_view():
-        def update_hosts_list():
-            hosts_col.controls.clear()
-            for idx, host in enumerate(linux_hosts):
-                hosts_col.controls.append(build_linux_host_section(idx, host))
-            page.update()
-
-        def test_linux_host_button_click(idx):
-            success, message = test_linux_host(idx)
+        def test_linux_host_button_click(host):
+            success, message = test_linux_host(hosts_list.index_of(host))
             # Show snack bar with SSH result
             snack = ft.SnackBar(
                 content=ft.Text(message, color="white"),
@@ -1020,65 +1343,92 @@ def main(page: ft.Page):
             page.snack_bar.open = True
             page.update()
 
+        def test_all_hosts_click(e):
+            try:
+                max_workers = max(1, int(concurrency_tf.value))
+            except ValueError:
+                max_workers = 16
+            hosts_snapshot = list(linux_hosts)
+            test_all_btn.disabled = True
+            summary_text.value = f"Testing {len(hosts_snapshot)} hosts (concurrency {max_workers})..."
+            for host in hosts_snapshot:
+                status = hosts_list.status_text(host)
+                status.value = "Testing..."
+                status.color = None
+            page.update()
+
+            def on_result(idx, success, message, latency):
+                status = hosts_list.status_text(hosts_snapshot[idx])
+                status.value = f"{'PASS' if success else 'FAIL'} ({latency:.2f}s): {message}"
+                status.color = "green" if success else "red"
+                page.update()
+
+            def worker():
+                summary = test_ssh_connections_parallel(hosts_snapshot, on_result=on_result, max_workers=max_workers)
+                lat = summary["latency"]
+                lat_text = ", ".join(f"{k}={v:.2f}s" for k, v in lat.items()) if lat else "n/a"
+                summary_text.value = f"Passed: {summary['passed']}  Failed: {summary['failed']}  Latency: {lat_text}"
+                test_all_btn.disabled = False
+                page.update()
+
+            # Keep the Flet event thread free while the fan-out runs
+            threading.Thread(target=worker, daemon=True).start()
+
         key_picker = ft.FilePicker(on_result=lambda e: handle_ssh_key(e))
         page.overlay.append(key_picker)
 
-        def open_key_picker(index):
-            key_picker.data = index
+        def open_key_picker(host):
+            key_picker.data = host
             key_picker.pick_files(
                 allow_multiple=False,
                 dialog_title="Select SSH Key File"
             )
 
         def handle_ssh_key(e: ft.FilePickerResultEvent):
+            host = e.control.data
             if e.files and len(e.files) > 0:
-                chosen_file = e.files[0].path
-                idx = e.control.data
-                linux_hosts[idx]["ssh_key_file"] = chosen_file
+                host["ssh_key_file"] = e.files[0].path
             else:
-                idx = e.control.data
-                linux_hosts[idx]["ssh_key_file"] = None
-            update_hosts_list()
+                host["ssh_key_file"] = None
+            hosts_list.refresh(host)
 
-        def build_linux_host_section(idx, host):
-            name_tf = ft.TextField(
+        host_validators = {"host_name": required, "ip_address": host_address, "port": port_number, "ssh_user": required}
+
+        def build_linux_host_editor(host):
+            form = FormState(host, page, host_validators, on_commit=lambda item, fields: hosts_list.touch(item, update=False))
+            name_tf = form.bind("host_name", ft.TextField(
                 label="Host Name",
                 width=200,
                 value=host["host_name"],
-                on_change=lambda e: save_changes(idx, "host_name", e.control.value)
-            )
-            ip_tf = ft.TextField(
+            ))
+            ip_tf = form.bind("ip_address", ft.TextField(
                 label="IP Address",
                 width=200,
                 value=host["ip_address"],
-                on_change=lambda e: save_changes(idx, "ip_address", e.control.value)
-            )
-            port_tf = ft.TextField(
+            ))
+            port_tf = form.bind("port", ft.TextField(
                 label="SSH Port",
                 width=100,
                 value=str(host["port"]),
-                on_change=lambda e: save_changes(idx, "port", e.control.value)
-            )
-            user_tf = ft.TextField(
+            ))
+            user_tf = form.bind("ssh_user", ft.TextField(
                 label="SSH Username",
                 width=200,
                 value=host["ssh_user"],
-                on_change=lambda e: save_changes(idx, "ssh_user", e.control.value)
-            )
-            pass_tf = ft.TextField(
+            ))
+            pass_tf = form.bind("ssh_password", ft.TextField(
                 label="SSH Password",
                 width=200,
                 value=host["ssh_password"],
                 password=True,
                 can_reveal_password=True,
-                on_change=lambda e: save_changes(idx, "ssh_password", e.control.value)
-            )
+            ))
 
             pick_key_btn = ft.ElevatedButton(
                 "Select SSH Key",
                 color="white",
                 bgcolor="#00ADEF",
-                on_click=lambda e: open_key_picker(idx)
+                on_click=lambda e: open_key_picker(host)
             )
             key_label = ft.Text(
                 value=(f"Key: {host['ssh_key_file']}" if host["ssh_key_file"] else "No key selected"),
@@ -1089,13 +1439,13 @@ def main(page: ft.Page):
                 "Test Host",
                 color="white",
                 bgcolor="#00ADEF",
-                on_click=lambda e, i=idx: test_linux_host_button_click(i)
+                on_click=lambda e: (form.flush(), test_linux_host_button_click(host))
             )
 
             remove_btn = ft.IconButton(
                 icon=ft.Icons.DELETE,
                 tooltip="Remove Host",
-                on_click=lambda e: remove_linux_host(idx)
+                on_click=lambda e: (form.cancel(), hosts_list.remove(host))
             )
 
             return ft.Column(
@@ -1104,26 +1454,14 @@ def main(page: ft.Page):
                     ft.Row([ip_tf, port_tf], wrap=True),
                     ft.Row([user_tf, pass_tf], wrap=True),
                     ft.Row([pick_key_btn, key_label], wrap=True),
-                    ft.Row([test_btn]),
+                    ft.Row([test_btn], wrap=True),
                     ft.Divider()
                 ],
                 spacing=10
             )
 
-        def save_changes(index, field, new_value):
-            if field == "port":
-                try:
-                    new_value = int(new_value)
-                except ValueError:
-                    new_value = 22
-            linux_hosts[index][field] = new_value
-
-        def remove_linux_host(index):
-            linux_hosts.pop(index)
-            update_hosts_list()
-
         def add_linux_host(e):
-            linux_hosts.append({
+            hosts_list.add({
                 "host_name": "NewLinuxHost",
                 "ip_address": "10.10.10.50",
                 "port": 22,
@@ -1131,7 +1469,6 @@ def main(page: ft.Page):
                 "ssh_password": "",
                 "ssh_key_file": None,
             })
-            update_hosts_list()
 
         def save_linux_config(e):
             snack = ft.SnackBar(
@@ -1147,8 +1484,16 @@ def main(page: ft.Page):
         def go_back(e):
             page.go("/main")
 
-        hosts_col = ft.Column(spacing=10)
-        update_hosts_list()
+        concurrency_tf = ft.TextField(label="Concurrency", width=120, value="16")
+        test_all_btn = ft.ElevatedButton("Test All Hosts", color="white", bgcolor="#00ADEF", on_click=test_all_hosts_click)
+        summary_text = ft.Text("", size=14)
+        hosts_list = RecordList(
+            linux_hosts,
+            title=lambda host: host["host_name"],
+            subtitle=lambda host: f"{host['ssh_user']}@{host['ip_address']}:{host['port']}",
+            build_editor=build_linux_host_editor,
+            on_change=lambda host: data_changed("linux_hosts"),
+        )
 
         return ft.View(
             "/linux_hosts",
@@ -1162,7 +1507,9 @@ def main(page: ft.Page):
                 ),
                 ft.Divider(),
                 ft.Text("Add, edit, or remove Forescout CounterACT hosts below. Then 'Test' to verify SSH connectivity:", size=16),
-                hosts_col,
+                ft.Row([test_all_btn, concurrency_tf], spacing=20),
+                summary_text,
+                hosts_list.control,
                 ft.Row(
                     [
                         ft.ElevatedButton("Add Host", color="white", bgcolor="#00ADEF", on_click=add_linux_host),
@@ -1236,43 +1583,47 @@ def main(page: ft.Page):
     # -- 8. Diagnostics View --
     def build_diagnostics_view():
         chart_container = ft.Column()
+        status_text = ft.Text("", size=14)
+
+        charts = DiagnosticsCharts(diagnostics_data, chart_container)
 
         def update_charts():
-            chart_container.controls.clear()
-            for host, data in diagnostics_data.items():
-                fig = create_line_chart_for_host(host, data)
-                chart_container.controls.append(fpc.PlotlyChart(fig, expand=True))
+            # Only charts whose host got new samples are re-rendered
+            structure_changed = charts.refresh()
+            errors = metrics_collector.errors
+            if errors:
+                status_text.value = "Unreachable: " + "; ".join(f"{h}: {msg}" for h, msg in errors.items())
+            elif not diagnostics_data.hosts():
+                status_text.value = "Waiting for the first samples (CPU needs two samples per host)..."
+            else:
+                status_text.value = ""
+            if structure_changed or status_text.page is None:
+                page.update()
+            else:
+                status_text.update()
+
+        def toggle_native_charts(e):
+            charts.set_mode("native" if e.control.value else "plotly")
+            charts.refresh()
             page.update()
 
-        def create_line_chart_for_host(hostname, data_dict):
-            df = {
-                "Time": data_dict["timestamps"],
-                "CPU": data_dict["cpu_percent"],
-                "Memory": data_dict["memory_percent"],
-            }
-            fig = px.line(
-                df,
-                x="Time",
-                y=["CPU", "Memory"],
-                title=f"Resource Usage for {hostname}",
-                markers=True
-            )
-            fig.update_layout(
-                xaxis_title="Timestamp",
-                yaxis_title="Percentage (%)",
-                legend_title="Metric"
-            )
-            return fig
+        def change_zoom(e):
+            # Re-query the full-resolution store for the new range; it is downsampled again
+            charts.set_range(ZOOM_LEVELS[e.control.value])
+            charts.refresh()
+            page.update()
+
+        zoom_dropdown = ft.Dropdown(
+            label="Range",
+            width=200,
+            value="All history",
+            options=[ft.dropdown.Option(label) for label in ZOOM_LEVELS],
+            on_change=change_zoom,
+        )
 
         def fetch_data_click(e):
-            import random
-            for host, d in diagnostics_data.items():
-                last_time = d["timestamps"][-1] if d["timestamps"] else 0
-                d["timestamps"].append(last_time + 1)
-                new_cpu = max(0, min(100, d["cpu_percent"][-1] + random.randint(-5, 5)))
-                new_mem = max(0, min(100, d["memory_percent"][-1] + random.randint(-2, 4)))
-                d["cpu_percent"].append(new_cpu)
-                d["memory_percent"].append(new_mem)
+            # Ask the collector for a round now; charts redraw when it finishes
+            metrics_collector.collect_now()
             update_charts()
 
         update_charts_button = ft.ElevatedButton(
@@ -1296,8 +1647,16 @@ def main(page: ft.Page):
                     alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                 ),
                 ft.Divider(),
-                ft.Text("Below is CPU/Memory usage fetched from remote hosts (simulated data).", size=16),
-                update_charts_button,
+                ft.Text("Below is CPU/Memory usage sampled over SSH from the Forescout hosts every 10 seconds.", size=16),
+                ft.Row(
+                    [
+                        update_charts_button,
+                        ft.Switch(label="Native charts", value=False, on_change=toggle_native_charts),
+                        zoom_dropdown,
+                    ],
+                    alignment=ft.MainAxisAlignment.CENTER,
+                ),
+                status_text,
                 chart_container
             ],
             vertical_alignment=ft.MainAxisAlignment.START,
@@ -1305,6 +1664,7 @@ def main(page: ft.Page):
             scroll=ft.ScrollMode.AUTO
         )
 
+        diagnostics_ui["refresh"] = update_charts
         update_charts()
         return view
 
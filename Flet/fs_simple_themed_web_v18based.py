@@ -3,6 +3,8 @@ import plotly.express as px
 import flet.plotly_chart as fpc
 import paramiko
 
+from downsample import DEFAULT_TARGET_POINTS, downsample
+
 # ---------------------- SSH TEST AREA ----------------------
 def test_ssh_connection(hostname, ip_address, port, username, password=None, key=None):
     """
@@ -796,17 +798,21 @@ def main(page: ft.Page):
             page.update()
 
         def create_line_chart_for_host(hostname, data_dict):
-            df = {
-                "Time": data_dict["timestamps"],
-                "CPU": data_dict["cpu_percent"],
-                "Memory": data_dict["memory_percent"],
-            }
+            # Each metric is downsampled on its own so the browser only receives
+            # about a chart-width of points however long the history gets
+            df = {"Time": [], "Value": [], "Metric": []}
+            for key, label in (("cpu_percent", "CPU"), ("memory_percent", "Memory")):
+                x, y = downsample(data_dict["timestamps"], data_dict[key], DEFAULT_TARGET_POINTS)
+                df["Time"].extend(x.tolist())
+                df["Value"].extend(y.tolist())
+                df["Metric"].extend([label] * len(x))
             fig = px.line(
                 df,
                 x="Time",
-                y=["CPU", "Memory"],
+                y="Value",
+                color="Metric",
                 title=f"Resource Usage for {hostname}",
-                markers=True
+                markers=len(df["Time"]) < 400
             )
             fig.update_layout(
                 xaxis_title="Timestamp",
@@ -0,0 +1,109 @@
+"""
+Server-side filtered search over Connect logs.
+
+The regex / level / time-range filter runs on the appliance as a single awk
+pass, so only the matching lines of the requested page cross the wire. awk
+also counts every match, which lets the UI page through results without
+ever holding the whole result set.
+
+Lines are expected to start with a "YYYY-MM-DD HH:MM:SS" timestamp; lines
+that don't (tracebacks, wrapped messages) inherit the timestamp and level of
+the line above them, so a multi-line ERROR entry is kept together.
+"""
+import shlex
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from ssh_pool import get_pool
+
+LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+PAGE_SIZE = 200
+TOTAL_MARKER = "__LOGQUERY_TOTAL__"
+
+# ENVIRON is used instead of -v so awk doesn't reinterpret backslashes in the regex
+_AWK_PROGRAM = r'''
+BEGIN { rx = ENVIRON["LQ_RX"]; lvl = ENVIRON["LQ_LEVEL"]; since = ENVIRON["LQ_SINCE"]; until_ = ENVIRON["LQ_UNTIL"]
+        first = ENVIRON["LQ_FIRST"] + 0; last = ENVIRON["LQ_LAST"] + 0; n = 0 }
+{
+    if ($0 ~ /^[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9][ T][0-9][0-9]:[0-9][0-9]:[0-9][0-9]/) {
+        ts = substr($0, 1, 19)
+        cur_level = ""
+        if (match($0, /(DEBUG|INFO|WARNING|WARN|ERROR|CRITICAL|SEVERE|FATAL)/)) cur_level = substr($0, RSTART, RLENGTH)
+    }
+    if (since != "" && ts < since) next
+    # a partial until ("2024-05-01", "2024-05-01 10") includes all of that day / hour
+    if (until_ != "" && substr(ts, 1, length(until_)) > until_) next
+    if (lvl != "" && cur_level !~ lvl) next
+    if (rx != "" && $0 !~ rx) next
+    n++
+    if (n >= first && n <= last) print
+}
+END { print "__LOGQUERY_TOTAL__ " n }
+'''
+
+
+@dataclass
+class LogQuery:
+    path: str
+    regex: str = ""
+    level: str = ""
+    since: str = ""
+    until: str = ""
+
+    def level_pattern(self):
+        """
+        Selected level and everything more severe, as an awk alternation.
+        """
+        if not self.level:
+            return ""
+        levels = LEVELS[LEVELS.index(self.level):] if self.level in LEVELS else [self.level]
+        if "WARNING" in levels:
+            levels.append("WARN")
+        if "CRITICAL" in levels:
+            levels += ["SEVERE", "FATAL"]
+        return "^(" + "|".join(levels) + ")$"
+
+    def command(self, page=0, page_size=PAGE_SIZE):
+        first = page * page_size + 1
+        env = {
+            "LQ_RX": self.regex,
+            "LQ_LEVEL": self.level_pattern(),
+            "LQ_SINCE": self.since.strip(),
+            "LQ_UNTIL": self.until.strip(),
+            "LQ_FIRST": str(first),
+            "LQ_LAST": str(first + page_size - 1),
+        }
+        assignments = " ".join(f"{k}={shlex.quote(v)}" for k, v in env.items())
+        return f"{assignments} LC_ALL=C awk {shlex.quote(_AWK_PROGRAM)} {shlex.quote(self.path)}"
+
+
+@dataclass
+class LogQueryPage:
+    lines: List[str] = field(default_factory=list)
+    total: int = 0
+    page: int = 0
+    page_size: int = PAGE_SIZE
+    error: Optional[str] = None
+
+    @property
+    def page_count(self):
+        return max(1, -(-self.total // self.page_size))
+
+
+def run_query(query, host, username, password=None, key_file=None, port=22, page=0, page_size=PAGE_SIZE):
+    """
+    Runs one page of a LogQuery on the appliance and returns a LogQueryPage.
+    """
+    exit_status, output, errors = get_pool().run_command(
+        host, port, username, query.command(page, page_size), password=password, key_file=key_file
+    )
+    lines = output.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    total = None
+    if lines and lines[-1].startswith(TOTAL_MARKER + " "):
+        total = int(lines.pop().split()[1])
+    if total is None:
+        return LogQueryPage(page=page, page_size=page_size,
+                            error=errors.strip() or f"Query failed (exit {exit_status})")
+    return LogQueryPage(lines=lines, total=total, page=page, page_size=page_size)
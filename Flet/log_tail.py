@@ -0,0 +1,116 @@
+"""
+Incremental tailing of remote log files over pooled SSH.
+
+Instead of `cat`-ing a whole (possibly hundreds of MB) log on every click,
+each (host, path) keeps the byte offset and inode it has read up to, and a
+refresh only pulls the bytes appended since then with `tail -c +N`. A change
+of inode (or the file shrinking) means the log was rotated, so reading
+restarts from the top of the new file. Only a bounded ring buffer of the
+most recent lines is kept for display.
+"""
+import shlex
+import threading
+from collections import deque
+
+from ssh_pool import get_pool
+
+# first look at a log only pulls its last 256KB
+INITIAL_BYTES = 256 * 1024
+# cap on a single refresh, so a burst of logging can't stall the UI
+MAX_FETCH_BYTES = 4 * 1024 * 1024
+MAX_LINES = 2000
+
+
+class LogTailState:
+    """
+    Read position and recent lines for one (host, path).
+    """
+
+    def __init__(self, max_lines=MAX_LINES):
+        self.inode = None
+        self.offset = 0
+        self.partial = b""
+        self.lines = deque(maxlen=max_lines)
+        self.lock = threading.Lock()
+
+    def text(self):
+        with self.lock:
+            lines = list(self.lines)
+            if self.partial:
+                lines.append(self.partial.decode("utf-8", errors="replace"))
+        return "\n".join(lines)
+
+
+class RemoteLogTailer:
+
+    def __init__(self, max_lines=MAX_LINES):
+        self.max_lines = max_lines
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def state(self, host, path):
+        with self._lock:
+            key = (host, path)
+            if key not in self._states:
+                self._states[key] = LogTailState(self.max_lines)
+            return self._states[key]
+
+    def reset(self, host, path):
+        with self._lock:
+            self._states.pop((host, path), None)
+
+    def _fetch_command(self, path, state):
+        quoted = shlex.quote(path)
+        # one round trip: current inode/size, then the new bytes from our offset (1-based for tail)
+        if state.inode is None:
+            # first look: start INITIAL_BYTES before the end, using the same stat the offset comes from
+            start = f"$(( $2 > {INITIAL_BYTES} ? $2 - {INITIAL_BYTES} + 1 : 1 ))"
+        else:
+            start = str(state.offset + 1)
+        return (
+            f"st=$(stat -c '%i %s' {quoted}) && set -- $st && echo \"$1 $2\" && "
+            f"tail -c +{start} {quoted} | head -c {MAX_FETCH_BYTES}"
+        )
+
+    def refresh(self, host, username, path, password=None, key_file=None, port=22):
+        """
+        Pulls whatever was appended to the log since the last refresh.
+        Returns (state, new_bytes). Raises RuntimeError with the remote error
+        text if the file can't be read.
+        """
+        state = self.state(host, path)
+        with state.lock:
+            command = self._fetch_command(path, state)
+            exit_status, output, errors = get_pool().run_command(
+                host, port, username, command, password=password, key_file=key_file, decode=False
+            )
+            if exit_status != 0 and not output:
+                raise RuntimeError(errors.strip() or f"Could not read {path} (exit {exit_status})")
+
+            stat_line, _, data = output.partition(b"\n")
+            inode, size = stat_line.decode("ascii", errors="ignore").split()
+            size = int(size)
+
+            first_fetch = state.inode is None
+            if first_fetch:
+                state.offset = max(0, size - INITIAL_BYTES)
+            elif inode != state.inode or size < state.offset:
+                # rotated or truncated: start over from the top of the new file
+                state.offset = 0
+                state.partial = b""
+                state.lines.append(f"--- log rotated ({path}) ---")
+                exit_status, data, errors = get_pool().run_command(
+                    host, port, username, f"head -c {MAX_FETCH_BYTES} {shlex.quote(path)}",
+                    password=password, key_file=key_file, decode=False
+                )
+            state.inode = inode
+
+            # offsets are counted in raw bytes, lines are only decoded once complete
+            state.offset += len(data)
+            pieces = (state.partial + data).split(b"\n")
+            state.partial = pieces.pop()
+            if first_fetch and state.offset > len(data) and pieces:
+                # started mid-file, the first line is only a fragment
+                pieces = pieces[1:]
+            state.lines.extend(p.decode("utf-8", errors="replace") for p in pieces)
+        return state, len(data)
@@ -0,0 +1,156 @@
+"""
+Background CPU / memory collector for the Diagnostics view.
+
+Every interval, each host in the Linux hosts list is sampled over the pooled
+SSH connection with a single combined command reading /proc/stat,
+/proc/meminfo and /proc/loadavg. CPU percentages are computed from the delta
+between a host's two most recent /proc/stat samples, so the first round for
+a host only primes it.
+
+The collector runs on its own thread and is owned by the app, not by the
+Diagnostics view, so rebuilding the view never resets or duplicates it.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ssh_pool import get_pool
+
+SAMPLE_COMMAND = (
+    "head -n 1 /proc/stat; "
+    "grep -E '^(MemTotal|MemAvailable|MemFree|Buffers|Cached):' /proc/meminfo; "
+    "cat /proc/loadavg"
+)
+
+
+def parse_sample(output):
+    """
+    Parses SAMPLE_COMMAND output into
+    {"cpu_total", "cpu_idle", "mem_percent", "load1", "load5", "load15"}.
+    """
+    sample = {}
+    meminfo = {}
+    for line in output.splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0] == "cpu":
+            values = [int(v) for v in parts[1:]]
+            # user nice system idle iowait irq softirq steal (guest is already counted in user)
+            values = values[:8]
+            sample["cpu_total"] = sum(values)
+            sample["cpu_idle"] = values[3] + (values[4] if len(values) > 4 else 0)
+        elif parts[0].endswith(":"):
+            meminfo[parts[0][:-1]] = int(parts[1])
+        elif len(parts) >= 3:
+            sample["load1"], sample["load5"], sample["load15"] = (float(p) for p in parts[:3])
+
+    total = meminfo.get("MemTotal")
+    if total:
+        available = meminfo.get("MemAvailable")
+        if available is None:
+            # kernels older than 3.14 don't report MemAvailable
+            available = meminfo.get("MemFree", 0) + meminfo.get("Buffers", 0) + meminfo.get("Cached", 0)
+        sample["mem_percent"] = max(0.0, min(100.0, 100.0 * (1 - available / total)))
+    return sample
+
+
+def cpu_percent(previous, current):
+    """
+    CPU busy percentage between two parsed samples, or None if it can't be
+    computed (first sample, counter reset).
+    """
+    if not previous or "cpu_total" not in previous or "cpu_total" not in current:
+        return None
+    total = current["cpu_total"] - previous["cpu_total"]
+    idle = current["cpu_idle"] - previous["cpu_idle"]
+    if total <= 0 or idle < 0:
+        return None
+    return max(0.0, min(100.0, 100.0 * (total - idle) / total))
+
+
+class MetricsCollector:
+    """
+    hosts_provider: callable returning the current list of host dicts
+                    (host_name, ip_address, port, ssh_user, ssh_password, ssh_key_file)
+    on_sample:      callable(host_name, timestamp, cpu, mem, load1) for every computed point
+    on_round:       optional callable() after each collection round
+    """
+
+    def __init__(self, hosts_provider, on_sample, on_round=None, interval=10, max_workers=16):
+        self.hosts_provider = hosts_provider
+        self.on_sample = on_sample
+        self.on_round = on_round
+        self.interval = interval
+        self.max_workers = max_workers
+        self.errors = {}
+
+        self._previous = {}
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._round_lock = threading.Lock()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            # each thread gets its own stop flag, so a start() right after stop()
+            # isn't cancelled by the old thread still finishing its round
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._loop, args=(self._stop,), name="metrics-collector", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread = None
+
+    def collect_now(self):
+        """
+        Asks the background thread to run a round right away.
+        """
+        self._wake.set()
+
+    def _loop(self, stop):
+        while not stop.is_set():
+            self.collect_round()
+            if stop.is_set():
+                break
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def collect_round(self):
+        with self._round_lock:
+            hosts = list(self.hosts_provider())
+            if hosts:
+                workers = max(1, min(self.max_workers, len(hosts)))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="metrics") as executor:
+                    list(executor.map(self._sample_host, hosts))
+            if self.on_round:
+                self.on_round()
+
+    def _sample_host(self, host):
+        name = host.get("host_name") or host.get("ip_address")
+        try:
+            exit_status, output, errors = get_pool().run_command(
+                host.get("ip_address"),
+                host.get("port") or 22,
+                host.get("ssh_user"),
+                SAMPLE_COMMAND,
+                password=host.get("ssh_password"),
+                key_file=host.get("ssh_key_file"),
+                timeout=15,
+            )
+            sample = parse_sample(output)
+        except Exception as e:
+            self.errors[name] = str(e)
+            return
+        self.errors.pop(name, None)
+
+        timestamp = time.time()
+        key = (host.get("ip_address"), host.get("port"))
+        cpu = cpu_percent(self._previous.get(key), sample)
+        self._previous[key] = sample
+        if cpu is None or "mem_percent" not in sample:
+            return
+        self.on_sample(name, timestamp, cpu, sample["mem_percent"], sample.get("load1"))
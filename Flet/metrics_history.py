@@ -0,0 +1,220 @@
+"""
+On-disk history of Diagnostics samples.
+
+Samples are appended to a local SQLite database (WAL mode) so history
+survives restarts and can be compared across runs. Storage is split into
+one segment table per UTC day, each clustered on (host, ts), so:
+
+- a range query only touches the days it overlaps, and inside each day
+  it is a single B-tree range scan for that host;
+- retention is enforced by dropping whole day tables instead of deleting
+  rows one by one, and older days can be rolled up to a coarser
+  resolution in place. The database uses incremental auto-vacuum, so
+  compact() also shrinks the file by the pages it freed.
+
+Queries return NumPy arrays shaped like TimeSeriesStore.window(), and
+only the requested range is ever read into memory.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.fs_diagnostics_history.sqlite')
+METRICS = ("cpu_percent", "memory_percent", "load1")
+SEGMENT_SECONDS = 86400
+# compaction defaults: keep raw samples for 7 days, 1-minute rollups for 90 days
+RAW_DAYS = 7
+RETENTION_DAYS = 90
+ROLLUP_SECONDS = 60
+
+
+def _segment_of(timestamp):
+    return int(timestamp // SEGMENT_SECONDS)
+
+
+def _table(segment):
+    return f"seg_{segment}"
+
+
+class MetricsHistory:
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = []
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # only takes effect before the first table exists; older files are converted once by VACUUM
+        self._db.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        if self._db.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            self._db.execute('VACUUM')
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS segments ('
+            ' segment INTEGER PRIMARY KEY, resolution REAL NOT NULL DEFAULT 0)'
+        )
+        self._segments = {
+            segment: resolution for segment, resolution in self._db.execute('SELECT segment, resolution FROM segments')
+        }
+
+    # -- Writing --
+    def add(self, host, timestamp, **metrics):
+        """
+        Buffers one sample; nothing touches the disk until flush().
+        Safe to call from the collector's worker threads.
+        """
+        row = (host, float(timestamp)) + tuple(
+            None if metrics.get(m) is None else float(metrics[m]) for m in METRICS
+        )
+        with self._lock:
+            self._pending.append(row)
+
+    def flush(self):
+        """
+        Writes all buffered samples in one transaction. Returns the row count.
+        """
+        with self._lock:
+            rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            by_segment = {}
+            for row in rows:
+                by_segment.setdefault(_segment_of(row[1]), []).append(row)
+            new_segments = [segment for segment in by_segment if segment not in self._segments]
+            self._db.execute('BEGIN')
+            try:
+                for segment, segment_rows in by_segment.items():
+                    self._ensure_segment(segment)
+                    self._db.executemany(
+                        f'INSERT OR REPLACE INTO {_table(segment)} (host, ts, {", ".join(METRICS)})'
+                        f' VALUES (?, ?{", ?" * len(METRICS)})',
+                        segment_rows
+                    )
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                # the rollback undid their CREATE TABLE too
+                for segment in new_segments:
+                    self._segments.pop(segment, None)
+                self._pending[:0] = rows
+                raise
+        return len(rows)
+
+    def _ensure_segment(self, segment):
+        if segment in self._segments:
+            return
+        columns = ", ".join(f"{m} REAL" for m in METRICS)
+        self._db.execute(
+            f'CREATE TABLE IF NOT EXISTS {_table(segment)} ('
+            f' host TEXT NOT NULL, ts REAL NOT NULL, {columns},'
+            f' PRIMARY KEY (host, ts)) WITHOUT ROWID'
+        )
+        self._db.execute('INSERT OR IGNORE INTO segments (segment) VALUES (?)', (segment,))
+        self._segments[segment] = 0
+
+    # -- Reading --
+    def hosts(self, since=None):
+        """
+        Hosts with at least one sample at or after `since` (all segments by default).
+        """
+        found = set()
+        with self._lock:
+            for segment in self._segments_between(since, None):
+                found.update(row[0] for row in self._db.execute(f'SELECT DISTINCT host FROM {_table(segment)}'))
+        return sorted(found)
+
+    def _segments_between(self, since, until):
+        first = None if since is None else _segment_of(since)
+        last = None if until is None else _segment_of(until)
+        return [
+            s for s in sorted(self._segments)
+            if (first is None or s >= first) and (last is None or s <= last)
+        ]
+
+    def query(self, host, since=None, until=None, bucket=None):
+        """
+        Returns {"timestamps": float64[], <metric>: float32[]} for a host
+        between since and until (epoch seconds, inclusive, None = open).
+
+        With bucket (seconds), samples are averaged per bucket inside SQLite
+        so a long range comes back already reduced.
+        """
+        lo = -np.inf if since is None else float(since)
+        hi = np.inf if until is None else float(until)
+        if bucket:
+            select = (
+                f'SELECT AVG(ts), {", ".join(f"AVG({m})" for m in METRICS)} FROM {{table}}'
+                f' WHERE host = ? AND ts BETWEEN ? AND ? GROUP BY CAST(ts / {float(bucket)} AS INTEGER) ORDER BY 1'
+            )
+        else:
+            select = f'SELECT ts, {", ".join(METRICS)} FROM {{table}} WHERE host = ? AND ts BETWEEN ? AND ? ORDER BY ts'
+
+        rows = []
+        with self._lock:
+            for segment in self._segments_between(since, until):
+                rows.extend(self._db.execute(select.format(table=_table(segment)), (host, lo, hi)))
+
+        data = np.array(rows, dtype=np.float64).reshape(-1, 1 + len(METRICS)) if rows else \
+            np.empty((0, 1 + len(METRICS)))
+        result = {"timestamps": data[:, 0].copy()}
+        for i, metric in enumerate(METRICS, start=1):
+            result[metric] = data[:, i].astype(np.float32)
+        return result
+
+    # -- Retention --
+    def compact(self, raw_days=RAW_DAYS, retention_days=RETENTION_DAYS, rollup_seconds=ROLLUP_SECONDS, now=None):
+        """
+        Drops day segments older than retention_days and rolls segments older
+        than raw_days up to rollup_seconds averages. Returns (dropped, rolled_up).
+        """
+        now = time.time() if now is None else now
+        today = _segment_of(now)
+        dropped = rolled_up = 0
+        with self._lock:
+            for segment in sorted(self._segments):
+                age = today - segment
+                if age > retention_days:
+                    self._db.execute(f'DROP TABLE IF EXISTS {_table(segment)}')
+                    self._db.execute('DELETE FROM segments WHERE segment = ?', (segment,))
+                    del self._segments[segment]
+                    dropped += 1
+                elif age > raw_days and self._segments[segment] < rollup_seconds:
+                    self._rollup(segment, rollup_seconds)
+                    rolled_up += 1
+        if dropped or rolled_up:
+            with self._lock:
+                # truncate the freed pages off the database file, then empty the WAL
+                # executescript steps the pragma to completion; execute() frees a single page
+                self._db.executescript('PRAGMA incremental_vacuum;')
+                self._db.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        return dropped, rolled_up
+
+    def _rollup(self, segment, rollup_seconds):
+        table = _table(segment)
+        previous = self._segments[segment]
+        averages = ", ".join(f"AVG({m})" for m in METRICS)
+        self._db.execute('BEGIN')
+        try:
+            self._db.execute(f'ALTER TABLE {table} RENAME TO {table}_raw')
+            del self._segments[segment]
+            self._ensure_segment(segment)
+            self._db.execute(
+                f'INSERT INTO {table} (host, ts, {", ".join(METRICS)})'
+                f' SELECT host, MIN(ts), {averages} FROM {table}_raw'
+                f' GROUP BY host, CAST(ts / {float(rollup_seconds)} AS INTEGER)'
+            )
+            self._db.execute(f'DROP TABLE {table}_raw')
+            self._db.execute('UPDATE segments SET resolution = ? WHERE segment = ?', (rollup_seconds, segment))
+            self._db.execute('COMMIT')
+        except Exception:
+            self._db.execute('ROLLBACK')
+            self._segments[segment] = previous
+            raise
+        self._segments[segment] = rollup_seconds
+
+    def close(self):
+        with self._lock:
+            self._db.close()
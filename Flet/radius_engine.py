@@ -0,0 +1,365 @@
+"""
+Asyncio RADIUS client (RFC 2865) for the RADIUS Simulation Engine.
+
+One UDP socket carries many Access-Requests at once. Each request gets an
+8-bit identifier that is unique among the requests in flight on its
+socket, and replies are matched back to their request by that identifier
+and checked against the Response Authenticator. Unanswered requests are
+retransmitted unchanged (same identifier and authenticator, as the RFC
+asks) until they run out of retries.
+
+Since identifiers are 8 bits, one socket can have at most 256 requests
+outstanding; RadiusClient opens as many sockets as the requested
+concurrency needs.
+
+Two request styles are supported:
+
+- "pap": User-Name + User-Password, answered with Accept / Reject.
+- "eap": User-Name + EAP-Message (EAP-Response/Identity), the first leg
+  of PEAP / TTLS / EAP-FAST. The server answering with an Access-Challenge
+  proves it is up and speaking EAP; the TLS tunnel itself is out of scope
+  here.
+"""
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import os
+import struct
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+ACCESS_REQUEST = 1
+ACCESS_ACCEPT = 2
+ACCESS_REJECT = 3
+ACCESS_CHALLENGE = 11
+CODE_NAMES = {
+    ACCESS_ACCEPT: "Access-Accept",
+    ACCESS_REJECT: "Access-Reject",
+    ACCESS_CHALLENGE: "Access-Challenge",
+}
+
+ATTR_USER_NAME = 1
+ATTR_USER_PASSWORD = 2
+ATTR_NAS_IP_ADDRESS = 4
+ATTR_NAS_PORT = 5
+ATTR_CALLING_STATION_ID = 31
+ATTR_NAS_IDENTIFIER = 32
+ATTR_EAP_MESSAGE = 79
+ATTR_MESSAGE_AUTHENTICATOR = 80
+
+MAX_IDS_PER_SOCKET = 256
+DEFAULT_NAS_IDENTIFIER = "fs-radius-sim"
+
+
+# -- Packet encoding --
+def encode_attributes(attributes):
+    """
+    [(type, bytes), ...] -> attribute bytes. Values longer than 253 bytes
+    (EAP-Message) are split over several attributes of the same type.
+    """
+    out = bytearray()
+    for attr_type, value in attributes:
+        for start in range(0, max(len(value), 1), 253):
+            chunk = value[start:start + 253]
+            out += struct.pack("!BB", attr_type, len(chunk) + 2) + chunk
+    return bytes(out)
+
+
+def decode_attributes(data):
+    """
+    Attribute bytes -> [(type, bytes), ...] in packet order.
+    """
+    attributes = []
+    i = 0
+    while i + 2 <= len(data):
+        attr_type, length = data[i], data[i + 1]
+        if length < 2 or i + length > len(data):
+            raise ValueError("malformed attribute")
+        attributes.append((attr_type, data[i + 2:i + length]))
+        i += length
+    return attributes
+
+
+def hide_password(password, secret, authenticator):
+    """
+    User-Password hiding from RFC 2865 section 5.2.
+    """
+    password = password.encode("utf-8") if isinstance(password, str) else password
+    # padded with NULs to a multiple of 16; an empty password is one block of NULs
+    padded = password + b"\x00" * (-len(password) % 16) if password else b"\x00" * 16
+    out = bytearray()
+    previous = authenticator
+    for start in range(0, len(padded), 16):
+        digest = hashlib.md5(secret + previous).digest()
+        block = (int.from_bytes(padded[start:start + 16], "big") ^ int.from_bytes(digest, "big")).to_bytes(16, "big")
+        out += block
+        previous = block
+    return bytes(out)
+
+
+def reveal_password(hidden, secret, authenticator):
+    out = bytearray()
+    previous = authenticator
+    for start in range(0, len(hidden), 16):
+        block = hidden[start:start + 16]
+        digest = hashlib.md5(secret + previous).digest()
+        out += bytes(a ^ b for a, b in zip(block, digest))
+        previous = block
+    return bytes(out).rstrip(b"\x00")
+
+
+def eap_identity(identity, eap_id=0):
+    """
+    EAP-Response/Identity packet.
+    """
+    identity = identity.encode("utf-8")
+    return struct.pack("!BBHB", 2, eap_id, 5 + len(identity), 1) + identity
+
+
+def build_packet(code, identifier, authenticator, attributes, secret=None, message_authenticator=False):
+    """
+    Assembles a packet. With message_authenticator, a Message-Authenticator
+    (HMAC-MD5 over the whole packet) is appended, as EAP requires.
+    """
+    if message_authenticator:
+        attributes = list(attributes) + [(ATTR_MESSAGE_AUTHENTICATOR, b"\x00" * 16)]
+    body = encode_attributes(attributes)
+    packet = struct.pack("!BBH", code, identifier, 20 + len(body)) + authenticator + body
+    if message_authenticator:
+        mac = hmac.new(secret, packet, hashlib.md5).digest()
+        packet = packet[:-16] + mac
+    return packet
+
+
+def response_authenticator(packet, request_authenticator, secret):
+    """
+    MD5(Code + ID + Length + RequestAuth + Attributes + Secret).
+    """
+    return hashlib.md5(packet[:4] + request_authenticator + packet[20:] + secret).digest()
+
+
+@dataclass
+class RadiusResult:
+    username: str
+    code: Optional[int] = None
+    latency: Optional[float] = None
+    attempts: int = 0
+    error: Optional[str] = None
+
+    @property
+    def ok(self):
+        return self.code in (ACCESS_ACCEPT, ACCESS_CHALLENGE)
+
+    @property
+    def outcome(self):
+        if self.error:
+            return self.error
+        return CODE_NAMES.get(self.code, f"code {self.code}")
+
+
+# -- Client --
+class _Endpoint(asyncio.DatagramProtocol):
+    """
+    One UDP socket plus the table of requests in flight on it.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.transport = None
+        self.pending = {}
+        self.free_ids = list(range(MAX_IDS_PER_SOCKET))
+        self.id_available = asyncio.Event()
+        self.id_available.set()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < 20:
+            return
+        entry = self.pending.get(data[1])
+        if entry is None:
+            return  # late reply to a request that already timed out
+        request_auth, secret, future = entry
+        if future.done():
+            return
+        length = struct.unpack("!H", data[2:4])[0]
+        data = data[:length]
+        if data[4:20] != response_authenticator(data, request_auth, secret):
+            return  # not for us / wrong secret; keep waiting
+        future.set_result(data)
+
+    def error_received(self, exc):
+        # ICMP port unreachable etc. fails everything waiting on this socket
+        for _, _, future in self.pending.values():
+            if not future.done():
+                future.set_exception(exc)
+
+    async def take_id(self):
+        while not self.free_ids:
+            self.id_available.clear()
+            await self.id_available.wait()
+        return self.free_ids.pop()
+
+    def release_id(self, identifier):
+        self.pending.pop(identifier, None)
+        self.free_ids.append(identifier)
+        self.id_available.set()
+
+
+class RadiusClient:
+    """
+    server, port: RADIUS server address (IPv4, IPv6 or hostname)
+    secret:       shared secret
+    timeout:      seconds to wait for each attempt
+    retries:      retransmissions after the first attempt
+    """
+
+    def __init__(self, server, port=1812, secret="", timeout=3.0, retries=2, nas_identifier=DEFAULT_NAS_IDENTIFIER):
+        self.server = server
+        self.port = int(port)
+        self.secret = secret.encode("utf-8") if isinstance(secret, str) else secret
+        self.timeout = float(timeout)
+        self.retries = int(retries)
+        self.nas_identifier = nas_identifier
+        self._endpoints = []
+        self._next = 0
+
+    async def open(self, sockets=1):
+        loop = asyncio.get_running_loop()
+        while len(self._endpoints) < sockets:
+            _, endpoint = await loop.create_datagram_endpoint(
+                lambda: _Endpoint(self), remote_addr=(self.server, self.port)
+            )
+            self._endpoints.append(endpoint)
+        return self
+
+    def close(self):
+        for endpoint in self._endpoints:
+            if endpoint.transport:
+                endpoint.transport.close()
+        self._endpoints = []
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def _endpoint(self):
+        # round-robin so identifiers are spread over every socket
+        endpoint = self._endpoints[self._next % len(self._endpoints)]
+        self._next += 1
+        return endpoint
+
+    def _attributes(self, username, password, method, calling_station_id, nas_ip):
+        attributes = [
+            (ATTR_USER_NAME, username.encode("utf-8")),
+            (ATTR_NAS_IDENTIFIER, self.nas_identifier.encode("utf-8")),
+            (ATTR_NAS_PORT, struct.pack("!I", 0)),
+        ]
+        if nas_ip:
+            attributes.append((ATTR_NAS_IP_ADDRESS, ipaddress.IPv4Address(nas_ip).packed))
+        if calling_station_id:
+            attributes.append((ATTR_CALLING_STATION_ID, calling_station_id.encode("utf-8")))
+        if method == "eap":
+            attributes.append((ATTR_EAP_MESSAGE, eap_identity(username)))
+        return attributes
+
+    async def authenticate(self, username, password="", method="pap", calling_station_id=None, nas_ip=None,
+                           secret=None):
+        """
+        Sends one Access-Request and waits for its reply, retransmitting on
+        timeout. Returns a RadiusResult; never raises for network errors.
+        nas_ip and secret simulate a request from a particular RADIUS client
+        (NAS-IP-Address, and that client's own shared secret).
+        """
+        if secret is None:
+            secret = self.secret
+        elif isinstance(secret, str):
+            secret = secret.encode("utf-8")
+        if not self._endpoints:
+            await self.open()
+        endpoint = self._endpoint()
+        identifier = await endpoint.take_id()
+        result = RadiusResult(username=username)
+        try:
+            authenticator = os.urandom(16)
+            attributes = self._attributes(username, password, method, calling_station_id, nas_ip)
+            if method == "pap":
+                attributes.append((ATTR_USER_PASSWORD, hide_password(password, secret, authenticator)))
+            packet = build_packet(ACCESS_REQUEST, identifier, authenticator, attributes,
+                                  secret=secret, message_authenticator=True)
+
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            endpoint.pending[identifier] = (authenticator, secret, future)
+            # retransmits run off a plain timer instead of wait_for(), which would
+            # cost an extra task per attempt; the future resolves to None when out of retries
+            timer = None
+
+            def send():
+                nonlocal timer
+                if future.done():
+                    return
+                if result.attempts > self.retries:
+                    future.set_result(None)
+                    return
+                result.attempts += 1
+                endpoint.transport.sendto(packet)
+                timer = loop.call_later(self.timeout, send)
+
+            started = time.perf_counter()
+            send()
+            try:
+                reply = await future
+            except OSError as e:
+                result.error = f"Network error: {e}"
+                return result
+            finally:
+                timer.cancel()
+            if reply is None:
+                result.error = f"No response after {result.attempts} attempts"
+                return result
+            result.code = reply[0]
+            result.latency = time.perf_counter() - started
+            return result
+        finally:
+            endpoint.release_id(identifier)
+
+    async def run_many(self, requests, concurrency=100, on_result=None):
+        """
+        Authenticates every (username, password) in `requests` with at most
+        `concurrency` in flight. Returns the results in request order.
+        """
+        requests = list(requests)
+        concurrency = max(1, min(concurrency, len(requests) or 1))
+        await self.open(sockets=-(-concurrency // MAX_IDS_PER_SOCKET))
+        limiter = asyncio.Semaphore(concurrency)
+
+        async def one(username, password, *rest):
+            async with limiter:
+                result = await self.authenticate(username, password, *rest)
+            if on_result:
+                on_result(result)
+            return result
+
+        return await asyncio.gather(*(one(*request) for request in requests))
+
+
+def run_requests(server, port, secret, requests, timeout=3.0, retries=2, concurrency=100, method="pap"):
+    """
+    Blocking wrapper around RadiusClient.run_many() for threads without an
+    event loop. Returns the list of RadiusResults.
+    """
+    async def go():
+        client = RadiusClient(server, port, secret, timeout=timeout, retries=retries)
+        try:
+            return await client.run_many(
+                [(username, password, method) for username, password in requests], concurrency
+            )
+        finally:
+            client.close()
+    return asyncio.run(go())
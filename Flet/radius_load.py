@@ -0,0 +1,344 @@
+"""
+Load generation for the RADIUS Simulation Engine.
+
+LoadGenerator drives radius_engine at a target request rate, open loop:
+requests are started on a fixed schedule whether or not earlier ones have
+been answered, so a slow server shows up as rising latency and timeouts
+instead of quietly lowering the offered load. The rate follows a
+LoadProfile (linear ramp, then hold) and requests rotate through a pool of
+simulated supplicants.
+
+Latencies go into LatencyHistogram, an HDR-style log-linear histogram:
+constant memory and about 1% relative error at any percentile, cheap
+enough to record every response and to read live.
+
+Run this module to benchmark the generator against the local stand-in
+server (in a separate process) at increasing rates.
+"""
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+
+from radius_engine import ACCESS_ACCEPT, ACCESS_CHALLENGE, ACCESS_REJECT, MAX_IDS_PER_SOCKET, RadiusClient
+
+# 2**8 sub-buckets per power of two -> bucket width under 1% of the value
+SUB_BUCKET_BITS = 8
+TICK_SECONDS = 0.005
+REPORT_SECONDS = 1.0
+DEFAULT_MAX_IN_FLIGHT = 4096
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of latencies, recorded in microseconds.
+    """
+
+    def __init__(self, max_seconds=120.0):
+        self.sub_buckets = 1 << SUB_BUCKET_BITS
+        self.max_value = int(max_seconds * 1e6)
+        self.counts = [0] * self._index(self.max_value) + [0]
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value):
+        # values below sub_buckets are exact; above, each power of two is split in sub_buckets / 2
+        exponent = max(0, value.bit_length() - SUB_BUCKET_BITS)
+        return exponent * (self.sub_buckets // 2) + (value >> exponent)
+
+    def _value_at(self, index):
+        half = self.sub_buckets // 2
+        if index < self.sub_buckets:
+            return index
+        exponent = (index - half) // half
+        return (index - exponent * half) << exponent
+
+    def record(self, seconds):
+        value = min(self.max_value, max(0, int(seconds * 1e6)))
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+
+    def merge(self, other):
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+
+    def percentile(self, p):
+        """
+        Latency in seconds at percentile p (0-100), or None when empty.
+        """
+        if not self.count:
+            return None
+        rank = max(1, int(round(p / 100.0 * self.count)))
+        seen = 0
+        for index, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self._value_at(index), self.max) / 1e6
+        return self.max / 1e6
+
+    def mean(self):
+        return self.total / self.count / 1e6 if self.count else None
+
+
+@dataclass
+class LoadProfile:
+    """
+    Ramps linearly from start_rps to target_rps over ramp_seconds, then
+    holds target_rps until duration_seconds (None = until stopped).
+    """
+    target_rps: float
+    ramp_seconds: float = 0.0
+    duration_seconds: float = 60.0
+    start_rps: float = 0.0
+
+    def rate_at(self, t):
+        if self.ramp_seconds and t < self.ramp_seconds:
+            return self.start_rps + (self.target_rps - self.start_rps) * t / self.ramp_seconds
+        return self.target_rps
+
+    def due_by(self, t):
+        """
+        Number of requests that should have been started by time t (integral of the rate).
+        """
+        ramp = min(t, self.ramp_seconds) if self.ramp_seconds else 0.0
+        count = self.start_rps * ramp + (self.target_rps - self.start_rps) * ramp * ramp / (2 * self.ramp_seconds) \
+            if self.ramp_seconds else 0.0
+        return count + self.target_rps * max(0.0, t - ramp)
+
+
+@dataclass
+class LoadReport:
+    elapsed: float = 0.0
+    target_rps: float = 0.0
+    sent: int = 0
+    completed: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    challenged: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    # requests the schedule asked for but the in-flight cap held back (client saturated)
+    skipped: int = 0
+    interval_rps: float = 0.0
+    interval: LatencyHistogram = field(default_factory=LatencyHistogram)
+    overall: LatencyHistogram = field(default_factory=LatencyHistogram)
+    finished: bool = False
+
+    @property
+    def throughput(self):
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def reject_rate(self):
+        return self.rejected / self.completed if self.completed else 0.0
+
+    @property
+    def timeout_rate(self):
+        return self.timeouts / self.completed if self.completed else 0.0
+
+    def percentiles(self, histogram=None):
+        histogram = histogram or self.overall
+        return {p: histogram.percentile(p) for p in (50, 95, 99)}
+
+
+def generated_supplicants(count, prefix="simuser", password="simpass"):
+    """
+    Default pool of (username, password, calling_station_id) supplicants.
+    """
+    return [
+        (f"{prefix}{i:05d}", password, "02-00-{:02X}-{:02X}-{:02X}-{:02X}".format(*(i.to_bytes(4, "big"))))
+        for i in range(count)
+    ]
+
+
+class LoadGenerator:
+    """
+    server, port, secret: RADIUS server to load
+    profile:              LoadProfile with the rate schedule
+    supplicants:          sequence of (username, password[, calling_station_id, nas_ip, secret])
+                          tuples to rotate through
+    on_report:            optional callable(LoadReport) every REPORT_SECONDS and at the end
+    """
+
+    def __init__(self, server, port, secret, profile, supplicants, method="pap", timeout=3.0, retries=1,
+                 on_report=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        self.server = server
+        self.port = port
+        self.secret = secret
+        self.profile = profile
+        # any sequence works, e.g. client_fleet's lazy FleetSupplicants
+        self.supplicants = supplicants if len(supplicants) else generated_supplicants(1)
+        self.method = method
+        self.timeout = timeout
+        self.retries = retries
+        self.on_report = on_report
+        self.max_in_flight = max_in_flight
+        self.report = LoadReport()
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="radius-load", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def wait(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def run(self):
+        """
+        Runs the whole load test on the calling thread. Returns the final LoadReport.
+        """
+        return asyncio.run(self._run())
+
+    async def _run(self):
+        report = self.report = LoadReport(target_rps=self.profile.target_rps)
+        client = RadiusClient(self.server, self.port, self.secret, timeout=self.timeout, retries=self.retries)
+        await client.open(sockets=-(-self.max_in_flight // MAX_IDS_PER_SOCKET))
+        tasks = set()
+        started = time.perf_counter()
+        next_report = REPORT_SECONDS
+        interval_start, interval_completed = 0.0, 0
+        supplicant = 0
+
+        async def one(username, password, calling_station_id=None, nas_ip=None, secret=None):
+            result = await client.authenticate(username, password, self.method, calling_station_id, nas_ip, secret)
+            report.completed += 1
+            if result.error:
+                if result.error.startswith("No response"):
+                    report.timeouts += 1
+                else:
+                    report.errors += 1
+                return
+            report.interval.record(result.latency)
+            report.overall.record(result.latency)
+            if result.code == ACCESS_ACCEPT:
+                report.accepted += 1
+            elif result.code == ACCESS_REJECT:
+                report.rejected += 1
+            elif result.code == ACCESS_CHALLENGE:
+                report.challenged += 1
+
+        try:
+            while not self._stop.is_set():
+                elapsed = time.perf_counter() - started
+                duration = self.profile.duration_seconds
+                if duration is not None and elapsed >= duration:
+                    break
+                due = int(self.profile.due_by(elapsed)) - report.sent - report.skipped
+                for _ in range(max(0, due)):
+                    if len(tasks) >= self.max_in_flight:
+                        report.skipped += 1
+                        continue
+                    task = asyncio.ensure_future(one(*self.supplicants[supplicant]))
+                    supplicant = (supplicant + 1) % len(self.supplicants)
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                    report.sent += 1
+
+                if elapsed >= next_report:
+                    self._publish(report, elapsed, len(tasks), interval_start, interval_completed)
+                    interval_start, interval_completed = elapsed, report.completed
+                    next_report += REPORT_SECONDS
+                await asyncio.sleep(TICK_SECONDS)
+
+            # let the requests already sent finish (or time out)
+            if tasks:
+                await asyncio.wait(list(tasks))
+        finally:
+            client.close()
+
+        report.finished = True
+        self._publish(report, time.perf_counter() - started, 0, interval_start, interval_completed)
+        return report
+
+    def _publish(self, report, elapsed, in_flight, interval_start, interval_completed):
+        report.elapsed = elapsed
+        report.in_flight = in_flight
+        report.target_rps = self.profile.rate_at(elapsed)
+        span = elapsed - interval_start
+        report.interval_rps = (report.completed - interval_completed) / span if span > 0 else 0.0
+        if self.on_report:
+            self.on_report(report)
+        report.interval = LatencyHistogram()
+
+
+def format_report(report):
+    """
+    Multi-line text summary of a LoadReport for logs and the UI.
+    """
+    def ms(value):
+        return "-" if value is None else f"{value * 1000:.2f} ms"
+
+    overall = report.percentiles()
+    lines = [
+        f"Elapsed {report.elapsed:.1f}s  target {report.target_rps:.0f} rps  "
+        f"actual {report.interval_rps:.0f} rps (avg {report.throughput:.0f})",
+        f"Sent {report.sent}  done {report.completed}  in flight {report.in_flight}  skipped {report.skipped}",
+        f"Accept {report.accepted}  Reject {report.rejected} ({report.reject_rate:.1%})  "
+        f"Challenge {report.challenged}  Timeouts {report.timeouts} ({report.timeout_rate:.1%})  Errors {report.errors}",
+        "Latency p50 {}  p95 {}  p99 {}  max {}".format(
+            ms(overall[50]), ms(overall[95]), ms(overall[99]),
+            ms(report.overall.max / 1e6 if report.overall.count else None)),
+    ]
+    return "\n".join(lines)
+
+
+def _benchmark():
+    """
+    Offers increasing loads to the stand-in server (own process, so it does
+    not share the GIL with the generator) and checks the achieved rate.
+    """
+    import multiprocessing
+
+    ready = multiprocessing.Queue()
+    server = multiprocessing.Process(target=_serve_standin, args=(ready,), daemon=True)
+    server.start()
+    host, port = ready.get(timeout=10)
+    try:
+        for rps in (500, 2000, 5000, 10000):
+            generator = LoadGenerator(host, port, "testing123", LoadProfile(rps, ramp_seconds=1, duration_seconds=5),
+                                      generated_supplicants(1000), timeout=2.0)
+            cpu = time.process_time()
+            report = generator.run()
+            cpu = time.process_time() - cpu
+            expected = LoadProfile(rps, ramp_seconds=1).due_by(5)
+            # client CPU per request bounds what this generator alone could sustain on one core
+            per_request = cpu / max(1, report.completed)
+            print(f"target {rps:>6} rps: sent {report.sent / expected:6.1%} of schedule, "
+                  f"throughput {report.throughput:7.0f} rps, "
+                  f"p50 {report.overall.percentile(50) * 1000:.2f} ms, p99 {report.overall.percentile(99) * 1000:.2f} ms, "
+                  f"timeouts {report.timeouts}, client CPU {per_request * 1e6:.0f} us/req "
+                  f"(~{1 / per_request:.0f} rps per core)")
+    finally:
+        server.terminate()
+
+
+def _serve_standin(ready):
+    from radius_standin import LocalRadiusServer
+    standin = LocalRadiusServer()
+    ready.put(standin.start())
+    threading.Event().wait()
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,171 @@
+"""
+Local stand-in RADIUS server for exercising radius_engine without a lab.
+
+Answers Access-Requests on a local UDP port:
+
+- PAP requests get Access-Accept when the username / password pair is in
+  `users` (or when `users` is None, for anyone), otherwise Access-Reject;
+- EAP requests get an Access-Challenge carrying an EAP-Request/PEAP Start,
+  like a real server opening the PEAP exchange.
+
+`delay` adds server-side latency and `drop_rate` silently drops that
+fraction of requests, so retransmission and timeouts can be tried out.
+Run it directly to serve on 127.0.0.1:1812 (secret "testing123").
+"""
+import asyncio
+import hashlib
+import hmac
+import random
+import struct
+import threading
+
+from radius_engine import (
+    ACCESS_ACCEPT, ACCESS_CHALLENGE, ACCESS_REJECT, ACCESS_REQUEST,
+    ATTR_EAP_MESSAGE, ATTR_MESSAGE_AUTHENTICATOR, ATTR_USER_NAME, ATTR_USER_PASSWORD,
+    decode_attributes, encode_attributes, reveal_password,
+)
+
+EAP_TYPE_PEAP = 25
+
+
+class _ServerProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        server = self.server
+        server.received += 1
+        if server.drop_rate and random.random() < server.drop_rate:
+            return
+        reply = server.handle(data)
+        if reply is None:
+            return
+        if server.delay:
+            asyncio.get_running_loop().call_later(server.delay, self.transport.sendto, reply, addr)
+        else:
+            self.transport.sendto(reply, addr)
+
+
+class LocalRadiusServer:
+
+    def __init__(self, users=None, secret="testing123", host="127.0.0.1", port=0, delay=0.0, drop_rate=0.0):
+        self.users = users
+        self.secret = secret.encode("utf-8")
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.drop_rate = drop_rate
+        self.received = 0
+        self._loop = None
+        self._thread = None
+        self._transport = None
+        self._ready = threading.Event()
+        self._error = None
+
+    # -- Packet handling --
+    def _sign(self, code, identifier, request_auth, attributes):
+        """
+        Builds a reply with a valid Message-Authenticator and Response Authenticator.
+        """
+        attributes = list(attributes) + [(ATTR_MESSAGE_AUTHENTICATOR, b"\x00" * 16)]
+        body = encode_attributes(attributes)
+        packet = bytearray(struct.pack("!BBH", code, identifier, 20 + len(body)) + request_auth + body)
+        packet[-16:] = hmac.new(self.secret, bytes(packet), hashlib.md5).digest()
+        packet[4:20] = hashlib.md5(bytes(packet[:4]) + request_auth + bytes(packet[20:]) + self.secret).digest()
+        return bytes(packet)
+
+    def handle(self, data):
+        """
+        Returns the reply to one request packet, or None to ignore it.
+        """
+        if len(data) < 20 or data[0] != ACCESS_REQUEST:
+            return None
+        identifier, request_auth = data[1], data[4:20]
+        try:
+            attributes = decode_attributes(data[20:struct.unpack("!H", data[2:4])[0]])
+        except ValueError:
+            return None
+        values = {}
+        for attr_type, value in attributes:
+            values.setdefault(attr_type, b"")
+            values[attr_type] += value
+
+        if ATTR_MESSAGE_AUTHENTICATOR in values:
+            unsigned = bytearray(data)
+            offset = data.find(bytes([ATTR_MESSAGE_AUTHENTICATOR, 18]) + values[ATTR_MESSAGE_AUTHENTICATOR], 20)
+            unsigned[offset + 2:offset + 18] = b"\x00" * 16
+            expected = hmac.new(self.secret, bytes(unsigned), hashlib.md5).digest()
+            if not hmac.compare_digest(expected, values[ATTR_MESSAGE_AUTHENTICATOR]):
+                return None  # wrong secret: real servers drop silently too
+
+        username = values.get(ATTR_USER_NAME, b"").decode("utf-8", "replace")
+        if ATTR_EAP_MESSAGE in values:
+            eap_id = (values[ATTR_EAP_MESSAGE][1] + 1) % 256 if len(values[ATTR_EAP_MESSAGE]) > 1 else 1
+            # EAP-Request, type PEAP, flags = Start
+            peap_start = struct.pack("!BBHBB", 1, eap_id, 6, EAP_TYPE_PEAP, 0x20)
+            return self._sign(ACCESS_CHALLENGE, identifier, request_auth, [(ATTR_EAP_MESSAGE, peap_start)])
+
+        password = reveal_password(values.get(ATTR_USER_PASSWORD, b""), self.secret, request_auth).decode("utf-8", "replace")
+        accepted = self.users is None or self.users.get(username) == password
+        return self._sign(ACCESS_ACCEPT if accepted else ACCESS_REJECT, identifier, request_auth, [])
+
+    # -- Lifecycle --
+    def start(self):
+        """
+        Serves on a background thread; returns (host, port) once listening.
+        Raises the bind error (port in use, bad address) if it can't listen.
+        """
+        self._ready.clear()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="radius-standin", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            self._thread.join()
+            raise self._error
+        return self.host, self.port
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._transport, _ = loop.run_until_complete(loop.create_datagram_endpoint(
+                lambda: _ServerProtocol(self), local_addr=(self.host, self.port)
+            ))
+            self.port = self._transport.get_extra_info("sockname")[1]
+        except Exception as e:
+            self._error = e
+            loop.close()
+            return
+        finally:
+            self._ready.set()
+        self._loop = loop
+        self._loop.run_forever()
+        self._transport.close()
+        self._loop.close()
+
+    def stop(self):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    server = LocalRadiusServer(port=1812)
+    print("Stand-in RADIUS server listening on %s:%d (secret testing123)" % server.start())
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,224 @@
+"""
+Paged list of editable records for the Clients, VMs and Linux Hosts views.
+
+Each record is shown as a compact, read-only row (a title, a detail line,
+a status line) and only gets its TextFields / buttons built when the user
+expands it. Only one page of rows exists at a time, so opening a view with
+hundreds of entries builds a few dozen light controls instead of hundreds
+of editors.
+
+Rows are cached per record and patched in place: adding, removing or
+changing one record updates that row (and the pager) rather than clearing
+and rebuilding the whole list.
+"""
+import flet as ft
+
+DEFAULT_PAGE_SIZE = 50
+
+
+class _Row:
+    def __init__(self, control, title, subtitle, editor_slot, expand_button):
+        self.control = control
+        self.title = title
+        self.subtitle = subtitle
+        self.editor_slot = editor_slot
+        self.expand_button = expand_button
+
+
+def _update(control):
+    # only controls already on the page can be updated on their own
+    if control.page is not None:
+        control.update()
+
+
+class RecordList:
+    """
+    items:        the list being edited; add() / remove() mutate it in place
+    title:        callable(item) -> str, the compact row's heading
+    subtitle:     callable(item) -> str, the compact row's detail line
+    build_editor: callable(item) -> ft.Control, built when a row is expanded
+    on_remove:    optional callable(item), called after a record is removed
+    on_change:    optional callable(item), called after a record is added,
+                  removed, or touched / refreshed following an edit
+    """
+
+    def __init__(self, items, title, subtitle, build_editor, on_remove=None, on_change=None,
+                 page_size=DEFAULT_PAGE_SIZE, height=560):
+        self.items = items
+        self.title = title
+        self.subtitle = subtitle
+        self.build_editor = build_editor
+        self.on_remove = on_remove
+        self.on_change = on_change
+        self.page_size = page_size
+        self.page_index = 0
+
+        self._rows = {}
+        self._status = {}
+        self._expanded = set()
+
+        self.list_view = ft.ListView(spacing=4, height=height)
+        self.page_label = ft.Text("", size=14)
+        self.prev_button = ft.IconButton(icon=ft.Icons.CHEVRON_LEFT, tooltip="Previous page",
+                                         on_click=lambda e: self.go_to(self.page_index - 1))
+        self.next_button = ft.IconButton(icon=ft.Icons.CHEVRON_RIGHT, tooltip="Next page",
+                                         on_click=lambda e: self.go_to(self.page_index + 1))
+        self.pager = ft.Row([self.prev_button, self.page_label, self.next_button],
+                            alignment=ft.MainAxisAlignment.CENTER)
+        self.control = ft.Column([self.list_view, self.pager])
+        self.render()
+
+    # -- Lookup --
+    def index_of(self, item):
+        """
+        Position of this exact record (by identity; two records may be equal).
+        """
+        for i, candidate in enumerate(self.items):
+            if candidate is item:
+                return i
+        return -1
+
+    def page_count(self):
+        return max(1, -(-len(self.items) // self.page_size))
+
+    def _visible(self):
+        start = self.page_index * self.page_size
+        return self.items[start:start + self.page_size]
+
+    def status_text(self, item):
+        """
+        The record's status line (test results etc.). Kept across re-renders,
+        so it can be set before or while the row is on screen.
+        """
+        status = self._status.get(id(item))
+        if status is None:
+            status = self._status[id(item)] = ft.Text("", size=14)
+        return status
+
+    # -- Rows --
+    def _row(self, item):
+        row = self._rows.get(id(item))
+        if row is None:
+            title = ft.Text(self.title(item), size=16, weight=ft.FontWeight.W_600)
+            subtitle = ft.Text(self.subtitle(item), size=13)
+            expand_button = ft.IconButton(icon=ft.Icons.EDIT, tooltip="Edit",
+                                          on_click=lambda e, it=item: self.toggle(it))
+            editor_slot = ft.Column([])
+            control = ft.Container(
+                ft.Column([
+                    ft.Row([ft.Column([title, subtitle], spacing=2, expand=True), expand_button]),
+                    self.status_text(item),
+                    editor_slot,
+                ], spacing=4),
+                padding=8,
+                border=ft.border.all(1, "#DDDDDD"),
+                border_radius=6,
+            )
+            row = self._rows[id(item)] = _Row(control, title, subtitle, editor_slot, expand_button)
+            if id(item) in self._expanded:
+                self._fill_editor(item, row)
+        return row
+
+    def _fill_editor(self, item, row):
+        expanded = id(item) in self._expanded
+        row.editor_slot.controls = [self.build_editor(item)] if expanded else []
+        row.expand_button.icon = ft.Icons.EXPAND_LESS if expanded else ft.Icons.EDIT
+        row.expand_button.tooltip = "Close editor" if expanded else "Edit"
+
+    def render(self):
+        """
+        Fills the list with the current page's rows (doesn't send anything).
+        """
+        self.page_index = max(0, min(self.page_index, self.page_count() - 1))
+        self.list_view.controls = [self._row(item).control for item in self._visible()]
+        self.render_pager()
+
+    def go_to(self, page_index):
+        self.page_index = page_index
+        self.render()
+        _update(self.control)
+
+    # -- Patching single records --
+    def toggle(self, item):
+        if id(item) in self._expanded:
+            self._expanded.discard(id(item))
+        else:
+            self._expanded.add(id(item))
+        row = self._row(item)
+        self._fill_editor(item, row)
+        _update(row.control)
+
+    def touch(self, item, update=True):
+        """
+        Re-reads the compact title / detail of a record after an edit.
+        update=False leaves sending the change to the caller's page.update().
+        """
+        row = self._rows.get(id(item))
+        if row is not None:
+            row.title.value = self.title(item)
+            row.subtitle.value = self.subtitle(item)
+            if update:
+                _update(row.title)
+                _update(row.subtitle)
+        self._changed(item)
+
+    def refresh(self, item):
+        """
+        Rebuilds one record's editor (e.g. after a file pick changed it).
+        """
+        row = self._rows.get(id(item))
+        if row is not None:
+            row.title.value = self.title(item)
+            row.subtitle.value = self.subtitle(item)
+            self._fill_editor(item, row)
+            _update(row.control)
+        self._changed(item)
+
+    def add(self, item, expand=True):
+        """
+        Appends a record and shows it (on the last page), opened for editing.
+        """
+        self.items.append(item)
+        if expand:
+            self._expanded.add(id(item))
+        last_page = self.page_count() - 1
+        if self.page_index == last_page and len(self.list_view.controls) < self.page_size:
+            self.list_view.controls.append(self._row(item).control)
+            self.render_pager()
+            _update(self.control)
+        else:
+            self.go_to(last_page)
+        self._changed(item)
+
+    def remove(self, item):
+        index = self.index_of(item)
+        if index < 0:
+            return
+        self.items.pop(index)
+        row = self._rows.pop(id(item), None)
+        self._status.pop(id(item), None)
+        self._expanded.discard(id(item))
+        on_page = row is not None and row.control in self.list_view.controls
+        if on_page and self.page_index < self.page_count():
+            self.list_view.controls.remove(row.control)
+            # pull the first record of the next page up to keep the page full
+            visible = self._visible()
+            if len(visible) > len(self.list_view.controls):
+                self.list_view.controls.append(self._row(visible[-1]).control)
+            self.render_pager()
+            _update(self.control)
+        else:
+            self.go_to(self.page_index)
+        if self.on_remove:
+            self.on_remove(item)
+        self._changed(item)
+
+    def _changed(self, item):
+        if self.on_change:
+            self.on_change(item)
+
+    def render_pager(self):
+        self.page_label.value = f"Page {self.page_index + 1} of {self.page_count()}  ({len(self.items)} total)"
+        self.prev_button.disabled = self.page_index == 0
+        self.next_button.disabled = self.page_index >= self.page_count() - 1
+        self.pager.visible = len(self.items) > self.page_size
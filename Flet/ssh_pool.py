@@ -0,0 +1,348 @@
+"""
+Process-wide pool of authenticated Paramiko connections.
+
+Connections are keyed by (host, port, username, auth fingerprint) so repeat
+commands against the same appliance reuse one authenticated transport and
+just open a new channel per command, instead of paying a full key exchange
+and login on every button click.
+"""
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import paramiko
+
+
+def auth_fingerprint(password=None, key_file=None):
+    """
+    Returns a short hash identifying the credentials, so the pool key never
+    holds the password itself. Key files are fingerprinted by path + mtime,
+    so swapping the key on disk forces a fresh login.
+    """
+    digest = hashlib.sha256()
+    if key_file:
+        digest.update(b"key:")
+        digest.update(os.path.abspath(key_file).encode("utf-8"))
+        try:
+            digest.update(str(os.path.getmtime(key_file)).encode("utf-8"))
+        except OSError:
+            pass
+    else:
+        digest.update(b"pw:")
+        digest.update((password or "").encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class PooledConnection:
+    """
+    One authenticated SSHClient plus the bookkeeping the pool needs
+    (how many channels are open on it and when it was last used).
+    """
+
+    def __init__(self, key, client):
+        self.key = key
+        self.client = client
+        self.in_use = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def transport(self):
+        return self.client.get_transport()
+
+    def is_healthy(self):
+        """
+        Local state only (no I/O, safe under the pool lock): a transport
+        that is still open and authenticated. It can still be dead on the
+        wire; check() does a real round trip.
+        """
+        transport = self.transport
+        return transport is not None and transport.is_active() and transport.is_authenticated()
+
+    def ping(self, timeout):
+        """
+        Round trip to the server: opens and closes a session channel.
+        Raises if the server doesn't answer within timeout.
+        """
+        channel = self.transport.open_session(timeout=timeout)
+        channel.close()
+
+    def close(self):
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+
+class SSHConnectionPool:
+    """
+    Keeps authenticated connections alive between commands.
+
+    - max_per_host: max number of transports opened for one pool key
+    - max_channels: concurrent channels allowed on a single transport
+      (OpenSSH's MaxSessions defaults to 10)
+    - idle_timeout: seconds an unused connection is kept before eviction
+    - keepalive: seconds between SSH keepalive packets
+    """
+
+    def __init__(self, max_per_host=2, max_channels=8, idle_timeout=300, keepalive=30, connect_timeout=10):
+        self.max_per_host = max_per_host
+        self.max_channels = max_channels
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.connect_timeout = connect_timeout
+
+        self._connections = {}
+        self._opening = {}
+        self._cond = threading.Condition()
+        self._reaper = None
+        self._closed = False
+
+    # -- Connection lifecycle --
+    def _connect(self, hostname, port, username, password=None, key_file=None):
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            if key_file:
+                private_key = paramiko.RSAKey.from_private_key_file(key_file)
+                client.connect(
+                    hostname=hostname,
+                    port=port,
+                    username=username,
+                    pkey=private_key,
+                    timeout=self.connect_timeout
+                )
+            else:
+                client.connect(
+                    hostname=hostname,
+                    port=port,
+                    username=username,
+                    password=password,
+                    timeout=self.connect_timeout
+                )
+        except Exception:
+            client.close()
+            raise
+        if self.keepalive:
+            client.get_transport().set_keepalive(self.keepalive)
+        return client
+
+    def _start_reaper(self):
+        if self._reaper is None or not self._reaper.is_alive():
+            self._reaper = threading.Thread(target=self._reap_loop, name="ssh-pool-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        interval = max(1, min(30, self.idle_timeout / 2))
+        while not self._closed:
+            time.sleep(interval)
+            self.evict_idle()
+
+    def evict_idle(self):
+        """
+        Closes connections that have sat unused for longer than idle_timeout
+        or whose transport has died.
+        """
+        now = time.monotonic()
+        stale = []
+        with self._cond:
+            for key, conns in list(self._connections.items()):
+                for conn in list(conns):
+                    if conn.in_use:
+                        continue
+                    if now - conn.last_used > self.idle_timeout or not conn.is_healthy():
+                        conns.remove(conn)
+                        stale.append(conn)
+                if not conns:
+                    del self._connections[key]
+            if stale:
+                self._cond.notify_all()
+        for conn in stale:
+            conn.close()
+        return len(stale)
+
+    def acquire(self, hostname, port, username, password=None, key_file=None):
+        """
+        Returns a PooledConnection with one channel slot reserved for the
+        caller. Reuses a healthy transport when one has room, otherwise opens
+        a new one (up to max_per_host) or waits for a slot to free up.
+        Must be paired with release().
+        """
+        port = int(port or 22)
+        key = (hostname, port, username, auth_fingerprint(password, key_file))
+        deadline = time.monotonic() + self.connect_timeout * 3
+
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("SSH connection pool is closed")
+                conns = self._connections.setdefault(key, [])
+                for conn in list(conns):
+                    if conn.in_use >= self.max_channels:
+                        continue
+                    if not conn.is_healthy():
+                        if not conn.in_use:
+                            conns.remove(conn)
+                            conn.close()
+                        continue
+                    conn.in_use += 1
+                    conn.last_used = time.monotonic()
+                    break
+                else:
+                    conn = None
+                    if len(conns) + self._opening.get(key, 0) < self.max_per_host:
+                        self._opening[key] = self._opening.get(key, 0) + 1
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(f"No free SSH channel to {hostname}:{port} in the pool")
+                        self._cond.wait(timeout=remaining)
+                        continue
+            if conn is not None:
+                return conn
+            break
+
+        # Open the new transport outside the lock so other hosts aren't blocked.
+        try:
+            client = self._connect(hostname, port, username, password=password, key_file=key_file)
+        except Exception:
+            with self._cond:
+                self._opening[key] -= 1
+                self._cond.notify_all()
+            raise
+
+        conn = PooledConnection(key, client)
+        conn.in_use = 1
+        with self._cond:
+            self._opening[key] -= 1
+            self._connections.setdefault(key, []).append(conn)
+            self._start_reaper()
+        return conn
+
+    def release(self, conn, discard=False):
+        with self._cond:
+            conn.in_use = max(0, conn.in_use - 1)
+            conn.last_used = time.monotonic()
+            if discard or not conn.is_healthy():
+                conns = self._connections.get(conn.key, [])
+                if conn in conns and not conn.in_use:
+                    conns.remove(conn)
+                    conn.close()
+            self._cond.notify_all()
+
+    @contextmanager
+    def connection(self, hostname, port, username, password=None, key_file=None):
+        conn = self.acquire(hostname, port, username, password=password, key_file=key_file)
+        broken = False
+        try:
+            yield conn
+        except (paramiko.SSHException, EOFError, OSError):
+            broken = True
+            raise
+        finally:
+            self.release(conn, discard=broken)
+
+    # -- Commands --
+    def run_command(self, hostname, port, username, command, password=None, key_file=None, timeout=None, decode=True):
+        """
+        Runs a command on a fresh channel of a pooled transport.
+        Returns (exit_status, stdout, stderr); stdout is raw bytes when
+        decode is False.
+        """
+        with self.connection(hostname, port, username, password=password, key_file=key_file) as conn:
+            stdin, stdout, stderr = conn.client.exec_command(command, timeout=timeout)
+            stdin.close()
+            output = stdout.read()
+            if decode:
+                output = output.decode("utf-8", errors="ignore")
+            errors = stderr.read().decode("utf-8", errors="ignore")
+            exit_status = stdout.channel.recv_exit_status()
+            return exit_status, output, errors
+
+    def stream_command(self, hostname, port, username, command, on_line, password=None, key_file=None, timeout=None):
+        """
+        Runs a command and calls on_line(line) for each line of combined
+        stdout/stderr as it arrives. Returns the exit status.
+        """
+        with self.connection(hostname, port, username, password=password, key_file=key_file) as conn:
+            stdin, stdout, _ = conn.client.exec_command(command, timeout=timeout)
+            stdout.channel.set_combined_stderr(True)
+            stdin.close()
+            for line in stdout:
+                on_line(line.rstrip("\r\n"))
+            return stdout.channel.recv_exit_status()
+
+    def upload(self, hostname, port, username, data, remote_path, mode=0o600, password=None, key_file=None):
+        """
+        Writes bytes to remote_path over SFTP on a pooled transport.
+        """
+        with self.connection(hostname, port, username, password=password, key_file=key_file) as conn:
+            sftp = conn.client.open_sftp()
+            try:
+                with sftp.open(remote_path, "wb") as remote:
+                    remote.chmod(mode)
+                    remote.write(data)
+            finally:
+                sftp.close()
+
+    def remove(self, hostname, port, username, remote_paths, password=None, key_file=None):
+        """
+        Deletes remote files over SFTP; files that are already gone are ignored.
+        """
+        with self.connection(hostname, port, username, password=password, key_file=key_file) as conn:
+            sftp = conn.client.open_sftp()
+            try:
+                for remote_path in remote_paths:
+                    try:
+                        sftp.remove(remote_path)
+                    except FileNotFoundError:
+                        pass
+            finally:
+                sftp.close()
+
+    def check(self, hostname, port, username, password=None, key_file=None):
+        """
+        Proves the host answers right now: a round trip on a pooled transport
+        (done outside the pool lock). A pooled transport that doesn't answer
+        is dropped and one fresh login is tried. Raises the underlying
+        Paramiko / socket error on failure.
+        """
+        for attempt in range(2):
+            conn = self.acquire(hostname, port, username, password=password, key_file=key_file)
+            try:
+                conn.ping(self.connect_timeout)
+            except Exception:
+                self.release(conn, discard=True)
+                if attempt:
+                    raise
+                continue
+            self.release(conn)
+            return True
+
+    def close_all(self):
+        with self._cond:
+            conns = [c for cs in self._connections.values() for c in cs]
+            self._connections.clear()
+            self._cond.notify_all()
+        for conn in conns:
+            conn.close()
+
+    def shutdown(self):
+        self._closed = True
+        self.close_all()
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool():
+    """
+    Returns the process-wide SSHConnectionPool, creating it on first use.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = SSHConnectionPool()
+        return _POOL
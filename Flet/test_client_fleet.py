@@ -0,0 +1,27 @@
+import pytest
+
+from client_fleet import ClientFleet, FleetTemplate
+
+ADJACENT_CLIENTS = [
+    {"client_name": "TestClient1", "mac_address": "AA:BB:CC:DD:EE:01", "ip_address": "192.168.10.101",
+     "use_radsec": False, "certificate_file": None, "client_secret": ""},
+    {"client_name": "TestClient2", "mac_address": "AA:BB:CC:DD:EE:02", "ip_address": "192.168.10.102",
+     "use_radsec": True, "certificate_file": "/path/to/cert.pem", "client_secret": "supersecret"},
+]
+
+
+def test_expanded_adjacent_clients_get_unique_macs_and_ips():
+    fleet = ClientFleet.from_clients(ADJACENT_CLIENTS, 1000)
+    assert len(fleet) == 2000
+    assert len(set(fleet.macs.tolist())) == 2000
+    assert len(set(fleet.ips.tolist())) == 2000
+
+
+def test_add_rejects_overlapping_ranges():
+    fleet = ClientFleet([FleetTemplate("A", 10, mac_start="02:00:00:00:00:01", ip_start="10.0.0.1")])
+    with pytest.raises(ValueError):
+        fleet.add(FleetTemplate("B", 10, mac_start="02:00:00:00:00:05", ip_start="10.1.0.1"))
+    with pytest.raises(ValueError):
+        fleet.add(FleetTemplate("C", 10, mac_start="02:00:00:00:01:00", ip_start="10.0.0.10"))
+    fleet.add(FleetTemplate("D", 10, mac_start="02:00:00:00:00:0B", ip_start="10.0.0.11"))
+    assert len(fleet) == 20
@@ -0,0 +1,48 @@
+import pytest
+
+from radius_engine import ACCESS_ACCEPT, ACCESS_CHALLENGE, ACCESS_REJECT, run_requests
+from radius_standin import LocalRadiusServer
+
+SECRET = "testing123"
+USERS = {"alice": "wonderland", "bob": "builder"}
+
+
+@pytest.fixture
+def server():
+    with LocalRadiusServer(users=USERS, secret=SECRET) as server:
+        yield server
+
+
+def test_pap_accept_and_reject(server):
+    results = run_requests(server.host, server.port, SECRET,
+                           [("alice", "wonderland"), ("bob", "wrong"), ("mallory", "x")], timeout=1.0)
+    assert [r.code for r in results] == [ACCESS_ACCEPT, ACCESS_REJECT, ACCESS_REJECT]
+    assert all(r.error is None and r.attempts == 1 for r in results)
+
+
+def test_eap_gets_challenge(server):
+    results = run_requests(server.host, server.port, SECRET, [("alice", "wonderland")], timeout=1.0, method="eap")
+    assert results[0].code == ACCESS_CHALLENGE
+    assert results[0].ok
+
+
+def test_wrong_secret_times_out(server):
+    results = run_requests(server.host, server.port, "not-the-secret", [("alice", "wonderland")],
+                           timeout=0.1, retries=1)
+    assert results[0].code is None
+    assert results[0].attempts == 2
+    assert "No response" in results[0].error
+
+
+def test_retransmit_under_drop():
+    with LocalRadiusServer(users=USERS, secret=SECRET, drop_rate=0.5) as server:
+        requests = [("alice", "wonderland")] * 20
+        results = run_requests(server.host, server.port, SECRET, requests, timeout=0.05, retries=10)
+    assert all(r.code == ACCESS_ACCEPT for r in results)
+    assert any(r.attempts > 1 for r in results)
+    assert server.received > len(requests)
+
+
+def test_start_raises_when_port_is_taken(server):
+    with pytest.raises(OSError):
+        LocalRadiusServer(secret=SECRET, port=server.port).start()
@@ -0,0 +1,166 @@
+"""
+Fixed-capacity time-series store for the Diagnostics view.
+
+Each host gets one ring buffer of timestamps plus one per metric, backed by
+NumPy arrays. Appends are O(1) and memory never grows past the capacity, so
+a multi-day monitoring session stays flat.
+
+Every value is written twice, at i and i + capacity, in a buffer of twice
+the capacity. That keeps any window of the most recent points contiguous,
+so window() hands back plain slices (views) with no copying or
+concatenation, even after the ring has wrapped.
+"""
+import threading
+import time
+
+import numpy as np
+
+# one week of samples at the collector's 10 second interval
+DEFAULT_CAPACITY = 7 * 24 * 360
+
+
+class RingSeries:
+    """
+    Ring buffer for several aligned columns (e.g. time, cpu, mem).
+    """
+
+    def __init__(self, columns, capacity=DEFAULT_CAPACITY):
+        self.capacity = int(capacity)
+        self.columns = dict(columns)
+        self._buffers = {
+            name: np.zeros(2 * self.capacity, dtype=dtype) for name, dtype in self.columns.items()
+        }
+        self._count = 0
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    @property
+    def total_appended(self):
+        return self._count
+
+    def append(self, **values):
+        i = self._count % self.capacity
+        for name, buf in self._buffers.items():
+            value = values.get(name, np.nan)
+            buf[i] = value
+            buf[i + self.capacity] = value
+        self._count += 1
+
+    def extend(self, **columns):
+        """
+        Appends many points at once (equal-length arrays per column), e.g. when
+        reloading history. Only the last `capacity` points can be kept.
+        """
+        n = len(next(iter(columns.values())))
+        skip = max(0, n - self.capacity)
+        positions = (self._count + skip + np.arange(n - skip)) % self.capacity
+        for name, buf in self._buffers.items():
+            values = columns.get(name)
+            values = np.nan if values is None else np.asarray(values)[skip:]
+            buf[positions] = values
+            buf[positions + self.capacity] = values
+        self._count += n
+
+    def window(self, last=None):
+        """
+        Returns {column: array view} of the last `last` points (all retained
+        points by default), oldest first. Views alias the ring, so use them
+        right away (e.g. to plot) rather than keeping them around.
+        """
+        size = len(self)
+        last = size if last is None else max(0, min(int(last), size))
+        end = (self._count % self.capacity) + self.capacity if self._count >= self.capacity else self._count
+        start = end - last
+        return {name: buf[start:end] for name, buf in self._buffers.items()}
+
+    def nbytes(self):
+        return sum(buf.nbytes for buf in self._buffers.values())
+
+
+class TimeSeriesStore:
+    """
+    Thread-safe map of host -> RingSeries with a timestamp column plus the
+    given metric columns.
+    """
+
+    def __init__(self, metrics=("cpu_percent", "memory_percent"), capacity=DEFAULT_CAPACITY):
+        self.metrics = tuple(metrics)
+        self.capacity = capacity
+        self._series = {}
+        self.lock = threading.Lock()
+
+    def _columns(self):
+        columns = [("timestamps", np.float64)]
+        columns += [(m, np.float32) for m in self.metrics]
+        return columns
+
+    def append(self, host, timestamp, **metrics):
+        with self.lock:
+            series = self._series.get(host)
+            if series is None:
+                series = self._series[host] = RingSeries(self._columns(), self.capacity)
+            series.append(timestamps=timestamp, **metrics)
+
+    def extend(self, host, timestamps, **metrics):
+        if not len(timestamps):
+            return
+        with self.lock:
+            series = self._series.get(host)
+            if series is None:
+                series = self._series[host] = RingSeries(self._columns(), self.capacity)
+            series.extend(timestamps=timestamps, **metrics)
+
+    def hosts(self):
+        with self.lock:
+            return list(self._series.keys())
+
+    def window(self, host, last=None):
+        """
+        Returns {"timestamps": ..., <metric>: ...} views for a host, or None.
+        """
+        with self.lock:
+            series = self._series.get(host)
+            return None if series is None else series.window(last)
+
+    def window_since(self, host, since):
+        """
+        Like window(), limited to points with timestamp >= since (full
+        resolution; zoomed charts downsample the result themselves).
+        """
+        with self.lock:
+            series = self._series.get(host)
+            if series is None:
+                return None
+            full = series.window()
+            start = int(np.searchsorted(full["timestamps"], since, side="left"))
+            return {name: values[start:] for name, values in full.items()}
+
+    def version(self, host):
+        """
+        Number of points ever appended for a host; changes whenever it gets new data.
+        """
+        with self.lock:
+            series = self._series.get(host)
+            return 0 if series is None else series.total_appended
+
+    def remove(self, host):
+        with self.lock:
+            self._series.pop(host, None)
+
+    def nbytes(self):
+        with self.lock:
+            return sum(s.nbytes() for s in self._series.values())
+
+
+def to_datetimes(timestamps):
+    """
+    Epoch seconds array -> local-time numpy datetime64 array (for chart x axes).
+    Each timestamp gets the UTC offset in force at that time, so history
+    spanning a DST change isn't shifted by an hour.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    # UTC offsets only change on quarter-hour boundaries: look up each quarter-hour once
+    quarters, inverse = np.unique(np.floor(timestamps / 900), return_inverse=True)
+    offsets = np.array([time.localtime(q * 900).tm_gmtoff for q in quarters], dtype=np.float64)
+    return ((timestamps + offsets[inverse]) * 1000).astype("datetime64[ms]")
@@ -0,0 +1,79 @@
+"""
+Keeps built ft.Views alive between navigations.
+
+route_change looks a route up here before building it, so going back to a
+page reuses the View (and whatever state it holds: charts, paged lists,
+running test output) instead of rebuilding it. Each entry lists the data
+it was built from ("clients", "fleet", ...); data_changed / invalidate()
+drops the entries that depend on what changed, so they are rebuilt on the
+next visit. The least recently shown view is evicted past `capacity`.
+
+Views that add FilePickers to page.overlay while being built get them
+removed again when the view leaves the cache.
+"""
+from collections import OrderedDict
+
+DEFAULT_CAPACITY = 6
+
+
+class _Entry:
+    def __init__(self, view, depends, overlay):
+        self.view = view
+        self.depends = frozenset(depends)
+        self.overlay = overlay
+
+
+class ViewCache:
+
+    def __init__(self, page, capacity=DEFAULT_CAPACITY):
+        self.page = page
+        self.capacity = capacity
+        self._entries = OrderedDict()
+
+    def __contains__(self, route):
+        return route in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, route, build, depends=()):
+        """
+        Returns the cached view for route, or calls build() and caches it.
+        """
+        entry = self._entries.get(route)
+        if entry is not None:
+            self._entries.move_to_end(route)
+            return entry.view
+        overlay_before = len(self.page.overlay)
+        view = build()
+        # Anything the builder put in the overlay belongs to this view
+        added = list(self.page.overlay[overlay_before:])
+        self._entries[route] = _Entry(view, depends, added)
+        while len(self._entries) > self.capacity:
+            _, evicted = self._entries.popitem(last=False)
+            self._release(evicted)
+        return view
+
+    def invalidate(self, *keys, keep=None):
+        """
+        Drops every cached view that depends on any of keys (data names or
+        routes). keep: a route left alone, typically the one on screen that
+        made the change and is already up to date.
+        """
+        keys = set(keys)
+        for route, entry in list(self._entries.items()):
+            if route == keep:
+                continue
+            if route in keys or entry.depends & keys:
+                del self._entries[route]
+                self._release(entry)
+
+    def clear(self):
+        for entry in self._entries.values():
+            self._release(entry)
+        self._entries.clear()
+
+    def _release(self, entry):
+        for control in entry.overlay:
+            if control in self.page.overlay:
+                self.page.overlay.remove(control)
@@ -0,0 +1,172 @@
+"""
+Streaming ingestion of Web API CSV exports for the host generator.
+
+The export is read lazily, one row at a time, so a multi-GB file never sits
+in memory. Column headers are mapped through the field catalog once per file
+(not once per cell), and each row is turned into that host's list of
+`fstool hostinfo_update` command templates as it is read. Bytes consumed are
+tracked so the GUI can show progress against the file size.
+"""
+import csv
+import os
+
+import field_catalog
+
+HOST_COMMAND_TEMPLATE = 'fstool hostinfo_update -N -P "{}" -O "{}" <IP_MAC>'
+IP_PLACEHOLDER = '<IP_MAC>'
+
+
+class ColumnPlan:
+    """
+    Compiled once from a CSV header: which columns map to which property keys,
+    with HOST_COMMAND_TEMPLATE pre-split around the value, so turning a row
+    into commands is just string concatenation (no dict lookups or format()
+    per cell).
+    """
+
+    def __init__(self, header):
+        # 'fstool ... -P "{}" -O "' + value + '" <IP_MAC>'
+        head, self.suffix = HOST_COMMAND_TEMPLATE.rsplit('{}', 1)
+        self.columns = []
+        self._steps = []
+        for idx, name in enumerate(header):
+            prop = field_catalog.property_for(name)
+            if prop:
+                self.columns.append((idx, prop))
+                self._steps.append((idx, head.format(prop)))
+        self.width = max((idx for idx, _ in self.columns), default=-1) + 1
+
+    def __len__(self):
+        return len(self.columns)
+
+    def host_commands(self, row):
+        suffix = self.suffix
+        if len(row) >= self.width:
+            return [prefix + row[idx] + suffix for idx, prefix in self._steps if row[idx]]
+        return [prefix + row[idx] + suffix for idx, prefix in self._steps if idx < len(row) and row[idx]]
+
+
+class _CountingLines:
+    """
+    Iterates decoded lines of a binary file while counting raw bytes read,
+    since text-mode tell() is unavailable while csv is iterating the file.
+    """
+
+    def __init__(self, raw, encoding):
+        self.raw = raw
+        self.encoding = encoding
+        self.bytes_read = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.raw.readline()
+        if not line:
+            raise StopIteration
+        self.bytes_read += len(line)
+        return line.decode(self.encoding, errors='replace')
+
+
+class CsvHostStream:
+    """
+    Re-iterable stream of host command lists from a CSV export.
+    Each iteration re-reads the file from the start with constant memory.
+    """
+
+    def __init__(self, path, encoding='utf-8-sig'):
+        self.path = path
+        self.encoding = encoding
+        self.total_bytes = os.path.getsize(path)
+        self.bytes_read = 0
+        self.rows_read = 0
+
+    def header(self):
+        with open(self.path, newline='', encoding=self.encoding, errors='replace') as f:
+            return next(csv.reader(f), [])
+
+    def column_plan(self, header=None):
+        """
+        Returns the ColumnPlan for this file's header.
+        """
+        return ColumnPlan(self.header() if header is None else header)
+
+    def column_mapping(self, header=None):
+        """
+        Returns [(column_index, property_key)] for every header the field
+        catalog knows about.
+        """
+        return self.column_plan(header).columns
+
+    def __iter__(self):
+        self.bytes_read = 0
+        self.rows_read = 0
+        with open(self.path, 'rb') as raw:
+            lines = _CountingLines(raw, self.encoding)
+            reader = csv.reader(lines)
+            header = next(reader, None)
+            if header is None:
+                return
+            host_commands = self.column_plan(header).host_commands
+            for row in reader:
+                self.rows_read += 1
+                self.bytes_read = lines.bytes_read
+                yield host_commands(row)
+
+    def progress(self):
+        if not self.total_bytes:
+            return 1.0
+        return min(1.0, self.bytes_read / self.total_bytes)
+
+
+def _benchmark(rows=100000):
+    """
+    Compares the old per-cell DictReader/format() loop with the compiled
+    column plan on a generated file of the given number of rows.
+    """
+    import tempfile
+    import time
+
+    header = list(field_catalog.labels()[:20]) + ['Unmapped Column {}'.format(i) for i in range(5)]
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False) as f:
+        path = f.name
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(rows):
+            writer.writerow(['value-{}-{}'.format(i, c) if c % 3 else '' for c in range(len(header))])
+
+    def per_cell(ip='10.0.0.1'):
+        count = 0
+        with open(path, newline='') as f:
+            for line in csv.DictReader(f):
+                for key, value in line.items():
+                    if field_catalog.fields().get(key) and value:
+                        cmd = HOST_COMMAND_TEMPLATE.format(field_catalog.fields().get(key), value)
+                        count += len(cmd.replace(IP_PLACEHOLDER, ip))
+        return count
+
+    def planned(ip='10.0.0.1'):
+        count = 0
+        cut = -len(IP_PLACEHOLDER)
+        with open(path, newline='') as f:
+            reader = csv.reader(f)
+            plan = ColumnPlan(next(reader))
+            for row in reader:
+                for cmd in plan.host_commands(row):
+                    count += len(cmd[:cut] + ip)
+        return count
+
+    try:
+        results = {}
+        for name, func in (('per-cell', per_cell), ('column plan', planned)):
+            start = time.perf_counter()
+            total = func()
+            results[name] = time.perf_counter() - start
+            print('{:<12} {:.3f}s ({} command bytes)'.format(name, results[name], total))
+        print('speedup: {:.1f}x'.format(results['per-cell'] / results['column plan']))
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    _benchmark()
@@ -0,0 +1,114 @@
+"""
+Lazy, indexed access to the Forescout Web API field catalog.
+
+constants.WEB_API_FIELDS is a single ~120KB line; importing it builds a
+1,593-entry dict whether or not the tool ever looks a field up. This module
+loads nothing on import. The first lookup reads a compact marshal blob cached
+in __pycache__ (rebuilt automatically whenever constants.py changes) and
+builds forward (label -> property key) and reverse (property key -> label)
+indexes for O(1) lookups both ways.
+"""
+import marshal
+import os
+import threading
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE_PATH = os.path.join(_HERE, 'constants.py')
+CACHE_PATH = os.path.join(_HERE, '__pycache__', 'web_api_fields.marshal')
+_CACHE_VERSION = 1
+
+_lock = threading.Lock()
+_forward = None
+_reverse = None
+
+
+def _source_stamp():
+    stat = os.stat(SOURCE_PATH)
+    return (_CACHE_VERSION, int(stat.st_mtime_ns), stat.st_size)
+
+
+def _read_cache(stamp):
+    try:
+        with open(CACHE_PATH, 'rb') as f:
+            cached_stamp, labels, keys = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if tuple(cached_stamp) != stamp:
+        return None
+    return labels, keys
+
+
+def _write_cache(stamp, labels, keys):
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        tmp_path = '{}.{}.tmp'.format(CACHE_PATH, os.getpid())
+        with open(tmp_path, 'wb') as f:
+            marshal.dump((stamp, labels, keys), f)
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError:
+        # read-only checkout, just keep the in-memory copy
+        pass
+
+
+def _load():
+    global _forward, _reverse
+    with _lock:
+        if _forward is not None:
+            return
+        stamp = _source_stamp()
+        cached = _read_cache(stamp)
+        if cached is None:
+            import constants
+            labels = tuple(constants.WEB_API_FIELDS.keys())
+            keys = tuple(constants.WEB_API_FIELDS.values())
+            _write_cache(stamp, labels, keys)
+        else:
+            labels, keys = cached
+        _reverse = dict(zip(keys, labels))
+        _forward = dict(zip(labels, keys))
+
+
+def fields():
+    """
+    Returns the label -> property key mapping (same content as
+    constants.WEB_API_FIELDS). Treat it as read-only.
+    """
+    if _forward is None:
+        _load()
+    return _forward
+
+
+def property_for(label, default=None):
+    """
+    Returns the property key (e.g. 'va_netfunc3.0') for a Web API label.
+    """
+    if _forward is None:
+        _load()
+    return _forward.get(label, default)
+
+
+def label_for(property_key, default=None):
+    """
+    Returns the Web API label for a property key (e.g. 'nessus_scan_status1').
+    """
+    if _reverse is None:
+        _load()
+    return _reverse.get(property_key, default)
+
+
+def labels():
+    return list(fields().keys())
+
+
+def property_keys():
+    return list(fields().values())
+
+
+def reset():
+    """
+    Drops the in-memory indexes so the next lookup reloads them.
+    """
+    global _forward, _reverse
+    with _lock:
+        _forward = None
+        _reverse = None
@@ -0,0 +1,110 @@
+"""
+Type-ahead search over the Forescout property catalog.
+
+Builds two indexes over every label and property key in field_catalog:
+
+- a prefix index: all lowercased labels, keys and the words inside them,
+  kept sorted so a prefix lookup is a bisect plus a short forward scan
+  (the flattened equivalent of a trie, without a node object per char).
+  Whole labels/keys and inner words are separate sorted lists, so every
+  whole-label match is found before the word matches are capped.
+- a trigram index: trigram -> set of entry ids, so "contains" queries only
+  verify the few entries that share every trigram with the query
+
+Queries return (label, property_key) pairs, best matches first.
+"""
+import bisect
+import re
+import threading
+
+import field_catalog
+
+_WORD_SPLIT = re.compile(r'[^0-9a-z]+')
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class FieldSearchIndex:
+
+    def __init__(self, mapping):
+        # the catalog has a key with no label (None), search those by key alone
+        self.entries = [(label or '', key) for label, key in mapping.items()]
+        self._haystacks = []
+        terms = ([], [])
+        self._grams = {}
+        for entry_id, (label, key) in enumerate(self.entries):
+            label_l, key_l = label.lower(), key.lower()
+            self._haystacks.append(label_l + '\n' + key_l)
+            # rank 0: whole label/key prefix, rank 1: prefix of a word inside it
+            terms[0].append((label_l, entry_id))
+            terms[0].append((key_l, entry_id))
+            for word in set(_WORD_SPLIT.split(label_l) + _WORD_SPLIT.split(key_l)):
+                if word and not label_l.startswith(word) and not key_l.startswith(word):
+                    terms[1].append((word, entry_id))
+            for gram in _trigrams(label_l) | _trigrams(key_l):
+                self._grams.setdefault(gram, set()).add(entry_id)
+        # per rank: (sorted terms, entry id of each term)
+        self._ranked_terms = []
+        for rank_terms in terms:
+            rank_terms.sort()
+            self._ranked_terms.append(([t[0] for t in rank_terms], [t[1] for t in rank_terms]))
+
+    def _prefix_ids(self, query, limit):
+        # all whole-label/key matches are kept (they rank first); word matches stop at the cap
+        ranked = {}
+        for rank, (terms, entry_ids) in enumerate(self._ranked_terms):
+            pos = bisect.bisect_left(terms, query)
+            while pos < len(terms) and terms[pos].startswith(query):
+                ranked.setdefault(entry_ids[pos], rank)
+                pos += 1
+                if rank and len(ranked) >= limit * 4:
+                    break
+        return ranked
+
+    def _contains_ids(self, query):
+        grams = _trigrams(query)
+        if not grams:
+            return set()
+        postings = sorted((self._grams.get(g, set()) for g in grams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return {i for i in candidates if query in self._haystacks[i]}
+
+    def search(self, query, limit=10):
+        """
+        Returns up to limit (label, property_key) pairs matching query:
+        whole-label/key prefixes first, then word prefixes, then substrings.
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        ranked = self._prefix_ids(query, limit)
+        if len(ranked) < limit and len(query) >= 3:
+            for entry_id in self._contains_ids(query):
+                ranked.setdefault(entry_id, 2)
+        best = sorted(ranked.items(), key=lambda item: (item[1], len(self.entries[item[0]][0]), item[0]))
+        return [self.entries[entry_id] for entry_id, _ in best[:limit]]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """
+    Returns the shared index over field_catalog, built on first use.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FieldSearchIndex(field_catalog.fields())
+        return _index
+
+
+def search(query, limit=10):
+    return get_index().search(query, limit)
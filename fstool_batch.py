@@ -0,0 +1,112 @@
+"""
+Batched execution of fstool commands over a single SSH channel.
+
+Instead of one exec_command round trip per `fstool hostinfo_update` line,
+all commands for a host (or a chunk of hosts) are compiled into one shell
+script, streamed to `sh -s` on a single channel, and the per-command exit
+status and output are parsed back out of marker lines.
+"""
+
+BEGIN_MARKER = '__FSTOOL_BEGIN__'
+END_MARKER = '__FSTOOL_END__'
+IP_PLACEHOLDER = '<IP_MAC>'
+
+# number of hosts compiled into a single script by default
+DEFAULT_HOSTS_PER_BATCH = 50
+
+
+def expand_host_commands(host, ip):
+    """
+    Fills the <IP_MAC> placeholder in every command template of a host.
+    """
+    ip = str(ip)
+    # templates from csv_hosts always end with the placeholder, so slice instead of searching
+    cut = -len(IP_PLACEHOLDER)
+    return [cmd[:cut] + ip if cmd.endswith(IP_PLACEHOLDER) else cmd.replace(IP_PLACEHOLDER, ip) for cmd in host]
+
+
+def build_batch_script(commands):
+    """
+    Compiles commands into one POSIX shell script. Each command is wrapped in
+    begin/end markers carrying its index and exit status, with stdin detached
+    so a command can't swallow the rest of the script.
+    """
+    lines = []
+    for idx, cmd in enumerate(commands):
+        lines.append("printf '%s %d\\n' '{}' {}".format(BEGIN_MARKER, idx))
+        lines.append('{{ {}\n}} < /dev/null 2>&1'.format(cmd))
+        lines.append("printf '\\n%s %d %d\\n' '{}' {} $?".format(END_MARKER, idx))
+    lines.append('exit 0')
+    return '\n'.join(lines) + '\n'
+
+
+def parse_batch_output(commands, output):
+    """
+    Splits the combined script output back into per-command results.
+    Returns a list of (cmd, exit_status, output) in command order. A command
+    whose end marker never arrived (script killed, channel dropped) gets an
+    exit status of None.
+    """
+    results = [[cmd, None, []] for cmd in commands]
+    current = None
+    for line in output.splitlines():
+        if line.startswith(BEGIN_MARKER + ' '):
+            try:
+                current = int(line.split()[1])
+            except (IndexError, ValueError):
+                current = None
+            continue
+        if line.startswith(END_MARKER + ' '):
+            parts = line.split()
+            try:
+                idx, status = int(parts[1]), int(parts[2])
+                results[idx][1] = status
+            except (IndexError, ValueError):
+                pass
+            current = None
+            continue
+        if current is not None and 0 <= current < len(results):
+            results[current][2].append(line)
+
+    parsed = []
+    for cmd, status, out_lines in results:
+        # the end marker is preceded by a forced newline, drop the blank it leaves
+        if out_lines and out_lines[-1] == '':
+            out_lines = out_lines[:-1]
+        parsed.append((cmd, status, '\n'.join(out_lines)))
+    return parsed
+
+
+def run_batch(session, commands, timeout=None):
+    """
+    Streams the compiled script to `sh -s` on a single channel of an
+    authenticated paramiko SSHClient and waits for it to finish.
+    Returns parse_batch_output() results.
+    """
+    if not commands:
+        return []
+    script = build_batch_script(commands)
+    stdin, stdout, stderr = session.exec_command('sh -s', timeout=timeout)
+    stdin.write(script)
+    stdin.flush()
+    stdin.channel.shutdown_write()
+    output = stdout.read().decode('utf-8', errors='ignore')
+    # stderr only carries shell-level problems, per-command stderr is merged above
+    shell_error = stderr.read().decode('utf-8', errors='ignore')
+    if shell_error:
+        print('Batch shell error: {}'.format(shell_error))
+    return parse_batch_output(commands, output)
+
+
+def chunked(items, size):
+    """
+    Yields lists of at most size items.
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,124 @@
+"""
+Durable checkpoints for host generation jobs.
+
+Every (ip, property) update that the appliance accepted is committed to a
+local SQLite database as soon as its work unit finishes. If the SSH session
+drops halfway through a large network, re-running the same job skips the
+updates that were already applied and only sends what is left.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.host_generator_checkpoints.sqlite')
+
+_PROPERTY_RE = re.compile(r'-P "([^"]*)"')
+
+
+def command_property(cmd):
+    """
+    Returns the property name of an `fstool hostinfo_update -P "<prop>"` line,
+    or the whole command if it doesn't follow that shape.
+    """
+    match = _PROPERTY_RE.search(cmd)
+    return match.group(1) if match else cmd
+
+
+def job_key(*parts):
+    """
+    Identifies a job by whatever defines its output (appliance, network,
+    data file and its mtime, mode), so changing any of them starts fresh.
+    """
+    return hashlib.sha256('\x1f'.join(str(p) for p in parts).encode('utf-8')).hexdigest()[:24]
+
+
+class GenerationCheckpoint:
+
+    def __init__(self, key, path=DEFAULT_PATH, description=''):
+        self.key = key
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            ' job TEXT PRIMARY KEY, description TEXT, created REAL, updated REAL)'
+        )
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS applied ('
+            ' job TEXT NOT NULL, ip TEXT NOT NULL, property TEXT NOT NULL,'
+            ' PRIMARY KEY (job, ip, property)) WITHOUT ROWID'
+        )
+        now = time.time()
+        self._db.execute(
+            'INSERT OR IGNORE INTO jobs (job, description, created, updated) VALUES (?, ?, ?, ?)',
+            (key, description, now, now)
+        )
+
+    def applied_count(self):
+        with self._lock:
+            row = self._db.execute('SELECT COUNT(*) FROM applied WHERE job = ?', (self.key,)).fetchone()
+        return row[0]
+
+    def applied_for(self, ips):
+        """
+        Returns the set of (ip, property) pairs already applied for these ips.
+        """
+        ips = list(set(ips))
+        done = set()
+        with self._lock:
+            for start in range(0, len(ips), 500):
+                chunk = ips[start:start + 500]
+                rows = self._db.execute(
+                    'SELECT ip, property FROM applied WHERE job = ? AND ip IN ({})'.format(','.join('?' * len(chunk))),
+                    [self.key] + chunk
+                )
+                done.update(rows)
+        return done
+
+    def pending_unit(self, unit):
+        """
+        Drops commands that were already applied from a work unit of
+        (host_commands, ip) pairs. Hosts left with nothing to do are removed.
+        """
+        done = self.applied_for(ip for _, ip in unit)
+        if not done:
+            return unit
+        pending = []
+        for host, ip in unit:
+            remaining = [cmd for cmd in host if (ip, command_property(cmd)) not in done]
+            if remaining:
+                pending.append((remaining, ip))
+        return pending
+
+    def mark_applied(self, pairs):
+        """
+        Commits (ip, property) pairs in a single transaction.
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return
+        with self._lock:
+            self._db.execute('BEGIN')
+            try:
+                self._db.executemany(
+                    'INSERT OR IGNORE INTO applied (job, ip, property) VALUES (?, ?, ?)',
+                    [(self.key, ip, prop) for ip, prop in pairs]
+                )
+                self._db.execute('UPDATE jobs SET updated = ? WHERE job = ?', (time.time(), self.key))
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+
+    def reset(self):
+        with self._lock:
+            self._db.execute('DELETE FROM applied WHERE job = ?', (self.key,))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
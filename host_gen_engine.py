@@ -0,0 +1,132 @@
+"""
+Concurrent host generation engine.
+
+Splits the stream of (host_commands, ip) work items into units and runs them
+over N concurrent SSH channels. A bounded queue between the producer and the
+workers provides back-pressure, so walking a /16 never materialises the whole
+address space in memory. Failed units are retried with a short backoff.
+
+Progress is reported through a thread-safe queue so a Tk window can poll it
+with root.after() instead of being touched from worker threads.
+"""
+import queue
+import threading
+import time
+
+import fstool_batch
+
+_STOP = object()
+
+
+class HostGenerationEngine:
+    """
+    work_items: iterable of (host_commands, ip)
+    run_unit:   callable(unit, worker_idx) -> list of outputs; unit is a list
+                of (host_commands, ip). Raise to signal a retryable failure.
+    workers:    number of concurrent channels
+    unit_size:  hosts per work unit (one batch script per unit)
+    retries:    extra attempts per unit before it is recorded as failed
+    total:      optional number of hosts, used for progress percentages
+    """
+
+    def __init__(self, work_items, run_unit, workers=4, unit_size=fstool_batch.DEFAULT_HOSTS_PER_BATCH,
+                 retries=2, total=None, queue_depth=None):
+        self.work_items = work_items
+        self.run_unit = run_unit
+        self.workers = max(1, int(workers))
+        self.unit_size = max(1, int(unit_size))
+        self.retries = max(0, int(retries))
+        self.total = total
+
+        self.units = queue.Queue(maxsize=queue_depth or self.workers * 2)
+        self.events = queue.Queue()
+        self.done_hosts = 0
+        self.failed_units = []
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._threads = []
+        self._finished = threading.Event()
+
+    # -- Control --
+    def start(self):
+        producer = threading.Thread(target=self._produce, name='hostgen-producer', daemon=True)
+        self._threads = [producer]
+        for idx in range(self.workers):
+            self._threads.append(
+                threading.Thread(target=self._work, args=(idx,), name='hostgen-worker-{}'.format(idx), daemon=True)
+            )
+        for t in self._threads:
+            t.start()
+        threading.Thread(target=self._wait_all, name='hostgen-monitor', daemon=True).start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_finished(self):
+        return self._finished.is_set()
+
+    def wait(self, timeout=None):
+        return self._finished.wait(timeout)
+
+    # -- Threads --
+    def _put(self, item):
+        # blocks while the workers are behind (back-pressure), but stays cancellable
+        while not self._cancel.is_set():
+            try:
+                self.units.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        try:
+            for unit in fstool_batch.chunked(self.work_items, self.unit_size):
+                if not self._put(unit):
+                    break
+        except Exception as e:
+            self.events.put(('error', 'Work producer failed: {}'.format(e)))
+        finally:
+            for _ in range(self.workers):
+                # sentinels must get through even after cancel so workers exit
+                self.units.put(_STOP)
+
+    def _work(self, worker_idx):
+        while True:
+            unit = self.units.get()
+            if unit is _STOP:
+                return
+            if self._cancel.is_set():
+                continue
+            self._run_with_retry(unit, worker_idx)
+
+    def _run_with_retry(self, unit, worker_idx):
+        attempt = 0
+        while True:
+            try:
+                outputs = self.run_unit(unit, worker_idx)
+                break
+            except Exception as e:
+                attempt += 1
+                if attempt > self.retries or self._cancel.is_set():
+                    with self._lock:
+                        self.failed_units.append(unit)
+                    self.events.put(('error', 'Unit starting at {} failed after {} attempts: {}'.format(
+                        unit[0][1], attempt, e)))
+                    outputs = None
+                    break
+                self.events.put(('retry', 'Retrying unit starting at {} ({}/{}): {}'.format(
+                    unit[0][1], attempt, self.retries, e)))
+                time.sleep(min(5, 0.5 * 2 ** (attempt - 1)))
+
+        with self._lock:
+            self.done_hosts += len(unit)
+            done = self.done_hosts
+        self.events.put(('progress', done, self.total, outputs))
+
+    def _wait_all(self):
+        for t in self._threads:
+            t.join()
+        self._finished.set()
+        self.events.put(('finished', self.done_hosts, len(self.failed_units), self._cancel.is_set()))
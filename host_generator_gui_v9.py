@@ -6,10 +6,16 @@ import paramiko
 import ipaddress
 import requests
 import json
-import csv
-import constants
+import os
+import queue
+import field_search
+from csv_hosts import CsvHostStream
+import threading
 import urllib3
 import random
+import fstool_batch
+from host_gen_engine import HostGenerationEngine
+import host_gen_checkpoint
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 """
@@ -21,7 +27,8 @@ cole@colejwils.com
 SESSION = None
 CONNECT_TOKEN = None
 APPLIANCE_IP = None
-HOSTS = None
+CSV_STREAM = None
+ENGINE = None
 
 def run_function(commands=['ls -l', 'df -h']):
     # add the code to call functions based on this template and return its output
@@ -78,14 +85,46 @@ def fstool_commands_v2(host, ip):
             outputs.append(cmd)
     return outputs
 
-def generate_hosts_function_v2(ip_cidr, start_mac='020000000000'):
+def fstool_commands_batch(host_ip_pairs, checkpoint=None):
+    # compiles every command of every (host, ip) pair into one script and runs it over a single channel
+    # with a checkpoint, updates it already has are skipped and the ones that succeed are recorded
+    if checkpoint is not None:
+        host_ip_pairs = checkpoint.pending_unit(host_ip_pairs)
+    commands = []
+    pairs = []
+    for host, ip in host_ip_pairs:
+        for cmd in fstool_batch.expand_host_commands(host, ip):
+            commands.append(cmd)
+            pairs.append((ip, host_gen_checkpoint.command_property(cmd)))
+    outputs = []
+    applied = []
+    unreported = 0
+    for pair, (cmd, status, output) in zip(pairs, fstool_batch.run_batch(SESSION, commands)):
+        outputs.append(output)
+        if status == 0:
+            applied.append(pair)
+        else:
+            if status is None:
+                unreported += 1
+            print('{} (exit {}) {}'.format(cmd, status, output))
+            outputs.append(cmd)
+    if checkpoint is not None:
+        checkpoint.mark_applied(applied)
+    if unreported:
+        # the script stopped reporting (missing end marker, dropped channel), let the engine retry the unit;
+        # with a checkpoint the retry only runs what hasn't been applied
+        raise RuntimeError('{} of {} updates unreported for unit starting at {}'.format(
+            unreported, len(commands), host_ip_pairs[0][1]))
+    if checkpoint is not None and commands and not applied:
+        # nothing went through (dropped session?), let the engine retry the unit
+        raise RuntimeError('no updates applied for unit starting at {}'.format(host_ip_pairs[0][1]))
+    return outputs
+
+def iter_host_work(ip_cidr, use_real_data, start_mac='020000000000'):
+    # yields (host_commands, ip) for every host to generate, lazily so large networks stay cheap
     mac_iterator = 0
-    ip_net = ipaddress.IPv4Network(ip_cidr)
-    # TO DO: function to create connect hosts
-    # create_connect_host(update_data)
-    use_real_data = (use_real_data_var.get())
     if use_real_data:
-        for host in HOSTS:
+        for host in CSV_STREAM:
             ip = None
             mac = None
             host_lines = []
@@ -97,33 +136,130 @@ def generate_hosts_function_v2(ip_cidr, start_mac='020000000000'):
             for line in host:
                 # host_lines.append(line.replace('<IP_MAC>', str(ip)))
                 host_lines.append(line)
-            fstool_commands_v2(host_lines, str(ip))
-            # fstool_commands_v2(host_lines, str('192.168.0.233'))
+            yield host_lines, str(ip)
     else:
-        host_iterator = 0
+        ip_net = ipaddress.IPv4Network(ip_cidr)
+        # cycle through the CSV hosts as templates, re-reading the file when it runs out
+        templates = iter(CSV_STREAM)
         for ip in ip_net:
-            if str(ip)[-2:] != '.0' and str(ip)[-2:] != '.255':
+            if is_generated_address(ip):
                 mac_iterator += 1
                 mac_iterator_len = len(str(mac_iterator))
                 mac = '{}{}'.format(start_mac[:-mac_iterator_len], str(mac_iterator))
-                # print(len(HOSTS[host_iterator]))
-                host = HOSTS[host_iterator]
-                fstool_commands_v2(host, str(ip))
-                # for line in host:
-                    # print(line.replace('<IP_MAC>', str(ip)))
-                    
-                if host_iterator >= len(HOSTS):
-                    host_iterator = 0
-                else:
-                    host_iterator += 1
-                # TO DO: function to use fstool hostinfo_update to update the host's properties
-                    # outputs = fstool_commands(ip, hosts)
-                    # for output in outputs:
-                        # print(output)
-            
+                host = next(templates, None)
+                if host is None:
+                    templates = iter(CSV_STREAM)
+                    host = next(templates, None)
+                    if host is None:
+                        return
+                yield host, str(ip)
+
+def is_generated_address(ip):
+    # .0 and .255 addresses are skipped
+    return int(ip) & 0xFF not in (0, 255)
+
+def count_host_work(ip_cidr, use_real_data):
+    # None when the host count isn't known up front (streamed CSV), progress then follows the byte offset
+    if use_real_data:
+        return None
+    ip_net = ipaddress.IPv4Network(ip_cidr)
+    if ip_net.prefixlen <= 24:
+        # every whole /24 loses its .0 and .255
+        return ip_net.num_addresses // 256 * 254
+    return sum(1 for ip in ip_net if is_generated_address(ip))
+
+def generate_hosts_function_v2(ip_cidr, start_mac='020000000000'):
+    # TO DO: function to create connect hosts
+    # create_connect_host(update_data)
+    if CSV_STREAM is None:
+        messagebox.showinfo('Generate Hosts', 'Load a CSV data file first.')
+        return
+    use_real_data = (use_real_data_var.get())
+    work = iter_host_work(ip_cidr, use_real_data, start_mac)
+    if batch_mode_var.get():
+        start_generation_engine(work, count_host_work(ip_cidr, use_real_data), ip_cidr)
+        return
+
+    host_count = 0
+    for host, ip in work:
+        fstool_commands_v2(host, ip)
+        host_count += 1
             
-    output_label.config(text='{}\n\n{}'.format(str(len(HOSTS)), str(ip_cidr)))
+    output_label.config(text='{}\n\n{}'.format(str(host_count), str(ip_cidr)))
     print(APPLIANCE_IP)
+
+def start_generation_engine(work, total, ip_cidr):
+    # runs the batched work units over several channels of SESSION's transport in the background
+    global ENGINE
+    if SESSION is None:
+        messagebox.showinfo('Generate Hosts', 'Log in to an appliance first.')
+        return
+    if ENGINE is not None and not ENGINE.is_finished():
+        messagebox.showinfo('Generate Hosts', 'A host generation job is already running.')
+        return
+    try:
+        channels = max(1, int(channels_entry.get()))
+    except ValueError:
+        channels = 4
+    checkpoint = host_gen_checkpoint.GenerationCheckpoint(
+        host_gen_checkpoint.job_key(APPLIANCE_IP, ip_cidr, CSV_STREAM.path, os.path.getmtime(CSV_STREAM.path),
+                                    use_real_data_var.get()),
+        description='{} {} {}'.format(APPLIANCE_IP, ip_cidr, CSV_STREAM.path)
+    )
+    if not resume_var.get():
+        checkpoint.reset()
+    already_applied = checkpoint.applied_count()
+    if already_applied:
+        print('Resuming job, {} updates already applied'.format(already_applied))
+    ENGINE = HostGenerationEngine(
+        work,
+        run_unit=lambda unit, worker_idx: fstool_commands_batch(unit, checkpoint),
+        workers=channels,
+        total=total,
+    ).start()
+    progress_bar.config(maximum=total or 100, value=0)
+    if total:
+        output_label.config(text='Generating {} hosts over {} channels...'.format(total, channels))
+    else:
+        output_label.config(text='Generating hosts from the data file over {} channels...'.format(channels))
+    cancel_button.config(state='normal')
+    root.after(100, poll_generation_engine, ENGINE, ip_cidr, checkpoint)
+
+def poll_generation_engine(engine, ip_cidr, checkpoint):
+    # drains engine events on the Tk thread; worker threads never touch widgets
+    finished = False
+    while True:
+        try:
+            event = engine.events.get_nowait()
+        except queue.Empty:
+            break
+        kind = event[0]
+        if kind == 'progress':
+            done, total = event[1], event[2]
+            if total:
+                progress_bar.config(value=done)
+                output_label.config(text='{} / {} hosts\n\n{}'.format(done, total, ip_cidr))
+            else:
+                percent = CSV_STREAM.progress() * 100
+                progress_bar.config(value=percent)
+                output_label.config(text='{} hosts ({:.1f}% of data file)\n\n{}'.format(done, percent, ip_cidr))
+        elif kind in ('retry', 'error'):
+            print(event[1])
+        elif kind == 'finished':
+            finished = True
+            done, failed_units, cancelled = event[1], event[2], event[3]
+            status = 'Cancelled' if cancelled else 'Finished'
+            output_label.config(text='{}: {} hosts processed, {} failed units\n\n{}'.format(
+                status, done, failed_units, ip_cidr))
+            cancel_button.config(state='disabled')
+            checkpoint.close()
+            print(APPLIANCE_IP)
+    if not finished:
+        root.after(100, poll_generation_engine, engine, ip_cidr, checkpoint)
+
+def cancel_generation():
+    if ENGINE is not None:
+        ENGINE.cancel()
     
 def login():
     # window for the login prompt
@@ -243,6 +379,69 @@ def ssh_function(ip, username, password):
         root.update()
         # result_msg_box.askokcancel(title='Authentication Failed', message='Failed to authenticate to: {}\nInformation:\n{}'.format(ip, result))
         
+def attach_autocomplete(entry):
+    # type-ahead popup for a ForeScout Continuum Tag entry, fills in the property key on select
+    popup = {'window': None, 'listbox': None, 'matches': []}
+
+    def hide(event=None):
+        if popup['window'] is not None:
+            popup['window'].destroy()
+            popup['window'] = None
+            popup['listbox'] = None
+
+    def choose(event=None):
+        listbox = popup['listbox']
+        if listbox is None:
+            return
+        selection = listbox.curselection()
+        if selection:
+            label, key = popup['matches'][selection[0]]
+            entry.delete(0, tk.END)
+            entry.insert(0, key)
+        hide()
+        entry.focus_set()
+        return 'break'
+
+    def show(matches):
+        if popup['window'] is None:
+            window = tk.Toplevel(entry)
+            window.wm_overrideredirect(True)
+            listbox = tk.Listbox(window, width=70, height=8)
+            listbox.pack(fill='both', expand=True)
+            listbox.bind('<Return>', choose)
+            listbox.bind('<Double-Button-1>', choose)
+            listbox.bind('<Escape>', hide)
+            popup['window'] = window
+            popup['listbox'] = listbox
+        x = entry.winfo_rootx()
+        y = entry.winfo_rooty() + entry.winfo_height()
+        popup['window'].wm_geometry('+{}+{}'.format(x, y))
+        listbox = popup['listbox']
+        listbox.delete(0, tk.END)
+        for label, key in matches:
+            listbox.insert(tk.END, '{}  [{}]'.format(label, key) if label else key)
+        popup['matches'] = matches
+
+    def on_key(event):
+        if event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+            return
+        matches = field_search.search(entry.get(), limit=10)
+        if matches:
+            show(matches)
+        else:
+            hide()
+
+    def focus_list(event):
+        if popup['listbox'] is not None:
+            popup['listbox'].focus_set()
+            popup['listbox'].selection_set(0)
+            return 'break'
+
+    entry.bind('<KeyRelease>', on_key)
+    entry.bind('<Down>', focus_list)
+    entry.bind('<Escape>', hide)
+    entry.bind('<Return>', lambda event: hide())
+
 def add_row():
     # determine the row number for the new row
     row_num = len(data_entries)
@@ -256,6 +455,7 @@ def add_row():
     
     key_entry = ttk.Entry(inner_frame)
     key_entry.grid(column=1, row=tag_row_num, padx=5, pady=5)
+    attach_autocomplete(key_entry)
     data_entries.append(key_entry)
     key_data_entries.append(key_entry)
     
@@ -302,24 +502,15 @@ def remove_row():
 
 # Update the canvas scroll region to exclude the removed row
 def load_from_csv():
+    # only the header is read here, rows are streamed from disk while hosts are generated
     file_path = filedialog.askopenfilename()
     if file_path:
-        with open(file_path, newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            lines = [i for i in reader]
-            hosts = []
-            for line in lines:
-                host_commands = []
-                for key, value in line.items():
-                    if constants.WEB_API_FIELDS.get(key) and value:
-                        host_command = ('fstool hostinfo_update -N -P "{}" -O "{}" <IP_MAC>'.format(constants.WEB_API_FIELDS.get(key), value))
-                        host_commands.append(host_command)
-                hosts.append(host_commands)
-            global HOSTS
-            HOSTS = hosts
-            # print(HOSTS)
-            csv_status_label.config(text='Loaded from Data File: {}'.format(str(file_path)))
-            # return hosts
+        stream = CsvHostStream(file_path)
+        mapped_columns = stream.column_mapping()
+        global CSV_STREAM
+        CSV_STREAM = stream
+        csv_status_label.config(text='Loaded from Data File: {} ({} mapped columns, {:.1f} MB)'.format(
+            str(file_path), len(mapped_columns), stream.total_bytes / 1048576))
         
 
 root = tk.Tk()
@@ -363,6 +554,10 @@ key_label_entries.append(key_label)
 
 key_entry = ttk.Entry(inner_frame)
 key_entry.grid(column=1, row=0, padx=5, pady=5)
+attach_autocomplete(key_entry)
+
+# build the tag search index in the background so the first keystroke doesn't wait on it
+threading.Thread(target=field_search.get_index, daemon=True).start()
 data_entries.append(key_entry)
 key_data_entries.append(key_entry)
 
@@ -430,6 +625,29 @@ use_real_data_var = tk.BooleanVar()
 use_real_data_checkbox = ttk.Checkbutton(root, text="Use Real Data", variable=use_real_data_var)
 use_real_data_checkbox.grid(column=3, row=7, columnspan=4, padx=5, pady=5)
 
+# create the "Batch Mode" checkbox (one SSH channel per chunk of hosts instead of per command)
+batch_mode_var = tk.BooleanVar(value=True)
+batch_mode_checkbox = ttk.Checkbutton(root, text="Batch Mode", variable=batch_mode_var)
+batch_mode_checkbox.grid(column=3, row=8, columnspan=4, padx=5, pady=5)
+
+# create the "Resume from Checkpoint" checkbox (batch mode only), unchecked starts the job over
+resume_var = tk.BooleanVar(value=True)
+resume_checkbox = ttk.Checkbutton(root, text="Resume from Checkpoint", variable=resume_var)
+resume_checkbox.grid(column=3, row=9, columnspan=4, padx=5, pady=5)
+
+# create the concurrent channels label and entry field (batch mode only)
+channels_label = ttk.Label(root, text='SSH Channels: ')
+channels_label.grid(column=0, row=8, padx=5, pady=5)
+channels_entry = ttk.Entry(root, width=6)
+channels_entry.insert(0, '4')
+channels_entry.grid(column=1, row=8, padx=5, pady=5)
+
+# create the host generation progress bar and cancel button
+progress_bar = ttk.Progressbar(root, orient='horizontal', length=400, mode='determinate')
+progress_bar.grid(column=0, row=10, columnspan=4, padx=5, pady=5)
+cancel_button = ttk.Button(root, text='Cancel', command=cancel_generation, state='disabled')
+cancel_button.grid(column=4, row=10, padx=5, pady=5)
+
 # set window size
 width = 1150
 height = 600
@@ -7,7 +7,6 @@ import ipaddress
 import requests
 import json
 import csv
-import constants
 import urllib3
 import random
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -1,15 +1,30 @@
 import tkinter as tk
 from tkinter import ttk
 import paramiko
+import codecs
+import queue
+import threading
 
-def ssh_login():
-    # Get the SSH credentials from the GUI inputs
-    host = host_entry.get()
-    username = username_entry.get()
-    password = password_entry.get()
-    command = command_entry.get()  # Get the command from the text box
+# Output is read in chunks on a background thread and handed to Tk through this queue
+CHUNK_SIZE = 32768
+POLL_MS = 50
+MAX_SCROLLBACK_LINES = 5000
+# Bounded: if Tk falls behind, the reader blocks and stops pulling from the channel (back-pressure)
+MAX_QUEUED_CHUNKS = 64
+
+output_queue = queue.Queue(maxsize=MAX_QUEUED_CHUNKS)
+current_channel = None
+cancel_requested = threading.Event()
 
-    # Create an SSH client
+
+def put_output(item):
+    # drain_output keeps polling until 'done', so this never blocks for good
+    output_queue.put(item)
+
+
+def read_channel(host, username, password, command):
+    # Runs on a worker thread; never touches Tk widgets directly
+    global current_channel
     client = paramiko.SSHClient()
     client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 
@@ -17,26 +32,101 @@ def ssh_login():
         # Connect to the SSH server
         client.connect(host, username=username, password=password)
 
-        # Run the command on the SSH server
-        stdin, stdout, stderr = client.exec_command(command)  # Use the command from the text box
+        # Cancel may have been pressed while connecting
+        channel = client.get_transport().open_session()
+        current_channel = channel
+        if cancel_requested.is_set():
+            put_output(('done', '\n[cancelled]'))
+            return
+
+        # Run the command on the SSH server, stderr merged into the stream
+        channel.set_combined_stderr(True)
+        channel.exec_command(command)
 
-        # Get the command output
-        output = stdout.read().decode()
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        while True:
+            data = channel.recv(CHUNK_SIZE)
+            if not data:
+                break
+            put_output(('data', decoder.decode(data)))
+        put_output(('data', decoder.decode(b'', final=True)))
 
-        # Update the GUI with the command output
-        result_text.delete('1.0', tk.END)
-        result_text.insert(tk.END, output)
+        if cancel_requested.is_set():
+            put_output(('done', '\n[cancelled]'))
+        else:
+            put_output(('done', '\n[exit status {}]'.format(channel.recv_exit_status())))
 
     except paramiko.AuthenticationException:
-        result_text.delete('1.0', tk.END)
-        result_text.insert(tk.END, 'Authentication failed.')
+        put_output(('done', 'Authentication failed.'))
     except paramiko.SSHException as e:
-        result_text.delete('1.0', tk.END)
-        result_text.insert(tk.END, f'SSH error: {str(e)}')
+        # Closing the channel under a pending exec_command lands here
+        put_output(('done', '\n[cancelled]' if cancel_requested.is_set() else f'SSH error: {str(e)}'))
+    except Exception as e:
+        put_output(('done', f'Error: {str(e)}'))
     finally:
+        current_channel = None
         # Close the SSH connection
         client.close()
 
+
+def drain_output():
+    # Coalesces everything queued since the last tick into a single insert
+    chunks = []
+    finished = False
+    while True:
+        try:
+            kind, text = output_queue.get_nowait()
+        except queue.Empty:
+            break
+        chunks.append(text)
+        if kind == 'done':
+            finished = True
+            break
+
+    if chunks:
+        text = ''.join(chunks)
+        # Only the last MAX_SCROLLBACK_LINES lines can survive the trim below, so don't insert more
+        lines = text.rsplit('\n', MAX_SCROLLBACK_LINES)
+        if len(lines) > MAX_SCROLLBACK_LINES:
+            text = '\n'.join(lines[1:])
+        result_text.insert(tk.END, text)
+        # Cap scrollback so a huge command output can't grow the widget forever
+        line_count = int(result_text.index('end-1c').split('.')[0])
+        if line_count > MAX_SCROLLBACK_LINES:
+            result_text.delete('1.0', f'{line_count - MAX_SCROLLBACK_LINES + 1}.0')
+        result_text.see(tk.END)
+
+    if finished:
+        login_button.config(state='normal')
+        cancel_button.config(state='disabled')
+    else:
+        root.after(POLL_MS, drain_output)
+
+
+def ssh_login():
+    # Get the SSH credentials from the GUI inputs
+    host = host_entry.get()
+    username = username_entry.get()
+    password = password_entry.get()
+    command = command_entry.get()  # Get the command from the text box
+
+    result_text.delete('1.0', tk.END)
+    cancel_requested.clear()
+    login_button.config(state='disabled')
+    cancel_button.config(state='normal')
+
+    worker = threading.Thread(target=read_channel, args=(host, username, password, command), daemon=True)
+    worker.start()
+    root.after(POLL_MS, drain_output)
+
+
+def cancel_command():
+    # Closing the channel makes recv() return and the worker wind down
+    cancel_requested.set()
+    channel = current_channel
+    if channel is not None:
+        channel.close()
+
 # Create the main window
 root = tk.Tk()
 root.title('SSH Middleman')
@@ -51,6 +141,7 @@ password_entry = ttk.Entry(root, show='*')
 command_label = ttk.Label(root, text='Command:')
 command_entry = ttk.Entry(root)  # Add a new text box for entering commands
 login_button = ttk.Button(root, text='Login', command=ssh_login)
+cancel_button = ttk.Button(root, text='Cancel', command=cancel_command, state='disabled')
 result_text = tk.Text(root, height=10, width=50)
 
 # Grid layout for the GUI elements
@@ -62,7 +153,8 @@ password_label.grid(row=2, column=0, sticky=tk.W)
 password_entry.grid(row=2, column=1)
 command_label.grid(row=3, column=0, sticky=tk.W)
 command_entry.grid(row=3, column=1)  # Add the command text box
-login_button.grid(row=4, column=0, columnspan=2)
+login_button.grid(row=4, column=0)
+cancel_button.grid(row=4, column=1)
 result_text.grid(row=5, column=0, columnspan=2)  # Update the row number
 
 # Start the main event loop
@@ -0,0 +1,16 @@
+import field_search
+
+
+def test_one_letter_query_ranks_whole_label_or_key_prefixes_first():
+    results = field_search.search('n', limit=10)
+    assert len(results) == 10
+    for label, key in results:
+        assert label.lower().startswith('n') or key.lower().startswith('n')
+
+
+def test_one_letter_query_keeps_every_whole_label_match():
+    results = field_search.search('n', limit=1000)
+    assert ('NetBIOS Domain', 'nbtdomain') in results
+    whole = [i for i, (label, key) in enumerate(results)
+             if label.lower().startswith('n') or key.lower().startswith('n')]
+    assert whole == list(range(len(whole)))